@@ -0,0 +1,15 @@
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+
+async def require_admin(x_admin_key: str = Header(default="")):
+    """Dependency guarding admin and data-export endpoints with the ADMIN_API_KEY secret"""
+
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key:
+        raise HTTPException(status_code=503, detail="Admin API is disabled (ADMIN_API_KEY not set)")
+
+    if not hmac.compare_digest(x_admin_key.encode(), admin_key.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
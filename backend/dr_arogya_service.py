@@ -1,27 +1,53 @@
 import asyncio
 import json
+import logging
 import os
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from datetime import datetime
-import requests
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 from models import (
     Session, Message, HealthGuide, TraditionalRemedy, 
     LanguageEnum, ConversationStageEnum, SeverityEnum,
     EmergencyKeyword
 )
+from localization import get_catalog
+from remedies import RemedyStore
+from llm_slo import LatencySLOController
+
+# The LLM client, requests and NumPy (via grounding) are imported on first use to keep cold starts fast
+if TYPE_CHECKING:
+    from emergentintegrations.llm.chat import LlmChat
+    from grounding import GroundingIndex
+
+logger = logging.getLogger(__name__)
+
+# Simple keyword extraction - in production would use NLP
+SYMPTOM_KEYWORDS = [
+    "pain", "ache", "fever", "cough", "headache", "nausea", 
+    "vomiting", "diarrhea", "constipation", "fatigue", "weakness",
+    "dizziness", "rash", "swelling", "bleeding"
+]
+
+# Stages whose replies are short questions the local question bank can ask while the LLM is slow
+LOCAL_RESPONSE_STAGES = (ConversationStageEnum.GREETING, ConversationStageEnum.SYMPTOM_INQUIRY)
 
 class DrArogyaService:
     def __init__(self):
         self.openrouter_key = os.getenv("OPENROUTER_API_KEY")
         self.perplexity_key = os.getenv("PERPLEXITY_API_KEY")
         
+        # Localised prompts and canned responses
+        self.catalog = get_catalog()
+        
         # Emergency keywords for red flag detection
         self.emergency_keywords = self._load_emergency_keywords()
         
-        # Traditional remedies database
-        self.traditional_remedies = self._load_traditional_remedies()
+        # Traditional remedies knowledge base (hot-reloaded from data/remedies.json)
+        self.remedy_store = RemedyStore()
+        
+        # Rolling LLM latency against the SLO, deciding when turns are answered locally
+        self.slo = LatencySLOController()
 
     def _load_emergency_keywords(self) -> Dict[LanguageEnum, List[EmergencyKeyword]]:
         """Load emergency keywords for different languages"""
@@ -42,34 +68,26 @@ class DrArogyaService:
             ]
         }
 
-    def _load_traditional_remedies(self) -> Dict[str, List[TraditionalRemedy]]:
-        """Load traditional remedies database"""
-        return {
-            "cough": [
-                TraditionalRemedy(
-                    name="Haldi Doodh (Golden Milk)",
-                    ingredients=["1 cup warm milk", "1/2 tsp turmeric", "1/4 tsp black pepper", "honey to taste"],
-                    preparation="Mix turmeric and black pepper in warm milk. Add honey.",
-                    usage="Drink before bedtime",
-                    benefits="Anti-inflammatory properties help soothe throat and reduce cough",
-                    language=LanguageEnum.ENGLISH
-                )
-            ],
-            "indigestion": [
-                TraditionalRemedy(
-                    name="Ajwain Water",
-                    ingredients=["1 tsp ajwain (carom seeds)", "1 cup warm water", "pinch of salt"],
-                    preparation="Boil ajwain in water for 5 minutes, strain and add salt",
-                    usage="Drink after meals",
-                    benefits="Helps improve digestion and reduces bloating",
-                    language=LanguageEnum.ENGLISH
-                )
-            ]
-        }
+    @property
+    def grounding_index(self) -> Optional["GroundingIndex"]:
+        """Vetted reference snippets retrieved into health guide prompts (memory-mapped BM25 index)"""
+        return self.load_grounding_index()
+
+    def load_grounding_index(self) -> Optional["GroundingIndex"]:
+        """Load the index (building it if the corpus changed); blocking, so run it off the event loop"""
+        from grounding import get_grounding_index
+        return get_grounding_index()
+
+    def warm_up(self):
+        """Load the LLM client and the grounding index now rather than on the first turn"""
+        import emergentintegrations.llm.chat  # noqa: F401
+        self.load_grounding_index()
 
-    async def create_ai_chat(self, session_id: str, language: LanguageEnum) -> LlmChat:
+    async def create_ai_chat(self, session_id: str, language: LanguageEnum) -> "LlmChat":
         """Create an AI chat instance with proper configuration"""
         
+        from emergentintegrations.llm.chat import LlmChat
+        
         system_message = self._get_system_prompt(language)
         
         chat = LlmChat(
@@ -83,41 +101,18 @@ class DrArogyaService:
     def _get_system_prompt(self, language: LanguageEnum) -> str:
         """Get the Dr. Arogya system prompt based on language"""
         
-        if language == LanguageEnum.HINDI:
-            return """आप डॉ. आरोग्य हैं, एक भरोसेमंद, अनुभवी और दयालु AI स्वास्थ्य सहयोगी। 
-
-आपका व्यक्तित्व:
-- गर्मजोशी से भरा और समझदार
-- मरीज की चिंताओं को गंभीरता से लेने वाला
-- स्पष्ट और सरल भाषा में जवाब देने वाला
-- पारंपरिक उपचार (दादी माँ के नुस्खे) और आधुनिक चिकित्सा दोनों को समझने वाला
-
-महत्वपूर्ण नियम:
-1. हमेशा याद रखें कि आप AI हैं, डॉक्टर नहीं
-2. आपातकालीन स्थिति में तुरंत चिकित्सा सहायता लेने को कहें
-3. पहले लक्षणों को समझें, फिर सुझाव दें
-4. हमेशा डॉक्टर से मिलने की सलाह दें
-
-आपका उद्देश्य: मरीज को डॉक्टर के पास जाने के लिए तैयार करना और बेहतर स्वास्थ्य जानकारी देना।"""
-
-        else:  # Default English
-            return """You are Dr. Arogya, a trusted, experienced, and compassionate AI health companion. 
-
-Your personality:
-- Warm, empathetic, and understanding
-- Takes patient concerns seriously
-- Speaks in clear, simple language
-- Knowledgeable about both traditional remedies (दादी माँ के नुस्खे) and modern medicine
-- Culturally sensitive and respectful
-
-Critical Rules:
-1. Always remember you are an AI assistant, NOT a human doctor
-2. For medical emergencies, immediately direct to emergency services
-3. Focus on understanding symptoms first, then provide guidance
-4. Always recommend seeing a real doctor for proper diagnosis
-5. Provide helpful information while emphasizing limitations
-
-Your goal: Prepare patients for doctor visits and provide supportive health information."""
+        system_prompt = self.catalog.get("system_prompt", language)
+        
+        # Untranslated languages get the English prompt plus a fixed reply-language line,
+        # so the prefix stays byte-identical per language and provider prompt caching hits
+        if not self.catalog.is_translated("system_prompt", language):
+            directive = self.catalog.format(
+                "reply_language_directive", language,
+                language_name=self.catalog.get("language_name", language)
+            )
+            system_prompt = f"{system_prompt}\n\n{directive}"
+        
+        return system_prompt
 
     def detect_emergency(self, message_content: str, language: LanguageEnum) -> bool:
         """Detect emergency keywords in user message"""
@@ -139,6 +134,12 @@ Your goal: Prepare patients for doctor visits and provide supportive health info
         if emergency_detected:
             return self._generate_emergency_response(session.language or LanguageEnum.ENGLISH), True
         
+        # While the LLM misses its latency SLO, early-stage turns are answered locally
+        answer_locally = session.current_stage in LOCAL_RESPONSE_STAGES
+        if answer_locally and not self.slo.allow_llm():
+            self.slo.record_local()
+            return self._get_local_response(session, user_message), False
+        
         # Create AI chat instance
         chat = await self.create_ai_chat(session.id, session.language or LanguageEnum.ENGLISH)
         
@@ -146,13 +147,22 @@ Your goal: Prepare patients for doctor visits and provide supportive health info
         context_prompt = self._get_stage_context(session)
         combined_message = f"{context_prompt}\n\nUser: {user_message}"
         
+        from emergentintegrations.llm.chat import UserMessage
+        
+        started = time.monotonic()
         try:
             user_msg = UserMessage(text=combined_message)
-            response = await chat.send_message(user_msg)
+            response = await asyncio.wait_for(chat.send_message(user_msg), timeout=self.slo.timeout_seconds)
+            self.slo.record(time.monotonic() - started)
             return response, False
             
         except Exception as e:
-            print(f"Error generating AI response: {e}")
+            outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            self.slo.record(time.monotonic() - started, outcome)
+            print(f"Error generating AI response ({outcome}): {e}")
+            if answer_locally:
+                self.slo.record_local()
+                return self._get_local_response(session, user_message), False
             return self._get_fallback_response(session.language or LanguageEnum.ENGLISH), False
 
     def _get_stage_context(self, session: Session) -> str:
@@ -161,54 +171,47 @@ Your goal: Prepare patients for doctor visits and provide supportive health info
         stage = session.current_stage
         language = session.language or LanguageEnum.ENGLISH
         
-        if stage == ConversationStageEnum.LANGUAGE_SELECTION:
-            if language == LanguageEnum.HINDI:
-                return "उपयोगकर्ता ने भाषा चुनी है। अब उनका स्वागत करें और उनकी स्वास्थ्य समस्या के बारे में पूछें।"
-            return "User has selected language. Now greet them warmly and ask about their health concern."
-        
-        elif stage == ConversationStageEnum.GREETING:
-            if language == LanguageEnum.HINDI:
-                return "उपयोगकर्ता के स्वास्थ्य की समस्या के बारे में विस्तार से जानकारी लें। लक्षण, समय, तीव्रता आदि के बारे में पूछें।"
-            return "Gather detailed information about the user's health concern. Ask about symptoms, duration, severity, etc."
-        
-        elif stage == ConversationStageEnum.SYMPTOM_INQUIRY:
-            if language == LanguageEnum.HINDI:
-                return "अधिक विस्तृत प्रश्न पूछें: दर्द की जगह, कब से है, कैसा लगता है, क्या बढ़ाता या घटाता है।"
-            return "Ask more detailed questions: location of pain, when it started, what it feels like, what makes it better or worse."
+        if stage in (
+            ConversationStageEnum.LANGUAGE_SELECTION,
+            ConversationStageEnum.GREETING,
+            ConversationStageEnum.SYMPTOM_INQUIRY
+        ):
+            return self.catalog.get(f"stage_context.{stage.value}", language)
         
-        return "Continue the conversation naturally, gathering information to help the user."
+        return self.catalog.get("stage_context.default", language)
 
     def _generate_emergency_response(self, language: LanguageEnum) -> str:
         """Generate emergency response message"""
-        
-        if language == LanguageEnum.HINDI:
-            return """🚨 आपातकाल का संकेत! 🚨
-
-आपने जो लक्षण बताए हैं, वे गंभीर हो सकते हैं। कृपया तुरंत:
-
-1. नजदीकी अस्पताल जाएं या 102/108 पर कॉल करें
-2. परिवार के किसी सदस्य को तुरंत बताएं  
-3. यह बातचीत रोकें और चिकित्सा सहायता लें
-
-आपका स्वास्थ्य सबसे महत्वपूर्ण है। देर न करें!"""
-
-        return """🚨 EMERGENCY ALERT! 🚨
-
-Based on what you've described, it is very important that you seek medical help immediately. Please:
-
-1. Contact your nearest emergency services or go to the hospital NOW
-2. Call a family member or friend immediately
-3. Stop this conversation and get medical attention
-
-Your health is the top priority. Do not delay!"""
+        return self.catalog.get("emergency_response", language)
 
     def _get_fallback_response(self, language: LanguageEnum) -> str:
         """Get fallback response when AI fails"""
+        return self.catalog.get("fallback_response", language)
+
+    def _get_local_response(self, session: Session, user_message: str) -> str:
+        """Templated follow-up questions from the question bank, for when the LLM is slow or failing"""
+        
+        language = session.language or LanguageEnum.ENGLISH
+        # The session version changes every turn, so repeated turns rotate through the bank
+        turn = session.version or 0
+        
+        if session.current_stage == ConversationStageEnum.GREETING:
+            greetings = self.catalog.get("question_bank.greeting", language)
+            return greetings[turn % len(greetings)]
         
-        if language == LanguageEnum.HINDI:
-            return "मुझे खुशी होगी आपकी मदद करने में, लेकिन तकनीकी समस्या के कारण मैं अभी जवाब नहीं दे सकता। कृपया डॉक्टर से संपर्क करें।"
+        # Ask about symptoms just mentioned first, then about those captured earlier
+        mentioned = self.extract_symptoms(user_message)
+        captured = mentioned + [symptom for symptom in session.symptoms if symptom in SYMPTOM_KEYWORDS and symptom not in mentioned]
         
-        return "I'd be happy to help you, but I'm experiencing technical difficulties. Please consult with a healthcare professional for your concerns."
+        if captured:
+            start = 0 if mentioned else turn % len(captured)
+            symptoms = (captured[start:] + captured[:start])[:2]
+            questions = [self.catalog.get(f"question_bank.follow_up.{symptom}", language) for symptom in symptoms]
+        else:
+            generic = self.catalog.get("question_bank.symptom_inquiry", language)
+            questions = [generic[turn % len(generic)]]
+        
+        return "\n\n".join([self.catalog.get("question_bank.acknowledgement", language), *questions])
 
     async def generate_health_guide(self, session: Session, messages: List[Message]) -> HealthGuide:
         """Generate comprehensive health guide based on conversation"""
@@ -219,80 +222,77 @@ Your health is the top priority. Do not delay!"""
         # Use AI to generate comprehensive health guide
         chat = await self.create_ai_chat(f"{session.id}_guide", session.language or LanguageEnum.ENGLISH)
         
-        guide_prompt = self._create_health_guide_prompt(symptoms, session.language or LanguageEnum.ENGLISH)
+        guide_prompt = self._create_health_guide_prompt(
+            symptoms, session.language or LanguageEnum.ENGLISH, self._reference_snippets(session, symptoms)
+        )
+        
+        from emergentintegrations.llm.chat import UserMessage
         
         try:
             user_msg = UserMessage(text=guide_prompt)
             response = await chat.send_message(user_msg)
             
             # Parse AI response into structured health guide
-            health_guide = self._parse_health_guide_response(response, session)
+            health_guide = self._parse_health_guide_response(response, session, symptoms)
             return health_guide
             
         except Exception as e:
             print(f"Error generating health guide: {e}")
             return self._create_fallback_health_guide(session, symptoms)
 
+    def extract_symptoms(self, text: str) -> List[str]:
+        """Symptom keywords mentioned in one message"""
+        content_lower = text.lower()
+        return [keyword for keyword in SYMPTOM_KEYWORDS if keyword in content_lower]
+
     def _extract_symptoms_from_messages(self, messages: List[Message]) -> List[str]:
         """Extract symptoms from conversation messages"""
         symptoms = []
         
         for message in messages:
             if message.sender == "user":
-                # Simple keyword extraction - in production would use NLP
-                content_lower = message.content.lower()
-                
-                symptom_keywords = [
-                    "pain", "ache", "fever", "cough", "headache", "nausea", 
-                    "vomiting", "diarrhea", "constipation", "fatigue", "weakness",
-                    "dizziness", "rash", "swelling", "bleeding"
-                ]
-                
-                for keyword in symptom_keywords:
-                    if keyword in content_lower and keyword not in symptoms:
+                for keyword in self.extract_symptoms(message.content):
+                    if keyword not in symptoms:
                         symptoms.append(keyword)
         
         return symptoms
 
-    def _create_health_guide_prompt(self, symptoms: List[str], language: LanguageEnum) -> str:
+    def _reference_snippets(self, session: Session, symptoms: List[str]) -> List[dict]:
+        """Top-k corpus snippets for the session's symptoms"""
+        
+        # Grounding is best effort: a guide without references beats a failed guide
+        try:
+            index = self.grounding_index
+            if not index:
+                return []
+            return index.search(session.symptoms + symptoms, session.language)
+        except Exception as e:
+            logger.warning(f"Reference retrieval failed, generating the guide without references: {e!r}")
+            return []
+
+    def _create_health_guide_prompt(
+        self,
+        symptoms: List[str],
+        language: LanguageEnum,
+        references: Optional[List[dict]] = None
+    ) -> str:
         """Create prompt for health guide generation"""
         
-        symptoms_text = ", ".join(symptoms) if symptoms else "general health concern"
+        symptoms_text = ", ".join(symptoms) if symptoms else self.catalog.get("health_guide.general_concern", language)
         
-        if language == LanguageEnum.HINDI:
-            return f"""
-उपयोगकर्ता के लक्षण: {symptoms_text}
-
-कृपया एक विस्तृत स्वास्थ्य गाइड तैयार करें जिसमें शामिल हो:
-
-1. लक्षणों की सारांश
-2. संभावित कारण (केवल सामान्य जानकारी)
-3. घर पर देखभाल के तरीके
-4. दादी माँ के नुस्खे (पारंपरिक उपचार)
-5. खान-पान की सलाह
-6. जीवनशैली में बदलाव
-7. डॉक्टर से कब मिलें
-
-महत्वपूर्ण: हमेशा याद दिलाएं कि यह केवल जानकारी है, निदान नहीं।
-            """
+        # Fixed instructions first and per-session content last keeps the prompt prefix cacheable
+        instructions = self.catalog.get("health_guide.instructions", language)
+        symptoms_label = self.catalog.get("health_guide.symptoms_label", language)
         
-        return f"""
-User symptoms: {symptoms_text}
-
-Please create a comprehensive health guide including:
-
-1. Summary of symptoms
-2. Possible conditions (general information only)
-3. Self-care measures
-4. Traditional remedies (दादी माँ के नुस्खे)
-5. Dietary recommendations
-6. Lifestyle modifications  
-7. When to see a doctor
-
-Important: Always remind that this is information only, not a diagnosis.
-        """
+        prompt = instructions
+        if references:
+            references_label = self.catalog.get("health_guide.references_label", language)
+            notes = "\n".join(f"- {snippet['title']}: {snippet['text']}" for snippet in references)
+            prompt = f"{prompt}\n\n{references_label}:\n{notes}"
+        
+        return f"{prompt}\n\n{symptoms_label}: {symptoms_text}"
 
-    def _parse_health_guide_response(self, ai_response: str, session: Session) -> HealthGuide:
+    def _parse_health_guide_response(self, ai_response: str, session: Session, symptoms: List[str]) -> HealthGuide:
         """Parse AI response into structured HealthGuide"""
         
         # This is a simplified parser - in production would use more sophisticated NLP
@@ -313,16 +313,17 @@ Important: Always remind that this is information only, not a diagnosis.
         )
         
         # Add traditional remedies based on symptoms
-        if session.symptoms:
-            for symptom in session.symptoms:
-                if symptom in self.traditional_remedies:
-                    guide.traditional_remedies.extend(self.traditional_remedies[symptom])
+        guide.traditional_remedies.extend(
+            self.remedy_store.index.lookup(session.symptoms + symptoms, session.language)
+        )
         
         return guide
 
     def _create_fallback_health_guide(self, session: Session, symptoms: List[str]) -> HealthGuide:
         """Create a basic health guide when AI fails"""
         
+        remedies = self.remedy_store.index.lookup(session.symptoms + symptoms, session.language)
+        
         return HealthGuide(
             session_id=session.id,
             language=session.language or LanguageEnum.ENGLISH,
@@ -330,7 +331,7 @@ Important: Always remind that this is information only, not a diagnosis.
             possible_conditions=["Please consult a healthcare professional for proper evaluation"],
             otc_recommendations=["Rest well", "Stay hydrated", "Monitor symptoms"],
             warning_signs=["Severe or worsening symptoms", "Persistent discomfort"],
-            traditional_remedies=[
+            traditional_remedies=remedies or [
                 TraditionalRemedy(
                     name="General Wellness Tea",
                     ingredients=["Ginger", "Honey", "Warm water"],
@@ -369,6 +370,8 @@ Important: Always remind that this is information only, not a diagnosis.
                 "max_tokens": 300
             }
             
+            import requests
+            
             response = requests.post(url, headers=headers, json=payload)
             
             if response.status_code == 200:
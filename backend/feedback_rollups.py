@@ -0,0 +1,210 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from models import Feedback
+
+logger = logging.getLogger(__name__)
+
+ALL = "all"
+UNKNOWN = "unknown"
+
+# The feedback form's options, in English and Hindi, and the rollup key each one counts under.
+# Aspects are free text in the API, so anything else is counted as "other" to keep rollups bounded.
+HELPFUL_ASPECTS = {
+    "clear and understandable information": "clear_information",
+    "स्पष्ट और समझने योग्य जानकारी": "clear_information",
+    "traditional remedies (दादी माँ के नुस्खे)": "traditional_remedies",
+    "दादी माँ के नुस्खे": "traditional_remedies",
+    "warning signs identification": "warning_signs",
+    "चेतावनी के संकेत": "warning_signs",
+    "dietary recommendations": "diet",
+    "आहार की सलाह": "diet",
+    "lifestyle suggestions": "lifestyle",
+    "जीवनशैली के सुझाव": "lifestyle",
+    "pdf report generation": "pdf_report",
+    "pdf रिपोर्ट": "pdf_report",
+    "doctor visit preparation": "doctor_preparation",
+    "डॉक्टर के लिए तैयारी": "doctor_preparation",
+    "emergency detection": "emergency_detection",
+    "आपातकालीन पहचान": "emergency_detection",
+}
+# API clients may also send the keys themselves
+HELPFUL_ASPECTS.update({key: key for key in set(HELPFUL_ASPECTS.values())})
+OTHER_ASPECT = "other"
+
+
+def aspect_key(aspect) -> str:
+    """Rollup key of a helpful aspect: a known form option, or "other" """
+    return HELPFUL_ASPECTS.get(str(aspect).strip().lower(), OTHER_ASPECT)
+
+
+def _aspect_keys(aspects: Optional[Iterable[str]]) -> List[str]:
+    keys = []
+    for aspect in aspects or ():
+        key = aspect_key(aspect)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def rollup_ids(day: str, language: str) -> List[str]:
+    """Every rollup one feedback contributes to: per day and language, plus the all-time and all-language totals"""
+    return [f"{day}:{language}", f"{day}:{ALL}", f"{ALL}:{language}", f"{ALL}:{ALL}"]
+
+
+def _split_id(rollup_id: str) -> Dict[str, str]:
+    day, language = rollup_id.split(":", 1)
+    return {"day": day, "language": language}
+
+
+def summarise(rollup: Optional[dict], day: str, language: str) -> dict:
+    """API view of a rollup document, with the average rating derived from the running sum"""
+
+    rollup = rollup or {}
+    count = rollup.get("count", 0)
+    return {
+        "day": day,
+        "language": language,
+        "count": count,
+        "average_rating": round(rollup.get("rating_sum", 0) / count, 2) if count else None,
+        "ratings": {str(rating): rollup.get("ratings", {}).get(str(rating), 0) for rating in range(1, 6)},
+        "stages": rollup.get("stages", {}),
+        "helpful_aspects": rollup.get("helpful_aspects", {}),
+        "updated_at": rollup.get("updated_at")
+    }
+
+
+class FeedbackRollups:
+    """Pre-aggregated feedback counters, one document per (day, language), kept current with $inc"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @staticmethod
+    async def ensure_indexes(sessions):
+        """rebuild() joins every feedback row to its session on sessions.id"""
+        await sessions.create_index("id")
+
+    async def record(self, feedback: Feedback):
+        """Fold one submission into its rollups"""
+
+        language = getattr(feedback.language, "value", feedback.language) or UNKNOWN
+        stage = getattr(feedback.stage, "value", feedback.stage) or UNKNOWN
+
+        increments = {
+            "count": 1,
+            "rating_sum": feedback.rating,
+            f"ratings.{feedback.rating}": 1,
+            f"stages.{stage}": 1
+        }
+        for aspect in _aspect_keys(feedback.helpful_aspects):
+            increments[f"helpful_aspects.{aspect}"] = 1
+
+        day = feedback.created_at.strftime("%Y-%m-%d")
+        now = datetime.utcnow()
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": rollup_id},
+                {"$inc": increments, "$set": {"updated_at": now}, "$setOnInsert": _split_id(rollup_id)},
+                upsert=True
+            )
+            for rollup_id in rollup_ids(day, language)
+        ], ordered=False)
+
+    async def get(self, day: str = ALL, language: str = ALL) -> dict:
+        """Single-document lookup by key"""
+        return summarise(await self.collection.find_one({"_id": f"{day}:{language}"}), day, language)
+
+    async def rebuild(self, feedback_collection) -> int:
+        """Recompute every rollup from raw feedback with one aggregation pipeline.
+
+        Feedback stored before rollups existed has no language or stage, so those
+        are taken from the session (its current stage is the best record left).
+        The pipeline emits one row per (rollup, field, value), read through a
+        cursor, so no single result document grows with the data. Run while
+        submissions are quiet: live $inc updates during a rebuild are overwritten.
+        """
+
+        labels = list(HELPFUL_ASPECTS)
+        keys = [HELPFUL_ASPECTS[label] for label in labels]
+
+        pipeline = [
+            {"$lookup": {
+                "from": "sessions",
+                "localField": "session_id",
+                "foreignField": "id",
+                "as": "session"
+            }},
+            {"$project": {
+                "rating": 1,
+                # Mapped to rollup keys and de-duplicated per feedback, as record() does
+                "helpful_aspects": {"$setUnion": [{"$map": {
+                    "input": {"$ifNull": ["$helpful_aspects", []]},
+                    "in": {"$let": {
+                        "vars": {"index": {"$indexOfArray": [
+                            labels, {"$toLower": {"$trim": {"input": {"$toString": "$$this"}}}}
+                        ]}},
+                        "in": {"$cond": [{"$gte": ["$$index", 0]}, {"$arrayElemAt": [keys, "$$index"]}, OTHER_ASPECT]}
+                    }}
+                }}, []]},
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "language": {"$ifNull": ["$language", {"$ifNull": [{"$first": "$session.language"}, UNKNOWN]}]},
+                "stage": {"$ifNull": ["$stage", {"$ifNull": [{"$first": "$session.current_stage"}, UNKNOWN]}]}
+            }},
+            {"$project": {
+                "rating": 1,
+                "rollup_id": [
+                    {"$concat": ["$day", ":", "$language"]},
+                    {"$concat": ["$day", f":{ALL}"]},
+                    {"$concat": [f"{ALL}:", "$language"]},
+                    f"{ALL}:{ALL}"
+                ],
+                # Every counter one feedback adds to; "count" carries the totals
+                "counters": {"$concatArrays": [
+                    [{"field": "count", "value": None}],
+                    [{"field": "ratings", "value": {"$toString": "$rating"}}],
+                    [{"field": "stages", "value": {"$toString": "$stage"}}],
+                    {"$map": {"input": "$helpful_aspects", "in": {"field": "helpful_aspects", "value": "$$this"}}}
+                ]}
+            }},
+            {"$unwind": "$rollup_id"},
+            {"$unwind": "$counters"},
+            {"$group": {
+                "_id": {"rollup_id": "$rollup_id", "field": "$counters.field", "value": "$counters.value"},
+                "count": {"$sum": 1},
+                "rating_sum": {"$sum": "$rating"}
+            }}
+        ]
+
+        now = datetime.utcnow()
+        rollups: Dict[str, dict] = {}
+        async for row in feedback_collection.aggregate(pipeline, allowDiskUse=True):
+            rollup_id, field, value = row["_id"]["rollup_id"], row["_id"]["field"], row["_id"]["value"]
+            rollup = rollups.setdefault(rollup_id, {
+                "_id": rollup_id,
+                **_split_id(rollup_id),
+                "count": 0,
+                "rating_sum": 0,
+                "ratings": {},
+                "stages": {},
+                "helpful_aspects": {},
+                "updated_at": now
+            })
+            if field == "count":
+                rollup["count"] = row["count"]
+                rollup["rating_sum"] = row["rating_sum"]
+            else:
+                rollup[field][value] = row["count"]
+
+        if rollups:
+            await self.collection.bulk_write(
+                [ReplaceOne({"_id": rollup_id}, rollup, upsert=True) for rollup_id, rollup in rollups.items()],
+                ordered=False
+            )
+        await self.collection.delete_many({"_id": {"$nin": list(rollups)}})
+
+        logger.info(f"Rebuilt {len(rollups)} feedback rollups")
+        return len(rollups)
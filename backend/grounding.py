@@ -0,0 +1,207 @@
+import json
+import logging
+import mmap
+import os
+import re
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models import LanguageEnum
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+GROUNDING_CORPUS_PATH = Path(os.getenv("GROUNDING_CORPUS_PATH", DATA_DIR / "grounding_corpus.jsonl"))
+GROUNDING_INDEX_DIR = Path(os.getenv("GROUNDING_INDEX_DIR", DATA_DIR / "grounding_index"))
+GROUNDING_TOP_K = int(os.getenv("GROUNDING_TOP_K", "4"))
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Word characters plus the Indic blocks, whose vowel signs Python does not count as \w
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u0DFF]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by can for from has have i in is it its my of on or so such that the this to "
+    "was with".split()
+)
+
+META_FILE = "meta.json"
+VOCABULARY_FILE = "vocabulary.json"
+ARRAY_FILES = ("indptr", "doc_ids", "weights", "doc_languages", "offsets")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _corpus_signature(corpus_path: Path) -> Dict[str, int]:
+    stat = corpus_path.stat()
+    return {"corpus_size": stat.st_size, "corpus_mtime_ns": stat.st_mtime_ns}
+
+
+class GroundingIndex:
+    """BM25 index over the bundled grounding corpus, memory-mapped from .npy files.
+
+    Postings are stored term-major (a CSC sparse matrix): the documents and
+    precomputed BM25 weights of term t are doc_ids[indptr[t]:indptr[t + 1]]
+    and weights[indptr[t]:indptr[t + 1]]. A query only touches the postings of
+    its own terms. Snippet text stays in the corpus file and is read through
+    its line offsets.
+    """
+
+    def __init__(self, directory: Path, corpus_path: Path):
+        with open(directory / META_FILE, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(directory / VOCABULARY_FILE, encoding="utf-8") as f:
+            self.vocabulary: Dict[str, int] = json.load(f)
+
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAY_FILES}
+        self.indptr = arrays["indptr"]
+        self.doc_ids = arrays["doc_ids"]
+        self.weights = arrays["weights"]
+        self.doc_languages = arrays["doc_languages"]
+        self.offsets = arrays["offsets"]
+
+        self.languages: List[str] = self.meta["languages"]
+        self.documents = len(self.doc_languages)
+
+        with open(corpus_path, "rb") as f:
+            self._corpus = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def build(corpus_path: Path = GROUNDING_CORPUS_PATH, directory: Path = GROUNDING_INDEX_DIR):
+        """Tokenise the corpus and write the postings, vocabulary and metadata to directory"""
+
+        vocabulary: Dict[str, int] = {}
+        languages: Dict[str, int] = {}
+        term_ids, doc_ids, frequencies = [], [], []
+        lengths, doc_languages, offsets = [], [], [0]
+
+        with open(corpus_path, "rb") as f:
+            for line in f:
+                offsets.append(offsets[-1] + len(line))
+                entry = json.loads(line)
+                tokens = tokenize(" ".join([entry["title"], *entry.get("tags", []), entry["text"]]))
+                counts = Counter(tokens)
+
+                doc = len(lengths)
+                lengths.append(len(tokens))
+                doc_languages.append(languages.setdefault(entry["language"], len(languages)))
+                for term, count in counts.items():
+                    term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                    doc_ids.append(doc)
+                    frequencies.append(count)
+
+        documents = len(lengths)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        frequencies = np.asarray(frequencies, dtype=np.float32)
+        lengths = np.asarray(lengths, dtype=np.float32)
+
+        # BM25 weight of every (term, document) posting, computed once here rather than per query
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        idf = np.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(float(lengths.mean()) if documents else 0.0, 1.0))
+        weights = idf[term_ids] * frequencies * (BM25_K1 + 1) / (frequencies + norm[doc_ids])
+
+        order = np.argsort(term_ids, kind="stable")
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=indptr[1:])
+
+        arrays = {
+            "indptr": indptr,
+            "doc_ids": doc_ids[order],
+            "weights": weights[order].astype(np.float32),
+            "doc_languages": np.asarray(doc_languages, dtype=np.int8),
+            "offsets": np.asarray(offsets, dtype=np.int64)
+        }
+
+        # Each file is swapped in whole and the metadata last, so a reader never sees a half-written index;
+        # temporary names are unique so workers building at the same time do not truncate each other's files
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_suffix = f".{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        for name, array in arrays.items():
+            with open(directory / f"{name}.npy{tmp_suffix}", "wb") as f:
+                np.save(f, array)
+            os.replace(directory / f"{name}.npy{tmp_suffix}", directory / f"{name}.npy")
+        for name, content in (
+            (VOCABULARY_FILE, vocabulary),
+            (META_FILE, {
+                **_corpus_signature(corpus_path),
+                "documents": documents,
+                "terms": len(vocabulary),
+                "languages": list(languages),
+                "k1": BM25_K1,
+                "b": BM25_B
+            })
+        ):
+            with open(directory / f"{name}{tmp_suffix}", "w", encoding="utf-8") as f:
+                json.dump(content, f, ensure_ascii=False)
+            os.replace(directory / f"{name}{tmp_suffix}", directory / name)
+
+        logger.info(f"Built grounding index: {documents} documents, {len(vocabulary)} terms")
+
+    def document(self, doc: int) -> dict:
+        return json.loads(self._corpus[self.offsets[doc]:self.offsets[doc + 1]])
+
+    def search(
+        self,
+        terms: Iterable[str],
+        language: Optional[LanguageEnum] = None,
+        k: int = GROUNDING_TOP_K
+    ) -> List[dict]:
+        """Top-k snippets for the terms, in the session language or English"""
+
+        term_ids = {self.vocabulary[token] for term in terms for token in tokenize(term) if token in self.vocabulary}
+        if not term_ids or k <= 0:
+            return []
+
+        docs = np.concatenate([self.doc_ids[self.indptr[t]:self.indptr[t + 1]] for t in term_ids])
+        weights = np.concatenate([self.weights[self.indptr[t]:self.indptr[t + 1]] for t in term_ids])
+        scores = np.bincount(docs, weights=weights, minlength=self.documents)
+
+        candidates = np.flatnonzero(scores)
+        language_code = getattr(language, "value", language) or LanguageEnum.ENGLISH.value
+        allowed = [self.languages.index(code) for code in {language_code, LanguageEnum.ENGLISH.value} if code in self.languages]
+        candidates = candidates[np.isin(self.doc_languages[candidates], allowed)]
+
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [{**self.document(doc), "score": round(float(scores[doc]), 3)} for doc in candidates]
+
+
+@lru_cache(maxsize=None)
+def get_grounding_index() -> Optional[GroundingIndex]:
+    """Load the index once per process, rebuilding it when the bundled corpus has changed.
+
+    Deployments build it ahead of time (`manage.py build-grounding-index`); the
+    server loads it at startup. A failed build or load is logged once and
+    cached as no index, so guides are generated without reference snippets.
+    """
+
+    if not GROUNDING_CORPUS_PATH.exists():
+        logger.warning(f"Grounding corpus {GROUNDING_CORPUS_PATH} not found; guides are generated without reference snippets")
+        return None
+
+    try:
+        with open(GROUNDING_INDEX_DIR / META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        stale = any(meta.get(key) != value for key, value in _corpus_signature(GROUNDING_CORPUS_PATH).items())
+    except (OSError, ValueError):
+        stale = True
+
+    try:
+        if stale:
+            GroundingIndex.build(GROUNDING_CORPUS_PATH, GROUNDING_INDEX_DIR)
+        return GroundingIndex(GROUNDING_INDEX_DIR, GROUNDING_CORPUS_PATH)
+    except Exception as e:
+        logger.warning(f"Grounding index unavailable in {GROUNDING_INDEX_DIR} ({e!r}); guides are generated without reference snippets")
+        return None
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, List, Set
+
+from models import Session, HealthGuide, ConversationStageEnum, GuideStatusEnum
+from session_locks import SessionBusyError, SessionGuard, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class GuideTaskPool:
+    """Generate health guides in the background with their state persisted on the session"""
+
+    def __init__(
+        self,
+        db,
+        session_guard: SessionGuard,
+        generate: Callable[[Session], Awaitable[HealthGuide]],
+        max_concurrency: int = None
+    ):
+        self.db = db
+        self.session_guard = session_guard
+        self.generate = generate
+        self.max_concurrency = max_concurrency or int(os.getenv("GUIDE_WORKERS", "4"))
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._single_flight = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Called with (session_id, status) whenever a guide finishes
+        self.listeners: List[Callable[[str, GuideStatusEnum], Awaitable[None]]] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of guide jobs submitted but not yet finished in this worker"""
+        return len(self._tasks)
+
+    def submit(self, session: Session) -> asyncio.Task:
+        """Schedule guide generation for a session whose status is already pending"""
+
+        task = asyncio.create_task(self._run(session))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, session: Session):
+        # Concurrent submits for one session on this worker share a single run
+        await self._single_flight.do(session.id, lambda: self._generate(session))
+
+    async def _generate(self, session: Session):
+        while True:
+            async with self._semaphore:
+                try:
+                    # Only one worker generates a given guide; the others leave it alone
+                    async with self.session_guard.lease.hold(f"guide:{session.id}", wait_seconds=0):
+                        await self.generate(session)
+                    status = GuideStatusEnum.READY
+
+                except SessionBusyError:
+                    status = None
+                except asyncio.CancelledError:
+                    # Left pending in MongoDB so the next startup picks it up again
+                    raise
+                except Exception as e:
+                    logger.error(f"Health guide generation failed for session {session.id}: {e}")
+                    status = GuideStatusEnum.FAILED
+
+            if status is not None:
+                break
+            # A live holder renews its lease and finishes the guide; a crashed one's lease lapses within its TTL
+            if not await self._wait_for_lease(session.id):
+                return
+
+        await self._finish(session.id, status)
+
+    async def _wait_for_lease(self, session_id: str) -> bool:
+        """Sleep until the guide lease lapses; True when the guide is still pending and worth another try"""
+
+        await asyncio.sleep(max(await self.session_guard.lease.expires_in(f"guide:{session_id}"), 0.1))
+        pending = await self.db.sessions.find_one(
+            {"id": session_id, "health_guide_status": GuideStatusEnum.PENDING}, {"_id": 1}
+        )
+        return pending is not None
+
+    async def _finish(self, session_id: str, status: GuideStatusEnum):
+        changes = {"health_guide_status": status, "updated_at": datetime.utcnow()}
+        if status == GuideStatusEnum.READY:
+            changes.update({
+                "health_guide_generated": True,
+                "current_stage": ConversationStageEnum.FEEDBACK
+            })
+
+        # Go through the session guard so the write never races a conversation turn
+        try:
+            async with self.session_guard.hold(session_id):
+                await self._write_status(session_id, changes)
+        except SessionBusyError:
+            # A long turn still holds the session; write anyway rather than leave the guide pending
+            # until a restart (the bumped version makes that turn's own commit conflict, not overwrite)
+            logger.warning(f"Session {session_id} busy, recording health guide status {status.value} without the guard")
+            await self._write_status(session_id, changes)
+
+        for listener in self.listeners:
+            try:
+                await listener(session_id, status)
+            except Exception as e:
+                logger.warning(f"Health guide listener failed for session {session_id}: {e}")
+
+    async def _write_status(self, session_id: str, changes: dict):
+        await self.db.sessions.update_one(
+            {"id": session_id, "health_guide_status": GuideStatusEnum.PENDING},
+            {"$set": changes, "$inc": {"version": 1}}
+        )
+
+    async def resume_pending(self):
+        """Resubmit guides left pending by a previous process"""
+
+        cursor = self.db.sessions.find({"health_guide_status": GuideStatusEnum.PENDING})
+        async for session_data in cursor:
+            self.submit(Session(**session_data))
+
+    async def shutdown(self):
+        """Cancel running jobs; their sessions stay pending for the next startup"""
+
+        self._single_flight.cancel_all()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import common, monitoring
+
+from session_locks import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+READYZ_CACHE_SECONDS = float(os.getenv("READYZ_CACHE_SECONDS", "2"))
+READYZ_MONGO_TIMEOUT_SECONDS = float(os.getenv("READYZ_MONGO_TIMEOUT_SECONDS", "1"))
+READYZ_MAX_PDF_QUEUE = int(os.getenv("READYZ_MAX_PDF_QUEUE", "20"))
+# The LLM is shared by every worker and degraded mode still answers early turns, so by default it only reports
+READYZ_REQUIRE_LLM = os.getenv("READYZ_REQUIRE_LLM", "").lower() in ("1", "true", "yes")
+
+# A check returns whether it passes and what it saw
+Check = Callable[[], Awaitable[Tuple[bool, Dict[str, Any]]]]
+
+
+class _Pool:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool usage per server, fed by PyMongo's pool events.
+
+    Events arrive on PyMongo's threads, so the counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Any, _Pool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, address) -> _Pool:
+        return self._pools.setdefault(address, _Pool(common.MAX_POOL_SIZE))
+
+    def pool_created(self, event):
+        with self._lock:
+            # maxPoolSize is only listed when it differs from the default; 0 means unbounded
+            self._pools[event.address] = _Pool(event.options.get("maxPoolSize", common.MAX_POOL_SIZE))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(event.address, None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address).open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.open = max(pool.open - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._pool(event.address).waiting += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.waiting = max(pool.waiting - 1, 0)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.waiting = max(pool.waiting - 1, 0)
+            pool.checked_out += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.checked_out = max(pool.checked_out - 1, 0)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = list(self._pools.values())
+        saturation = max((pool.checked_out / pool.max_size for pool in pools if pool.max_size), default=0.0)
+        return {
+            "servers": len(pools),
+            "open": sum(pool.open for pool in pools),
+            "checked_out": sum(pool.checked_out for pool in pools),
+            "waiting": sum(pool.waiting for pool in pools),
+            "max_pool_size": max((pool.max_size for pool in pools), default=common.MAX_POOL_SIZE),
+            "saturation": round(saturation, 3),
+            # Every connection of some pool is in use and requests are queueing for one
+            "saturated": any(pool.max_size and pool.checked_out >= pool.max_size and pool.waiting for pool in pools)
+        }
+
+
+def mongo_check(client, pool_monitor: PoolMonitor, timeout: float = READYZ_MONGO_TIMEOUT_SECONDS) -> Check:
+    async def check():
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(client.admin.command("ping"), timeout)
+            details = {"ping_ms": round((time.perf_counter() - started) * 1000, 1)}
+            reachable = True
+        except Exception as e:
+            # The probe is unauthenticated: the full error (with server addresses) only goes to the log
+            logger.warning(f"Readiness: Mongo ping failed: {e!r}")
+            details = {"error": type(e).__name__}
+            reachable = False
+        pool = pool_monitor.stats
+        return reachable and not pool["saturated"], {**details, "pool": pool}
+    return check
+
+
+def llm_check(slo, required: bool = READYZ_REQUIRE_LLM) -> Check:
+    async def check():
+        stats = slo.stats
+        # Open while degraded: early turns are answered locally and the LLM only gets probe calls
+        circuit = "open" if slo.degraded else "closed"
+        return not (required and slo.degraded), {"circuit": circuit, **stats}
+    return check
+
+
+def pdf_check(render_pool, guide_tasks, max_queue: int = READYZ_MAX_PDF_QUEUE) -> Check:
+    async def check():
+        details = {
+            "render_workers": render_pool.max_workers,
+            "render_in_flight": render_pool.in_flight,
+            "render_queue_depth": render_pool.queue_depth,
+            "render_max_queue": max_queue,
+            "guide_queue_depth": guide_tasks.queue_depth
+        }
+        return render_pool.queue_depth <= max_queue, details
+    return check
+
+
+class ReadinessProbe:
+    """Run the dependency checks, caching the result briefly.
+
+    Load balancers probe every worker every few seconds; within the cache
+    window they get the last result, and concurrent probes share one run.
+    """
+
+    def __init__(self, checks: Dict[str, Check], cache_seconds: float = READYZ_CACHE_SECONDS):
+        self.checks = checks
+        self.cache_seconds = cache_seconds
+        self._single_flight = SingleFlight()
+        self._result: Optional[Tuple[bool, Dict[str, Any]]] = None
+        self._expires = 0.0
+
+    async def _run(self) -> Tuple[bool, Dict[str, Any]]:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self.checks[name]() for name in names))
+
+        ready = all(ok for ok, _ in results)
+        report = {
+            "status": "ready" if ready else "not_ready",
+            "checked_at": datetime.utcnow(),
+            "checks": {name: {"ok": ok, **details} for name, (ok, details) in zip(names, results)}
+        }
+        self._result = (ready, report)
+        self._expires = time.monotonic() + self.cache_seconds
+        return self._result
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        if self._result is not None and time.monotonic() < self._expires:
+            return self._result
+        return await self._single_flight.do("readiness", self._run)
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from bson import Binary
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+from pymongo.errors import DuplicateKeyError
+from starlette.datastructures import Headers
+
+from fast_json import dumps
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+IN_PROGRESS = "in_progress"
+DONE = "done"
+
+
+class IdempotencyKeyReusedError(Exception):
+    """The key was already used for a request with a different payload"""
+
+
+class IdempotencyInProgressError(Exception):
+    """The original request is still running after the wait limit"""
+
+
+class StoredResponse:
+    def __init__(self, body: bytes, status_code: int = 200, replayed: bool = False):
+        self.body = body
+        self.status_code = status_code
+        self.replayed = replayed
+
+    def to_response(self) -> Response:
+        headers = {REPLAYED_HEADER: "true"} if self.replayed else None
+        return Response(content=self.body, status_code=self.status_code, media_type="application/json", headers=headers)
+
+
+def store_key(path: str, key: str) -> str:
+    return f"{path}:{key}"
+
+
+def request_hash(path: str, payload: Optional[BaseModel]) -> str:
+    body = dumps(payload) if payload is not None else b""
+    return hashlib.blake2b(path.encode() + b"\0" + body, digest_size=16).hexdigest()
+
+
+class IdempotencyStore:
+    """Responses of successful POSTs stored under their Idempotency-Key in MongoDB.
+
+    The first request inserts an in-progress record and computes; repeats wait
+    for it and replay the stored body. Failures release the key so a retry
+    computes again. A record left in progress by a crashed worker is taken
+    over once its lease expires.
+    """
+
+    def __init__(self, collection, ttl_seconds: float = None, lease_seconds: float = None, wait_seconds: float = None):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds or float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        self.lease_seconds = lease_seconds or float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "120"))
+        self.wait_seconds = wait_seconds or float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "60"))
+
+    async def ensure_indexes(self):
+        """Expire stored responses after the TTL and abandoned leases after theirs"""
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def exists(self, key: str) -> bool:
+        return await self.collection.find_one({"_id": key}, {"_id": 1}) is not None
+
+    async def run(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> StoredResponse:
+        owner = str(uuid.uuid4())
+        now = datetime.utcnow()
+
+        try:
+            await self.collection.insert_one({
+                "_id": key,
+                "request_hash": fingerprint,
+                "state": IN_PROGRESS,
+                "owner": owner,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.lease_seconds)
+            })
+        except DuplicateKeyError:
+            return await self._await_existing(key, fingerprint, compute)
+
+        return await self._execute(key, owner, compute)
+
+    async def _execute(self, key: str, owner: str, compute: Callable[[], Awaitable[Any]]) -> StoredResponse:
+        try:
+            body = dumps(await compute())
+        except BaseException:
+            await self.collection.delete_one({"_id": key, "owner": owner})
+            raise
+
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key, "owner": owner},
+            {"$set": {
+                "state": DONE,
+                "status_code": 200,
+                "body": Binary(body),
+                "completed_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds)
+            }}
+        )
+        return StoredResponse(body)
+
+    async def _await_existing(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> StoredResponse:
+        deadline = asyncio.get_running_loop().time() + self.wait_seconds
+        delay = 0.05
+
+        while True:
+            record = await self.collection.find_one({"_id": key})
+
+            if record is None:
+                # The original failed and released the key: this request becomes the original
+                return await self.run(key, fingerprint, compute)
+
+            if record["request_hash"] != fingerprint:
+                raise IdempotencyKeyReusedError(key)
+
+            if record["state"] == DONE:
+                return StoredResponse(bytes(record["body"]), record.get("status_code", 200), replayed=True)
+
+            if record["expires_at"] < datetime.utcnow():
+                owner = str(uuid.uuid4())
+                claimed = await self.collection.find_one_and_update(
+                    {"_id": key, "owner": record["owner"], "state": IN_PROGRESS},
+                    {"$set": {"owner": owner, "expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                )
+                if claimed:
+                    return await self._execute(key, owner, compute)
+
+            if asyncio.get_running_loop().time() >= deadline:
+                raise IdempotencyInProgressError(key)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+
+def is_retry(store: IdempotencyStore) -> Callable[[dict], Awaitable[bool]]:
+    """Whether an HTTP request carries an Idempotency-Key that already has a record (done or in progress).
+
+    Such a request replays the stored response or waits for it instead of
+    computing, so the rate limiter can charge it as a read.
+    """
+
+    async def check(scope) -> bool:
+        key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return False
+        try:
+            return await store.exists(store_key(scope["path"], key))
+        except Exception:
+            # Unknown: charge it as a new request
+            return False
+    return check
+
+
+async def idempotent(
+    store: IdempotencyStore,
+    request: Request,
+    payload: Optional[BaseModel],
+    compute: Callable[[], Awaitable[Any]],
+    refresh: Optional[Callable[[dict], dict]] = None
+) -> Any:
+    """Run compute once per Idempotency-Key for this path; requests without the header run as usual.
+
+    refresh rewrites a replayed body, for fields that go stale while the record lives (e.g. presigned URLs).
+    """
+
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return await compute()
+
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} printable characters")
+
+    path = request.url.path
+    try:
+        stored = await store.run(store_key(path, key), request_hash(path, payload), compute)
+    except IdempotencyKeyReusedError:
+        raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+    except IdempotencyInProgressError:
+        raise HTTPException(status_code=409, detail="The original request with this Idempotency-Key is still being processed")
+
+    if stored.replayed and refresh is not None:
+        stored.body = dumps(refresh(orjson.loads(stored.body)))
+    return stored.to_response()
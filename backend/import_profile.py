@@ -0,0 +1,77 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+BACKEND_DIR = Path(__file__).parent
+
+# "import time:  self [us] | cumulative | imported package", nested imports indented two spaces a level
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str = "server", env: Optional[Dict[str, str]] = None) -> List[ImportTiming]:
+    """Import module in a fresh interpreter with `-X importtime` and parse its report"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append(ImportTiming(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def direct_imports(timings: List[ImportTiming], module: str) -> List[ImportTiming]:
+    """Imports made by module itself; importtime lists children just before their parent"""
+
+    for index, timing in enumerate(timings):
+        if timing.module == module:
+            children = []
+            for child in reversed(timings[:index]):
+                if child.depth <= timing.depth:
+                    break
+                if child.depth == timing.depth + 1:
+                    children.append(child)
+            return children
+    return []
+
+
+def summarize(timings: List[ImportTiming], module: str = "server", top: int = 15) -> dict:
+    """Total import time, the packages it is spent in, and the slowest imports made by the module itself"""
+
+    packages: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        packages[timing.module.split(".")[0]] += timing.self_us
+
+    # Top-level entries cover interpreter startup (site) as well as the module
+    total_us = sum(timing.cumulative_us for timing in timings if timing.depth == 0)
+    return {
+        "total_seconds": total_us / 1e6,
+        "modules": len(timings),
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top],
+        "slowest": sorted(direct_imports(timings, module), key=lambda timing: timing.cumulative_us, reverse=True)[:top]
+    }
+
+
+def imported_modules(timings: List[ImportTiming]) -> set:
+    return {timing.module for timing in timings}
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyService:
+    """A service built on first use, so workers that never need it never import it.
+
+    The factory does the heavy imports and construction. Attribute access
+    builds the service in the calling thread; `ready()` builds it in a worker
+    thread, so request handlers and warm-up can await it without blocking the
+    event loop.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str):
+        self._factory = factory
+        self._name = name
+        self._service: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._service is not None
+
+    def load(self) -> Any:
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    started = time.perf_counter()
+                    self._service = self._factory()
+                    logger.info(f"Loaded {self._name} in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return self._service
+
+    async def ready(self) -> Any:
+        if self._service is None:
+            await asyncio.to_thread(self.load)
+        return self._service
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
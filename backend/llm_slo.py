@@ -0,0 +1,121 @@
+import logging
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NORMAL = "normal"
+DEGRADED = "degraded"
+
+
+class LatencySLOController:
+    """Switch conversation turns to local responses while the LLM misses its latency SLO.
+
+    Tracks the rolling p95 of LLM latency (timeouts and errors count at their
+    elapsed time). Degraded mode starts once p95 exceeds the SLO and ends only
+    when p95 falls below SLO x recovery ratio, so the mode does not flap. While
+    degraded, one turn per probe interval still goes to the LLM so recovery is
+    noticed.
+    """
+
+    def __init__(
+        self,
+        slo_seconds: float = None,
+        recovery_ratio: float = None,
+        window_seconds: float = None,
+        min_samples: int = None,
+        probe_seconds: float = None,
+        timeout_seconds: float = None
+    ):
+        self.slo_seconds = slo_seconds or float(os.getenv("LLM_SLO_P95_SECONDS", "8"))
+        self.recovery_ratio = recovery_ratio or float(os.getenv("LLM_SLO_RECOVERY_RATIO", "0.75"))
+        self.window_seconds = window_seconds or float(os.getenv("LLM_SLO_WINDOW_SECONDS", "300"))
+        self.min_samples = min_samples or int(os.getenv("LLM_SLO_MIN_SAMPLES", "10"))
+        self.probe_seconds = probe_seconds or float(os.getenv("LLM_PROBE_SECONDS", "15"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+
+        self.mode = NORMAL
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._last_probe = 0.0
+        self._mode_since = datetime.utcnow()
+        self.counters: Dict[str, int] = {
+            "llm_calls": 0,
+            "llm_timeouts": 0,
+            "llm_errors": 0,
+            "local_responses": 0,
+            "probes": 0,
+            "switches_to_degraded": 0,
+            "switches_to_normal": 0
+        }
+
+    @property
+    def degraded(self) -> bool:
+        return self.mode == DEGRADED
+
+    def _prune(self, now: float):
+        while self._samples and self._samples[0][0] < now - self.window_seconds:
+            self._samples.popleft()
+
+    def p95(self) -> Optional[float]:
+        self._prune(time.monotonic())
+        if len(self._samples) < self.min_samples:
+            return None
+        latencies = sorted(latency for _, latency in self._samples)
+        return latencies[math.ceil(0.95 * len(latencies)) - 1]
+
+    def _switch(self, mode: str, p95: float):
+        self.mode = mode
+        self._mode_since = datetime.utcnow()
+        self.counters[f"switches_to_{mode}"] += 1
+        logger.warning(f"LLM p95 latency {p95:.2f}s (SLO {self.slo_seconds:.2f}s): switching to {mode} mode")
+
+    def record(self, latency: float, outcome: str = "ok"):
+        """Add one LLM call; outcome is ok, timeout or error"""
+
+        self.counters["llm_calls"] += 1
+        if outcome == "timeout":
+            self.counters["llm_timeouts"] += 1
+        elif outcome == "error":
+            self.counters["llm_errors"] += 1
+
+        self._samples.append((time.monotonic(), latency))
+        p95 = self.p95()
+        if p95 is None:
+            return
+        if self.mode == NORMAL and p95 > self.slo_seconds:
+            self._switch(DEGRADED, p95)
+        elif self.mode == DEGRADED and p95 < self.slo_seconds * self.recovery_ratio:
+            self._switch(NORMAL, p95)
+
+    def allow_llm(self) -> bool:
+        """Whether a turn that has a local alternative should call the LLM"""
+
+        if not self.degraded:
+            return True
+        now = time.monotonic()
+        if now - self._last_probe >= self.probe_seconds:
+            self._last_probe = now
+            self.counters["probes"] += 1
+            return True
+        return False
+
+    def record_local(self):
+        self.counters["local_responses"] += 1
+
+    @property
+    def stats(self) -> Dict:
+        p95 = self.p95()
+        return {
+            "mode": self.mode,
+            "mode_since": self._mode_since,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "samples": len(self._samples),
+            "slo_seconds": self.slo_seconds,
+            "recovery_seconds": round(self.slo_seconds * self.recovery_ratio, 3),
+            "timeout_seconds": self.timeout_seconds,
+            **self.counters
+        }
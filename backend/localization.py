@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple, Union
+
+from models import LanguageEnum
+
+logger = logging.getLogger(__name__)
+
+LOCALES_DIR = Path(__file__).parent / "locales"
+DEFAULT_LANGUAGE = LanguageEnum.ENGLISH
+
+
+def _flatten(messages: dict, prefix: str = "") -> Dict[str, Union[str, tuple]]:
+    """Turn nested message groups into dotted keys ("stage_context.greeting")"""
+
+    flat = {}
+    for key, value in messages.items():
+        dotted = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{dotted}."))
+        elif isinstance(value, list):
+            flat[dotted] = tuple(value)
+        else:
+            flat[dotted] = value
+    return flat
+
+
+def _language_code(language) -> str:
+    if language is None:
+        return DEFAULT_LANGUAGE.value
+    return getattr(language, "value", language)
+
+
+class MessageCatalog:
+    """Immutable (key, language) -> text table compiled from the locale files"""
+
+    def __init__(self, table: Mapping[Tuple[str, str], Union[str, tuple]], missing: Mapping[str, Tuple[str, ...]]):
+        self._table = table
+        self.missing = missing
+
+    @classmethod
+    def compile(cls, locales_dir: Path = LOCALES_DIR, strict: bool = False) -> "MessageCatalog":
+        """Load every language file, fill gaps from English and report them"""
+
+        with open(locales_dir / f"{DEFAULT_LANGUAGE.value}.json", encoding="utf-8") as f:
+            reference = _flatten(json.load(f))
+
+        table = {}
+        missing = {}
+
+        for language in LanguageEnum:
+            path = locales_dir / f"{language.value}.json"
+            messages = {}
+            if path.exists():
+                with open(path, encoding="utf-8") as f:
+                    messages = _flatten(json.load(f))
+
+            unknown = sorted(set(messages) - set(reference))
+            if unknown:
+                logger.warning(f"Locale {language.value} has keys not in {DEFAULT_LANGUAGE.value}: {', '.join(unknown)}")
+
+            gaps = tuple(sorted(key for key in reference if key not in messages))
+            if gaps:
+                missing[language.value] = gaps
+
+            for key, text in reference.items():
+                table[(key, language.value)] = messages.get(key, text)
+
+        if missing:
+            summary = "; ".join(f"{language}: {len(keys)} missing" for language, keys in missing.items())
+            if strict:
+                raise ValueError(f"Incomplete translations ({summary})")
+            logger.warning(
+                f"Incomplete translations, falling back to {DEFAULT_LANGUAGE.value} "
+                f"and not offering them for new sessions ({summary})"
+            )
+
+        return cls(MappingProxyType(table), MappingProxyType(missing))
+
+    def get(self, key: str, language) -> Union[str, tuple]:
+        """Look up a message, returning the English text where no translation exists"""
+        return self._table[(key, _language_code(language))]
+
+    def format(self, key: str, language, **values) -> str:
+        return self.get(key, language).format(**values)
+
+    def is_translated(self, key: str, language) -> bool:
+        return key not in self.missing.get(_language_code(language), ())
+
+    def is_complete(self, language) -> bool:
+        """Whether every message has a translation, so the language can be offered to users"""
+        return _language_code(language) not in self.missing
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> MessageCatalog:
+    """Compile the catalog once per process"""
+    return MessageCatalog.compile(strict=os.getenv("CATALOG_STRICT", "").lower() in ("1", "true", "yes"))
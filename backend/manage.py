@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Dr. Arogya backend
+
+    python manage.py --help
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import typer
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+cli = typer.Typer(no_args_is_help=True)
+
+
+@cli.callback()
+def main():
+    """Dr. Arogya maintenance commands"""
+
+
+def _database():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    return client, client[os.environ['DB_NAME']]
+
+
+@cli.command("rebuild-feedback-rollups")
+def rebuild_feedback_rollups():
+    """Recompute the feedback analytics rollups from raw feedback"""
+
+    from feedback_rollups import FeedbackRollups
+
+    async def run():
+        client, db = _database()
+        try:
+            await FeedbackRollups.ensure_indexes(db.sessions)
+            return await FeedbackRollups(db.feedback_rollups).rebuild(db.feedback)
+        finally:
+            client.close()
+
+    count = asyncio.run(run())
+    typer.echo(f"Rebuilt {count} feedback rollups")
+
+
+@cli.command("index-existing-reports")
+def index_existing_reports():
+    """Add reports already in storage to the report index, so they can be downloaded and expire"""
+
+    from report_retention import ReportIndex
+    from report_storage import create_report_storage
+
+    async def run():
+        client, db = _database()
+        try:
+            index = ReportIndex(db.reports, create_report_storage())
+            await index.ensure_indexes()
+            return await index.backfill()
+        finally:
+            client.close()
+
+    summary = asyncio.run(run())
+    typer.echo(f"Indexed {summary['indexed']} of {summary['files']} stored reports ({summary['skipped']} not recognised)")
+
+
+@cli.command("export-ndjson")
+def export_ndjson(
+    output: Path = typer.Argument(..., help="File to write; an interrupted export to it is resumed"),
+    gzip: bool = typer.Option(False, help="Gzip the output"),
+    batch_size: int = typer.Option(500, min=1, max=5000, help="Sessions per batch"),
+    checkpoint_file: Optional[Path] = typer.Option(None, help="Defaults to OUTPUT.checkpoint.json")
+):
+    """Export sessions with their messages and health guides as NDJSON"""
+
+    from ndjson_export import ExportCheckpoint, NDJSONFileWriter, ensure_indexes, export_records
+
+    checkpoint_file = checkpoint_file or output.with_name(output.name + ".checkpoint.json")
+
+    # Resume after the last complete batch, dropping anything written past it
+    after, offset = None, 0
+    if checkpoint_file.exists() and output.exists():
+        saved = json.loads(checkpoint_file.read_text())
+        after, offset = ExportCheckpoint.from_dict(saved), saved["offset"]
+        typer.echo(f"Resuming after session {after.id} ({saved['sessions']} sessions already exported)", err=True)
+
+    async def run(file):
+        client, db = _database()
+        try:
+            await ensure_indexes(db)
+            writer = NDJSONFileWriter(file, gzip=gzip)
+            progress = {}
+            async for record in export_records(db, after, batch_size):
+                writer.write(record)
+                if record["type"] == "checkpoint":
+                    progress = record["data"]
+                    saved = {**progress, "after_created_at": progress["after_created_at"].isoformat(), "offset": writer.commit()}
+                    checkpoint_file.write_text(json.dumps(saved))
+            writer.commit()
+            return progress
+        finally:
+            client.close()
+
+    with open(output, "r+b" if offset else "wb") as file:
+        file.truncate(offset)
+        file.seek(offset)
+        progress = asyncio.run(run(file))
+
+    checkpoint_file.unlink(missing_ok=True)
+    typer.echo(f"Exported {progress.get('sessions', 0)} sessions and {progress.get('messages', 0)} messages in this run", err=True)
+
+
+@cli.command("symptom-analytics")
+def symptom_analytics(
+    chunk_size: int = typer.Option(50000, min=1000, help="Sessions processed per chunk")
+):
+    """Recompute symptom co-occurrence and per-language outcome statistics for dashboards"""
+
+    from pymongo import MongoClient
+    from symptom_analytics import run
+
+    client = MongoClient(os.environ['MONGO_URL'])
+    try:
+        summary = run(client[os.environ['DB_NAME']], chunk_size=chunk_size)
+    finally:
+        client.close()
+
+    typer.echo(
+        f"Processed {summary['sessions']} sessions in {summary['duration_seconds']}s: "
+        f"{summary['symptoms_written']} symptoms, {summary['languages_written']} languages written"
+    )
+
+
+@cli.command("build-grounding-index")
+def build_grounding_index(
+    corpus: Optional[Path] = typer.Option(None, help="Corpus JSONL (defaults to the bundled data/grounding_corpus.jsonl)"),
+    output: Optional[Path] = typer.Option(None, help="Index directory (defaults to GROUNDING_INDEX_DIR)")
+):
+    """Build the BM25 index of reference snippets used to ground health guides"""
+
+    from grounding import GROUNDING_CORPUS_PATH, GROUNDING_INDEX_DIR, GroundingIndex
+
+    output = output or GROUNDING_INDEX_DIR
+    GroundingIndex.build(corpus or GROUNDING_CORPUS_PATH, output)
+    meta = json.loads((output / "meta.json").read_text(encoding="utf-8"))
+    typer.echo(f"Indexed {meta['documents']} documents, {meta['terms']} terms into {output}")
+
+
+@cli.command("import-time")
+def import_time(
+    module: str = typer.Argument("server", help="Backend module to import"),
+    top: int = typer.Option(15, min=1, help="Packages and imports to list")
+):
+    """Summarise `python -X importtime` for a cold import of a backend module"""
+
+    from import_profile import profile_imports, summarize
+
+    summary = summarize(profile_imports(module), module, top)
+    typer.echo(f"import {module}: {summary['total_seconds'] * 1000:.0f}ms, {summary['modules']} modules")
+
+    typer.echo("\nTime by package (self):")
+    for package, self_us in summary["packages"]:
+        typer.echo(f"  {self_us / 1000:8.1f}ms  {package}")
+
+    typer.echo(f"\nSlowest imports made by {module} (cumulative):")
+    for timing in summary["slowest"]:
+        typer.echo(f"  {timing.cumulative_us / 1000:8.1f}ms  {timing.module}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import uuid
@@ -23,6 +23,11 @@ class ConversationStageEnum(str, Enum):
     FEEDBACK = "feedback"
     EMERGENCY_ALERT = "emergency_alert"
 
+class GuideStatusEnum(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
 class SeverityEnum(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
@@ -53,8 +58,10 @@ class Session(BaseModel):
     severity_level: Optional[SeverityEnum] = None
     emergency_detected: bool = False
     health_guide_generated: bool = False
+    health_guide_status: Optional[GuideStatusEnum] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0  # Bumped on every write, used for optimistic concurrency
     metadata: Dict[str, Any] = {}
 
 class CreateSessionRequest(BaseModel):
@@ -69,6 +76,7 @@ class TraditionalRemedy(BaseModel):
     usage: str
     benefits: str
     language: LanguageEnum
+    contraindications: List[str] = []  # e.g. "pregnancy", "dairy_allergy"
 
 class HealthGuide(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -112,6 +120,8 @@ class Feedback(BaseModel):
     comments: Optional[str] = None
     helpful_aspects: Optional[List[str]] = []
     improvement_suggestions: Optional[str] = None
+    language: Optional[LanguageEnum] = None
+    stage: Optional[ConversationStageEnum] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class CreateFeedbackRequest(BaseModel):
@@ -130,6 +140,18 @@ class PDFReportResponse(BaseModel):
     filename: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ExportReportsRequest(BaseModel):
+    start: datetime
+    end: datetime
+    language: Optional[LanguageEnum] = None
+    include_chat_history: bool = True
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start >= self.end:
+            raise ValueError("start must be before end")
+        return self
+
 # Response Models
 class ApiResponse(BaseModel):
     success: bool
@@ -0,0 +1,159 @@
+import logging
+import os
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+from fast_json import dumps
+from read_models import NO_ID
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+CHUNK_SIZE = 64 * 1024
+
+SESSION_ORDER = [("created_at", 1), ("id", 1)]
+MESSAGE_ORDER = [("session_id", 1), ("timestamp", 1)]
+
+
+class ExportCheckpoint:
+    """Position of an export in (created_at, id) order; everything up to and including it has been written"""
+
+    def __init__(self, created_at: datetime, id: str):
+        self.created_at = created_at
+        self.id = id
+
+    def query(self) -> dict:
+        return {"$or": [
+            {"created_at": {"$gt": self.created_at}},
+            {"created_at": self.created_at, "id": {"$gt": self.id}}
+        ]}
+
+    def as_dict(self) -> Dict:
+        return {"after_created_at": self.created_at, "after_id": self.id}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExportCheckpoint":
+        created_at = data["after_created_at"]
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        return cls(created_at, data["after_id"])
+
+
+async def ensure_indexes(db):
+    """Index backing the keyset pagination over sessions"""
+    await db.sessions.create_index(SESSION_ORDER)
+
+
+async def export_records(
+    db,
+    after: Optional[ExportCheckpoint] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[dict]:
+    """Sessions joined with their health guide and messages, as typed records.
+
+    Sessions are read in keyset-paginated batches ordered by (created_at, id),
+    each followed by its guide and messages. The messages of a whole batch come
+    from one cursor over the (session_id, timestamp) index, so memory is bounded
+    by the batch size however many messages are exported. A checkpoint record
+    closes every batch; passing it back as `after` resumes from the next one.
+    """
+
+    sessions_done = messages_done = 0
+
+    while True:
+        query = after.query() if after else {}
+        sessions = await db.sessions.find(query, NO_ID).sort(SESSION_ORDER).limit(batch_size).to_list(batch_size)
+        if not sessions:
+            break
+
+        by_id = {session["id"]: session for session in sessions}
+        guides = {
+            guide["session_id"]: guide
+            async for guide in db.health_guides.find({"session_id": {"$in": list(by_id)}}, NO_ID)
+        }
+
+        def session_records(session_id: str):
+            yield {"type": "session", "data": by_id.pop(session_id)}
+            if session_id in guides:
+                yield {"type": "guide", "data": guides[session_id]}
+
+        messages = db.messages.find({"session_id": {"$in": list(by_id)}}, NO_ID)
+        messages = messages.sort(MESSAGE_ORDER).batch_size(batch_size)
+
+        current = None
+        async for message in messages:
+            if message["session_id"] != current:
+                current = message["session_id"]
+                for record in session_records(current):
+                    yield record
+            messages_done += 1
+            yield {"type": "message", "data": message}
+
+        # Sessions without any messages
+        for session_id in list(by_id):
+            for record in session_records(session_id):
+                yield record
+
+        sessions_done += len(sessions)
+        last = sessions[-1]
+        after = ExportCheckpoint(last["created_at"], last["id"])
+        yield {"type": "checkpoint", "data": {**after.as_dict(), "sessions": sessions_done, "messages": messages_done}}
+
+        if len(sessions) < batch_size:
+            break
+
+    logger.info(f"NDJSON export finished: {sessions_done} sessions, {messages_done} messages")
+
+
+class NDJSONFileWriter:
+    """Append records to a file, each batch ending at a clean offset it can be truncated back to.
+
+    With gzip every batch is its own gzip member; concatenated members are a
+    valid gzip file, so a resumed export simply appends new ones.
+    """
+
+    def __init__(self, file, gzip: bool = False):
+        self.file = file
+        self.gzip = gzip
+        self._compressor = None
+
+    def write(self, record: dict):
+        data = dumps(record) + b"\n"
+        if self.gzip:
+            if self._compressor is None:
+                self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            data = self._compressor.compress(data)
+        self.file.write(data)
+
+    def commit(self) -> int:
+        """End the current batch durably and return the file offset after it"""
+        if self._compressor is not None:
+            self.file.write(self._compressor.flush())
+            self._compressor = None
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+
+async def ndjson_stream(records: AsyncIterator[dict], gzip: bool = False) -> AsyncIterator[bytes]:
+    """Serialise records one JSON document per line, in chunks of roughly CHUNK_SIZE bytes, optionally gzipped"""
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buffer = bytearray()
+
+    async for record in records:
+        buffer += dumps(record)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,233 @@
+import bisect
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib.fonts import addMapping
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph
+
+from models import LanguageEnum
+
+logger = logging.getLogger(__name__)
+
+LATIN = "latin"
+
+# Unicode blocks for the scripts our languages are written in
+SCRIPT_RANGES = {
+    "devanagari": (0x0900, 0x097F),
+    "bengali": (0x0980, 0x09FF),
+    "gujarati": (0x0A80, 0x0AFF),
+    "tamil": (0x0B80, 0x0BFF),
+    "telugu": (0x0C00, 0x0C7F),
+    "kannada": (0x0C80, 0x0CFF),
+}
+
+LANGUAGE_SCRIPTS = {
+    LanguageEnum.ENGLISH: LATIN,
+    LanguageEnum.HINDI: "devanagari",
+    LanguageEnum.MARATHI: "devanagari",
+    LanguageEnum.BENGALI: "bengali",
+    LanguageEnum.GUJARATI: "gujarati",
+    LanguageEnum.TAMIL: "tamil",
+    LanguageEnum.TELUGU: "telugu",
+    LanguageEnum.KANNADA: "kannada",
+}
+
+# Noto font family per script; Latin stays on the built-in Helvetica, which is never embedded
+FONT_FAMILIES = {
+    "devanagari": "NotoSansDevanagari",
+    "bengali": "NotoSansBengali",
+    "gujarati": "NotoSansGujarati",
+    "tamil": "NotoSansTamil",
+    "telugu": "NotoSansTelugu",
+    "kannada": "NotoSansKannada",
+}
+
+FONT_SEARCH_PATHS = [
+    path for path in (
+        os.getenv("FONTS_DIR"),
+        os.path.join(os.path.dirname(__file__), "fonts"),
+        "/usr/share/fonts/truetype/noto",
+        "/usr/share/fonts/noto",
+        "/usr/share/fonts/opentype/noto",
+    ) if path
+]
+
+# The font switch markup() puts around a script run
+FONT_RUN = re.compile(r'<font name="([^"]+)">')
+
+_RANGE_STARTS = sorted((start, end, script) for script, (start, end) in SCRIPT_RANGES.items())
+_STARTS = [start for start, _, _ in _RANGE_STARTS]
+
+
+def _find_font_file(filename: str) -> Optional[str]:
+    for directory in FONT_SEARCH_PATHS:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class FontSet:
+    """Fonts registered with ReportLab for this process, keyed by script"""
+
+    def __init__(self, fonts: Dict[str, Tuple[str, str]]):
+        self._fonts = fonts
+
+    def fonts_for_script(self, script: str) -> Optional[Tuple[str, str]]:
+        """(regular, bold) font names for a script, or None if no font is installed"""
+        return self._fonts.get(script)
+
+    def bold_for(self, regular: str) -> str:
+        """Bold face registered with a regular font name (the name itself when there is none)"""
+        return next((bold for name, bold in self._fonts.values() if name == regular), regular)
+
+    def regular_for(self, font_name: str) -> str:
+        """Regular face of a registered regular or bold font name"""
+        return next((regular for regular, bold in self._fonts.values() if font_name in (regular, bold)), font_name)
+
+    def fonts_for_language(self, language: Optional[LanguageEnum]) -> Tuple[str, str]:
+        script = LANGUAGE_SCRIPTS.get(language, LATIN)
+        return self._fonts.get(script, self._fonts[LATIN])
+
+    @property
+    def scripts(self) -> List[str]:
+        return sorted(self._fonts)
+
+
+@lru_cache(maxsize=1)
+def register_fonts() -> FontSet:
+    """Register a Noto font for every supported script, once per process.
+
+    ReportLab embeds TrueType fonts as subsets, so each PDF only carries the
+    glyphs it actually uses. Scripts without an installed font fall back to
+    Helvetica (and render as missing glyphs) with a warning at startup.
+    """
+
+    fonts = {LATIN: ("Helvetica", "Helvetica-Bold")}
+    missing = []
+
+    for script, family in FONT_FAMILIES.items():
+        regular_path = _find_font_file(f"{family}-Regular.ttf")
+        if regular_path is None:
+            missing.append(family)
+            continue
+
+        bold_path = _find_font_file(f"{family}-Bold.ttf")
+        regular, bold = family, f"{family}-Bold" if bold_path else family
+
+        try:
+            pdfmetrics.registerFont(TTFont(regular, regular_path))
+            if bold_path:
+                pdfmetrics.registerFont(TTFont(bold, bold_path))
+        except Exception as e:
+            logger.warning(f"Could not register {family}: {e}")
+            continue
+
+        # <b> inside a <font name="..."> run picks the bold face
+        addMapping(regular, 0, 0, regular)
+        addMapping(regular, 1, 0, bold)
+        addMapping(regular, 0, 1, regular)
+        addMapping(regular, 1, 1, bold)
+        fonts[script] = (regular, bold)
+
+    if missing:
+        logger.warning(f"PDF fonts not found in {FONT_SEARCH_PATHS}: {', '.join(missing)}; those scripts will not render")
+
+    return FontSet(fonts)
+
+
+def script_of(char: str) -> Optional[str]:
+    """Script of a character, or None for Latin, digits, punctuation and whitespace"""
+
+    codepoint = ord(char)
+    if codepoint < 0x0900:
+        return None
+    position = bisect.bisect_right(_STARTS, codepoint) - 1
+    if position >= 0:
+        start, end, script = _RANGE_STARTS[position]
+        if codepoint <= end:
+            return script
+    return None
+
+
+def markup(text: str) -> str:
+    """Escape plain text for a Paragraph and switch fonts around each non-Latin script run"""
+
+    if text.isascii():
+        return escape(text)
+
+    fonts = register_fonts()
+    parts = []
+    run_script = None
+    run = []
+
+    def flush():
+        if not run:
+            return
+        chunk = escape("".join(run))
+        names = fonts.fonts_for_script(run_script) if run_script else None
+        parts.append(f'<font name="{names[0]}">{chunk}</font>' if names else chunk)
+        run.clear()
+
+    for char in text:
+        script = script_of(char)
+        # Spaces and punctuation stay in the current run so words are not split across fonts
+        if script != run_script and (script is not None or char.isalpha()):
+            flush()
+            run_script = script
+        run.append(char)
+    flush()
+
+    return "".join(parts)
+
+
+_shaped_styles: Dict[Tuple[int, str], Tuple[ParagraphStyle, ParagraphStyle]] = {}
+
+
+def shaped_style(style: ParagraphStyle, text: str) -> ParagraphStyle:
+    """The style to lay out markup() output with, so its script runs are shaped.
+
+    ReportLab only shapes a paragraph (through HarfBuzz) when the style's own
+    font is shapable, whatever fonts its runs switch to. A paragraph with a
+    script run, in a report of any language, is therefore based on the first
+    run's Noto font, which also covers Latin text.
+    """
+
+    if getattr(style, "shaping", 0) and pdfmetrics.getFont(style.fontName).shapable:
+        return style
+
+    for name in FONT_RUN.findall(text):
+        if pdfmetrics.getFont(name).shapable:
+            break
+    else:
+        return style
+
+    key = (id(style), name)
+    cached = _shaped_styles.get(key)
+    if cached is None or cached[0] is not style:
+        derived = ParagraphStyle(f"{style.name}-{name}", parent=style)
+        derived.fontName = register_fonts().bold_for(name) if style.fontName.endswith("Bold") else name
+        derived.shaping = 1
+        # Indic scripts stack matras above and below the line
+        derived.leading = max(style.leading, style.fontSize * 1.5)
+        cached = _shaped_styles[key] = (style, derived)
+    return cached[1]
+
+
+def paragraph(text: str, style: ParagraphStyle) -> Paragraph:
+    """A Paragraph of markup() output whose script runs are shaped"""
+
+    style = shaped_style(style, text)
+    if getattr(style, "shaping", 0):
+        # Runs in the base font's family inherit it (bold included). Switching to the regular face
+        # mid-word would also break shaping, which ReportLab does per word with its first font
+        family = register_fonts().regular_for(style.fontName)
+        text = re.sub(f'<font name="{re.escape(family)}">(.*?)</font>', r"\1", text, flags=re.S)
+    return Paragraph(text, style)
@@ -1,291 +1,276 @@
 import os
-from typing import List, Optional
+import uuid
+from typing import Iterator, List, Optional
 from datetime import datetime
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.platypus import SimpleDocTemplate, Flowable, Spacer, Table, PageBreak
 
 from models import Session, Message, HealthGuide, LanguageEnum
+from pdf_fonts import markup, paragraph, register_fonts
+from report_storage import ReportStorage, LocalReportStorage
+from report_template import (
+    ReportTemplate, get_report_template,
+    HEADER_COLUMN_WIDTHS, HEADER_TABLE_STYLE, CHAT_COLUMN_WIDTHS, CHAT_TABLE_STYLE, CHAT_HEADER_TABLE_STYLE
+)
 
-class PDFService:
-    def __init__(self):
-        # Create reports directory if it doesn't exist
-        self.reports_dir = "/app/backend/reports"
-        os.makedirs(self.reports_dir, exist_ok=True)
-        
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
 
-    def _create_custom_styles(self):
-        """Create custom paragraph styles"""
-        
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#2E86AB'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            spaceBefore=16,
-            textColor=colors.HexColor('#A23B72'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Body text style
-        self.styles.add(ParagraphStyle(
-            name='CustomBodyText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6,
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica'
-        ))
-        
-        # Warning style
-        self.styles.add(ParagraphStyle(
-            name='Warning',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.red,
-            fontName='Helvetica-Bold',
-            spaceAfter=12,
-            spaceBefore=12
-        ))
-        
-        # Traditional remedy style
-        self.styles.add(ParagraphStyle(
-            name='TraditionalRemedy',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#F18F01'),
-            fontName='Helvetica',
-            spaceAfter=8
-        ))
+# Chat history windowing is opt-in: when set, only the first HEAD and last TAIL messages
+# are printed, with a marker counting the ones left out (the 0 and 0 default prints all)
+HISTORY_HEAD = int(os.getenv("PDF_HISTORY_HEAD", "0"))
+HISTORY_TAIL = int(os.getenv("PDF_HISTORY_TAIL", "0"))
+HISTORY_CHUNK_ROWS = int(os.getenv("PDF_HISTORY_CHUNK_ROWS", "40"))
+
+
+class ChunkedFlowable(Flowable):
+    """Pull flowables from an iterator only as the frame has room for them.
+
+    The frame always splits this into the next chunk plus itself, so long
+    sections are laid out page by page instead of all at once.
+    """
+
+    def __init__(self, chunks: Iterator[Flowable]):
+        super().__init__()
+        self._chunks = chunks
+        self._next = next(chunks, None)
+
+    def wrap(self, availWidth, availHeight):
+        if self._next is None:
+            return 0, 0
+        return availWidth, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        chunk = self._next
+        _, height = chunk.wrap(availWidth, availHeight)
+        if height <= availHeight:
+            parts = [chunk]
+        else:
+            # The caller requires the first part to fit on this page
+            parts = chunk.split(availWidth, availHeight)
+            if not parts:
+                return [PageBreak(), self]
+
+        self._next = next(self._chunks, None)
+        return [*parts, self]
+
+    def draw(self):
+        pass
+
+
+class PDFService:
+    def __init__(self, storage: Optional[ReportStorage] = None):
+        # Local disk unless a shared backend is configured
+        self.storage = storage or LocalReportStorage()
+        
+        # Register fonts and compile the default templates before render threads start
+        register_fonts()
+        for language in (LanguageEnum.ENGLISH, LanguageEnum.HINDI):
+            get_report_template(language)
 
     def generate_health_report(
-        self, 
-        session: Session, 
-        health_guide: HealthGuide, 
+        self,
+        session: Session,
+        health_guide: HealthGuide,
         messages: Optional[List[Message]] = None,
         include_chat_history: bool = False
     ) -> str:
         """Generate comprehensive health report PDF"""
         
-        # Generate filename
+        # Generate filename; the suffix keeps concurrent renders of one session in separate files
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dr_arogya_health_report_{session.id}_{timestamp}.pdf"
-        filepath = os.path.join(self.reports_dir, filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            filepath,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
+        filename = f"dr_arogya_health_report_{session.id}_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+        
+        template = get_report_template(health_guide.language)
         
         # Build content
         story = []
         
         # Add header
-        story.extend(self._create_header(session, health_guide))
+        story.extend(self._create_header(session, template))
         
         # Add main health guide sections
-        story.extend(self._create_health_guide_content(health_guide))
+        story.extend(self._create_health_guide_content(health_guide, template))
         
         # Add traditional remedies section
         if health_guide.traditional_remedies:
-            story.extend(self._create_traditional_remedies_section(health_guide))
+            story.extend(self._create_traditional_remedies_section(health_guide, template))
         
         # Add chat history if requested
         if include_chat_history and messages:
-            story.extend(self._create_chat_history_section(messages))
+            story.extend(self._create_chat_history_section(messages, template))
         
         # Add footer
-        story.extend(self._create_footer())
-        
-        # Build PDF
-        doc.build(story)
+        story.extend(self._create_footer(template))
+        
+        # Build PDF straight into the storage backend
+        with self.storage.writer(filename) as output:
+            doc = SimpleDocTemplate(
+                output,
+                pagesize=A4,
+                rightMargin=72,
+                leftMargin=72,
+                topMargin=72,
+                bottomMargin=72
+            )
+            doc.build(story)
         
         return filename
 
-    def _create_header(self, session: Session, health_guide: HealthGuide) -> List:
+    def _create_header(self, session: Session, template: ReportTemplate) -> List:
         """Create PDF header section"""
         
         content = []
         
         # Title
-        title = "Dr. Arogya - Health Consultation Report" if health_guide.language == LanguageEnum.ENGLISH else "डॉ. आरोग्य - स्वास्थ्य सलाह रिपोर्ट"
-        content.append(Paragraph(title, self.styles['CustomTitle']))
+        content.append(template.static("title"))
         content.append(Spacer(1, 20))
         
         # Report details table
         report_data = [
-            ["Session ID:", session.id],
-            ["Generated On:", datetime.now().strftime("%B %d, %Y at %I:%M %p")],
-            ["Language:", session.language.value.title() if session.language else "English"],
-            ["Consultation Stage:", session.current_stage.value.replace('_', ' ').title()]
+            [template.static("detail.session_id"), session.id],
+            [template.static("detail.generated_on"), datetime.now().strftime("%B %d, %Y at %I:%M %p")],
+            [template.static("detail.language"), session.language.value.title() if session.language else "English"],
+            [template.static("detail.stage"), session.current_stage.value.replace('_', ' ').title()]
         ]
         
-        table = Table(report_data, colWidths=[2*inch, 4*inch])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        table = Table(report_data, colWidths=HEADER_COLUMN_WIDTHS)
+        table.setStyle(HEADER_TABLE_STYLE)
         
         content.append(table)
         content.append(Spacer(1, 30))
         
         return content
 
-    def _create_health_guide_content(self, health_guide: HealthGuide) -> List:
+    def _bullets(self, items: List[str], style) -> List:
+        return [paragraph(f"• {markup(item)}", style) for item in items]
+
+    def _create_health_guide_content(self, health_guide: HealthGuide, template: ReportTemplate) -> List:
         """Create main health guide content sections"""
         
+        styles = template.styles
         content = []
         
         # Symptom Summary
-        content.append(Paragraph("🩺 Understanding Your Symptoms", self.styles['SectionHeader']))
-        content.append(Paragraph(health_guide.symptom_summary, self.styles['CustomBodyText']))
+        content.append(template.static("section.symptoms"))
+        content.append(paragraph(markup(health_guide.symptom_summary), styles['CustomBodyText']))
         content.append(Spacer(1, 15))
         
         # Possible Conditions
-        content.append(Paragraph("🔍 Potential Areas for Your Doctor to Explore", self.styles['SectionHeader']))
-        for condition in health_guide.possible_conditions:
-            content.append(Paragraph(f"• {condition}", self.styles['CustomBodyText']))
+        content.append(template.static("section.conditions"))
+        content.extend(self._bullets(health_guide.possible_conditions, styles['CustomBodyText']))
         content.append(Spacer(1, 15))
         
-        # OTC Recommendations  
-        content.append(Paragraph("💊 Over-the-Counter Care Suggestions", self.styles['SectionHeader']))
-        for recommendation in health_guide.otc_recommendations:
-            content.append(Paragraph(f"• {recommendation}", self.styles['CustomBodyText']))
+        # OTC Recommendations
+        content.append(template.static("section.otc"))
+        content.extend(self._bullets(health_guide.otc_recommendations, styles['CustomBodyText']))
         content.append(Spacer(1, 15))
         
         # Warning Signs
-        content.append(Paragraph("⚠️ Important Warning Signs", self.styles['SectionHeader']))
-        content.append(Paragraph(
-            "Please seek immediate medical attention if you experience any of the following:",
-            self.styles['Warning']
-        ))
-        for warning in health_guide.warning_signs:
-            content.append(Paragraph(f"• {warning}", self.styles['Warning']))
+        content.append(template.static("section.warnings"))
+        content.append(template.static("warning_intro"))
+        content.extend(self._bullets(health_guide.warning_signs, styles['Warning']))
         content.append(Spacer(1, 15))
         
         # Dietary Advice
-        content.append(Paragraph("🥗 Nutritional Recommendations", self.styles['SectionHeader']))
-        for advice in health_guide.dietary_advice:
-            content.append(Paragraph(f"• {advice}", self.styles['CustomBodyText']))
+        content.append(template.static("section.diet"))
+        content.extend(self._bullets(health_guide.dietary_advice, styles['CustomBodyText']))
         content.append(Spacer(1, 15))
         
         # Lifestyle Tips
-        content.append(Paragraph("🌤️ Lifestyle Modifications", self.styles['SectionHeader']))
-        for tip in health_guide.lifestyle_tips:
-            content.append(Paragraph(f"• {tip}", self.styles['CustomBodyText']))
+        content.append(template.static("section.lifestyle"))
+        content.extend(self._bullets(health_guide.lifestyle_tips, styles['CustomBodyText']))
         content.append(Spacer(1, 15))
         
         # When to See Doctor
-        content.append(Paragraph("🆘 When to Seek Medical Care", self.styles['SectionHeader']))
-        for guideline in health_guide.when_to_see_doctor:
-            content.append(Paragraph(f"• {guideline}", self.styles['CustomBodyText']))
+        content.append(template.static("section.see_doctor"))
+        content.extend(self._bullets(health_guide.when_to_see_doctor, styles['CustomBodyText']))
         content.append(Spacer(1, 20))
         
         return content
 
-    def _create_traditional_remedies_section(self, health_guide: HealthGuide) -> List:
+    def _create_traditional_remedies_section(self, health_guide: HealthGuide, template: ReportTemplate) -> List:
         """Create traditional remedies section"""
         
+        styles = template.styles
         content = []
         
-        title = "🌿 दादी माँ के नुस्खे (Traditional Grandmother's Remedies)" if health_guide.language == LanguageEnum.ENGLISH else "🌿 पारंपरिक घरेलू नुस्खे"
-        content.append(Paragraph(title, self.styles['SectionHeader']))
-        
-        content.append(Paragraph(
-            "These time-tested traditional remedies have been passed down through generations. "
-            "While they may provide comfort, they should complement, not replace, medical treatment.",
-            self.styles['CustomBodyText']
-        ))
+        content.append(template.static("section.remedies"))
+        content.append(template.static("remedies_intro"))
         content.append(Spacer(1, 12))
         
         for remedy in health_guide.traditional_remedies:
             # Remedy name
-            content.append(Paragraph(f"<b>{remedy.name}</b>", self.styles['TraditionalRemedy']))
-            
+            content.append(paragraph(f"<b>{markup(remedy.name)}</b>", styles['TraditionalRemedy']))
+        
             # Ingredients
-            ingredients_text = "Ingredients: " + ", ".join(remedy.ingredients)
-            content.append(Paragraph(ingredients_text, self.styles['CustomBodyText']))
-            
+            ingredients_text = template.ingredients_prefix + markup(", ".join(remedy.ingredients))
+            content.append(paragraph(ingredients_text, styles['CustomBodyText']))
+        
             # Preparation
-            content.append(Paragraph(f"<b>Preparation:</b> {remedy.preparation}", self.styles['CustomBodyText']))
-            
+            content.append(paragraph(template.preparation_prefix + markup(remedy.preparation), styles['CustomBodyText']))
+        
             # Usage
-            content.append(Paragraph(f"<b>Usage:</b> {remedy.usage}", self.styles['CustomBodyText']))
-            
+            content.append(paragraph(template.usage_prefix + markup(remedy.usage), styles['CustomBodyText']))
+        
             # Benefits
-            content.append(Paragraph(f"<b>Benefits:</b> {remedy.benefits}", self.styles['CustomBodyText']))
-            
+            content.append(paragraph(template.benefits_prefix + markup(remedy.benefits), styles['CustomBodyText']))
+        
             content.append(Spacer(1, 10))
         
         return content
 
-    def _create_chat_history_section(self, messages: List[Message]) -> List:
+    def _create_chat_history_section(self, messages: List[Message], template: ReportTemplate) -> List:
         """Create chat history section"""
         
         content = []
         
         content.append(PageBreak())
-        content.append(Paragraph("💬 Conversation Summary", self.styles['SectionHeader']))
-        content.append(Paragraph(
-            "This section contains a summary of your conversation with Dr. Arogya for your doctor's reference.",
-            self.styles['CustomBodyText']
-        ))
+        content.append(template.static("section.chat"))
+        content.append(template.static("chat_intro"))
         content.append(Spacer(1, 15))
         
-        # Create conversation table
-        chat_data = [["Time", "Speaker", "Message"]]
-        
-        for message in messages:
-            time_str = message.timestamp.strftime("%H:%M")
-            speaker = "You" if message.sender == "user" else "Dr. Arogya"
-            
-            # Truncate long messages
-            message_text = message.content[:200] + "..." if len(message.content) > 200 else message.content
-            
-            chat_data.append([time_str, speaker, message_text])
-        
-        table = Table(chat_data, colWidths=[1*inch, 1.5*inch, 3.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
-        
-        content.append(table)
+        # Rows are laid out a chunk at a time as pages fill, never as one huge table
+        content.append(ChunkedFlowable(self._chat_history_chunks(messages, template)))
         content.append(Spacer(1, 20))
         
         return content
 
-    def _create_footer(self) -> List:
+    def _chat_history_chunks(self, messages: List[Message], template: ReportTemplate) -> Iterator:
+        """Yield the chat history as small tables, skipping the middle of long conversations if windowing is configured"""
+        
+        head, tail = HISTORY_HEAD, HISTORY_TAIL
+        if head + tail and len(messages) > head + tail:
+            windows = [messages[:head], messages[len(messages) - tail:]]
+            omitted = len(messages) - head - tail
+        else:
+            windows = [messages]
+            omitted = 0
+        
+        cell_style = template.styles['ChatCell']
+        
+        for index, window in enumerate(windows):
+            if index:
+                yield template.messages_omitted(omitted)
+        
+            for start in range(0, len(window), HISTORY_CHUNK_ROWS):
+                rows = []
+                with_header = start == 0
+                if with_header:
+                    rows.append(template.chat_header_row())
+        
+                for message in window[start:start + HISTORY_CHUNK_ROWS]:
+                    time_str = message.timestamp.strftime("%H:%M")
+                    speaker = template.static("speaker.user" if message.sender == "user" else "speaker.dr_arogya")
+        
+                    # Truncate long messages
+                    message_text = message.content[:200] + "..." if len(message.content) > 200 else message.content
+        
+                    rows.append([time_str, speaker, paragraph(markup(message_text), cell_style)])
+        
+                table = Table(rows, colWidths=CHAT_COLUMN_WIDTHS, repeatRows=1 if with_header else 0)
+                table.setStyle(CHAT_HEADER_TABLE_STYLE if with_header else CHAT_TABLE_STYLE)
+                yield table
+
+    def _create_footer(self, template: ReportTemplate) -> List:
         """Create PDF footer section"""
         
         content = []
@@ -293,42 +278,14 @@ class PDFService:
         content.append(Spacer(1, 30))
         
         # Disclaimer
-        disclaimer = """
-        <b>IMPORTANT MEDICAL DISCLAIMER</b><br/><br/>
-        This report is generated by Dr. Arogya, an AI health assistant, and is intended for informational purposes only. 
-        It does not constitute medical advice, diagnosis, or treatment. Always consult with qualified healthcare 
-        professionals for medical concerns. In case of medical emergencies, contact your local emergency services immediately.<br/><br/>
-        
-        <b>About Dr. Arogya:</b> An AI-powered health companion designed to help you prepare for medical consultations 
-        and provide supportive health information. This system combines modern AI technology with traditional 
-        wellness wisdom to support your healthcare journey.<br/><br/>
-        
-        Generated by Arogya AI - Your Digital Health Companion
-        """
-        
-        content.append(Paragraph(disclaimer, self.styles['CustomBodyText']))
+        content.append(template.static("disclaimer"))
         
         return content
 
-    def get_report_path(self, filename: str) -> str:
-        """Get full path to generated report"""
-        return os.path.join(self.reports_dir, filename)
+    def get_report_path(self, filename: str) -> Optional[str]:
+        """Get full path to generated report when it is stored on local disk"""
+        return self.storage.local_path(filename)
 
-    def cleanup_old_reports(self, days_old: int = 7):
-        """Clean up reports older than specified days"""
-        
-        try:
-            import glob
-            import time
-            
-            current_time = time.time()
-            
-            for filepath in glob.glob(os.path.join(self.reports_dir, "*.pdf")):
-                creation_time = os.path.getctime(filepath)
-                
-                if (current_time - creation_time) > (days_old * 24 * 3600):
-                    os.remove(filepath)
-                    print(f"Cleaned up old report: {filepath}")
-                    
-        except Exception as e:
-            print(f"Error cleaning up reports: {e}")
\ No newline at end of file
+    def get_report_url(self, filename: str) -> str:
+        """URL clients download the report from (presigned for object storage)"""
+        return self.storage.url(filename)
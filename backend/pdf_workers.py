@@ -0,0 +1,34 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+
+class RenderPool:
+    """Bounded thread pool for ReportLab renders so they never block the event loop"""
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv("PDF_WORKERS", "2"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-render")
+        self._submitted = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Renders waiting for a free worker"""
+        return max(self._submitted - self.max_workers, 0)
+
+    @property
+    def in_flight(self) -> int:
+        return self._submitted
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        self._submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        finally:
+            self._submitted -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,357 @@
+import asyncio
+import ipaddress
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.datastructures import Headers, MutableHeaders
+
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+LLM = "llm"
+READ = "read"
+
+# Turns that reach the LLM (or may generate a guide); every other API request uses the read budget
+LLM_ROUTES = [
+    ("POST", re.compile(r"^/api/sessions/[^/]+/messages$")),
+    ("POST", re.compile(r"^/api/sessions/[^/]+/generate-pdf$")),
+]
+SESSION_PATH = re.compile(r"^/api/(?:ws/)?sessions/([^/]+)")
+EXEMPT_PATH = re.compile(r"^/api/(?:admin/|$)")
+
+# Proxies whose X-Forwarded-For is believed, as comma-separated addresses or CIDRs (e.g. the ingress's
+# pod network). Behind an ingress every request comes from the ingress, so without this all clients share
+# one IP bucket; RATE_LIMIT_ENABLED=auto (the default) therefore only limits once it is set.
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",") if network.strip()
+]
+MAX_LOCAL_BUCKETS = 100_000
+
+
+class RateLimitPolicy:
+    """Token bucket parameters: `burst` tokens, refilled at `per_minute` tokens a minute"""
+
+    def __init__(self, name: str, burst: int, per_minute: float):
+        self.name = name
+        self.burst = burst
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+
+    @classmethod
+    def from_env(cls, name: str, burst: int, per_minute: float) -> "RateLimitPolicy":
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        return cls(
+            name,
+            int(os.getenv(f"{prefix}_BURST", str(burst))),
+            float(os.getenv(f"{prefix}_PER_MINUTE", str(per_minute)))
+        )
+
+    @property
+    def header(self) -> str:
+        return f"{self.per_minute:g};w=60;burst={self.burst}"
+
+
+class RateLimitDecision:
+    def __init__(self, policy: RateLimitPolicy, allowed: bool, remaining: float):
+        self.policy = policy
+        self.allowed = allowed
+        self.remaining = remaining
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until one token is available"""
+        return max(1, math.ceil((1 - self.remaining) / self.policy.rate))
+
+    @property
+    def reset(self) -> int:
+        """Seconds until the bucket is full again"""
+        return math.ceil((self.policy.burst - self.remaining) / self.policy.rate)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.policy.burst),
+            "RateLimit-Remaining": str(int(self.remaining)),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.policy.header
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class MemoryRateLimitBackend:
+    """Buckets in this process; limits are per worker"""
+
+    def __init__(self, max_buckets: int = MAX_LOCAL_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (policy.burst, now))
+        tokens = min(policy.burst, tokens + (now - updated) * policy.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+
+        # The least recently used bucket has refilled the longest, so evicting it costs nothing
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    async def ensure_indexes(self):
+        pass
+
+
+class MongoRateLimitBackend:
+    """Buckets shared by all workers, each refilled and debited in one atomic update on the server clock"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def _update(self, policy: RateLimitPolicy) -> list:
+        elapsed_seconds = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+        refill_ms = math.ceil(policy.burst / policy.rate * 1000)
+        return [
+            {"$set": {
+                "tokens": {"$min": [
+                    policy.burst,
+                    {"$add": [{"$ifNull": ["$tokens", policy.burst]}, {"$multiply": [elapsed_seconds, policy.rate]}]}
+                ]},
+                "updated_at": "$$NOW"
+            }},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                # A full bucket carries no state, so idle ones are left to the TTL index
+                "expires_at": {"$add": ["$$NOW", refill_ms]}
+            }}
+        ]
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        for attempt in range(2):
+            try:
+                bucket = await self.collection.find_one_and_update(
+                    {"_id": key}, self._update(policy), upsert=True, return_document=ReturnDocument.AFTER
+                )
+                return bucket["allowed"], bucket["tokens"]
+            except DuplicateKeyError:
+                # Two workers created the same bucket at once; the retry updates the winner's
+                if attempt:
+                    raise
+
+
+def create_rate_limit_backend(collection=None):
+    """Per-process buckets unless RATE_LIMIT_BACKEND=mongo shares them between workers"""
+
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "mongo":
+        return MongoRateLimitBackend(collection)
+    if backend != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND {backend!r}")
+    return MemoryRateLimitBackend()
+
+
+def is_trusted_proxy(address: str, trusted_proxies=TRUSTED_PROXIES) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_ip(scope, trusted_proxies=TRUSTED_PROXIES) -> str:
+    """The peer address, or when the peer is a trusted proxy, the nearest untrusted X-Forwarded-For hop.
+
+    Hops are read right to left: entries left of the last untrusted one were
+    written by the client and would let it pick its own bucket.
+    """
+
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not is_trusted_proxy(address, trusted_proxies):
+        return address
+
+    hops = [hop.strip() for value in Headers(scope=scope).getlist("x-forwarded-for") for hop in value.split(",")]
+    for hop in reversed([hop for hop in hops if hop]):
+        address = hop
+        if not is_trusted_proxy(hop, trusted_proxies):
+            break
+    return address
+
+
+def rate_limit_keys(scope, session_id: Optional[str] = None, user_id: Optional[str] = None, trusted_proxies=TRUSTED_PROXIES) -> List[str]:
+    """Buckets one request draws from: its IP, and its session and the session's user when known"""
+
+    keys = [f"ip:{client_ip(scope, trusted_proxies)}"]
+    if user_id:
+        keys.append(f"user:{user_id}")
+    if session_id:
+        keys.append(f"session:{session_id}")
+    return keys
+
+
+def session_from_path(path: str) -> Optional[str]:
+    match = SESSION_PATH.match(path)
+    return match.group(1) if match else None
+
+
+class SessionUsers:
+    """user_id of each session, cached per process: it is stored when the session is created and never changes.
+
+    Headers are never trusted for the user; a request is tied to a user only
+    through the session it addresses.
+    """
+
+    def __init__(self, collection, max_entries: int = MAX_LOCAL_BUCKETS):
+        self.collection = collection
+        self.max_entries = max_entries
+        self._users: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[str]:
+        if session_id in self._users:
+            self._users.move_to_end(session_id)
+            return self._users[session_id]
+
+        # Unknown sessions are not cached, so made-up ids cannot fill the cache
+        session = await self.collection.find_one({"id": session_id}, {"_id": 0, "user_id": 1})
+        if session is None:
+            return None
+
+        self._users[session_id] = session.get("user_id")
+        if len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+        return self._users[session_id]
+
+
+class RateLimiter:
+    """Token buckets per IP, session and user, with separate budgets for LLM-backed and read requests"""
+
+    def __init__(
+        self,
+        backend,
+        policies: Dict[str, RateLimitPolicy] = None,
+        session_users: Optional[SessionUsers] = None,
+        trusted_proxies=None,
+        enabled: Optional[bool] = None
+    ):
+        self.backend = backend
+        self.policies = policies or {
+            LLM: RateLimitPolicy.from_env(LLM, burst=5, per_minute=20),
+            READ: RateLimitPolicy.from_env(READ, burst=60, per_minute=600),
+        }
+        self.session_users = session_users
+        self.trusted_proxies = TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+        self.enabled = self._enabled_from_env() if enabled is None else enabled
+
+    def _enabled_from_env(self) -> bool:
+        setting = os.getenv("RATE_LIMIT_ENABLED", "auto").lower()
+        if setting != "auto":
+            return setting in ("1", "true", "yes")
+        if not self.trusted_proxies:
+            logger.warning(
+                "Rate limiting is off: set RATE_LIMIT_TRUSTED_PROXIES to the ingress's addresses, "
+                "or RATE_LIMIT_ENABLED=true when clients connect directly"
+            )
+        return bool(self.trusted_proxies)
+
+    async def keys(self, scope, session_id: Optional[str] = None) -> List[str]:
+        session_id = session_id or session_from_path(scope["path"])
+        user_id = None
+        if session_id and self.session_users is not None:
+            try:
+                user_id = await self.session_users.get(session_id)
+            except Exception as e:
+                logger.warning(f"Could not look up the user of session {session_id}: {e}")
+        return rate_limit_keys(scope, session_id, user_id, self.trusted_proxies)
+
+    def policy_for(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        if not path.startswith(("/api/", "/reports/")) or EXEMPT_PATH.match(path) or method == "OPTIONS":
+            return None
+        for route_method, pattern in LLM_ROUTES:
+            if method == route_method and pattern.match(path):
+                return self.policies[LLM]
+        return self.policies[READ]
+
+    async def check(self, policy: RateLimitPolicy, keys: List[str]) -> RateLimitDecision:
+        """Take a token from every bucket; the tightest one decides.
+
+        A request refused by one bucket may still have been charged by the
+        others. Backend failures let the request through.
+        """
+
+        try:
+            results = await asyncio.gather(*(self.backend.take(f"{policy.name}:{key}", policy) for key in keys))
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return RateLimitDecision(policy, True, policy.burst)
+
+        allowed = all(result[0] for result in results)
+        remaining = min(result[1] for result in results)
+        return RateLimitDecision(policy, allowed, remaining)
+
+
+class RateLimitMiddleware:
+    """Answer 429 once a client's bucket is empty and add RateLimit-* headers to every limited response.
+
+    is_retry recognises retries of an LLM request whose response is stored;
+    they never reach the LLM, so they are charged to the read budget.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, is_retry: Optional[Callable[[dict], Awaitable[bool]]] = None):
+        self.app = app
+        self.limiter = limiter
+        self.is_retry = is_retry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.limiter.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        if policy.name == LLM and self.is_retry is not None and await self.is_retry(scope):
+            policy = self.limiter.policies[READ]
+
+        decision = await self.limiter.check(policy, await self.limiter.keys(scope))
+        headers = decision.headers()
+
+        if not decision.allowed:
+            body = dumps({"detail": "Rate limit exceeded, please retry later"})
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *((name.lower().encode(), value.encode()) for name, value in headers.items())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
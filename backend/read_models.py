@@ -0,0 +1,52 @@
+import os
+from typing import Dict, Iterable, List, Type, TypeVar
+
+from pydantic import BaseModel
+
+from models import Message
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Debug switch: AROGYA_VALIDATE_READS=1 runs full pydantic validation on every document read back
+VALIDATE_READS = os.getenv("AROGYA_VALIDATE_READS", "").lower() in ("1", "true", "yes")
+
+MESSAGE_HISTORY_LIMIT = 1000
+
+
+def projection(fields: Iterable[str]) -> Dict[str, int]:
+    """Mongo projection for exactly these fields, without _id"""
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+NO_ID = {"_id": 0}
+MESSAGE_PROJECTION = projection(Message.model_fields)
+
+
+def build_trusted(model: Type[ModelT], document: dict) -> ModelT:
+    """Build a model from a document this app wrote itself, skipping validation.
+
+    Only for flat models: model_construct does not coerce nested models or enums,
+    so documents with nested models (HealthGuide) still go through validation.
+    """
+    if VALIDATE_READS:
+        return model(**document)
+    return model.model_construct(**document)
+
+
+async def fetch_message_documents(db, session_id: str, query: dict = None, limit: int = MESSAGE_HISTORY_LIMIT) -> List[dict]:
+    """Raw message documents for a session in conversation order, ready to serialise as-is"""
+
+    documents = await db.messages.find(
+        {"session_id": session_id, **(query or {})}, MESSAGE_PROJECTION
+    ).sort("timestamp", 1).to_list(limit)
+
+    if VALIDATE_READS:
+        return [Message(**document).model_dump() for document in documents]
+    return documents
+
+
+async def fetch_messages(db, session_id: str, limit: int = MESSAGE_HISTORY_LIMIT) -> List[Message]:
+    """Message models for a session in conversation order"""
+
+    documents = await fetch_message_documents(db, session_id, limit=limit)
+    return [build_trusted(Message, document) for document in documents]
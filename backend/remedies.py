@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from models import LanguageEnum, TraditionalRemedy
+
+logger = logging.getLogger(__name__)
+
+REMEDIES_PATH = Path(os.getenv("REMEDIES_PATH", Path(__file__).parent / "data" / "remedies.json"))
+
+
+class RemedyIndex:
+    """Immutable inverted index from (canonical symptom, language) to remedies"""
+
+    def __init__(
+        self,
+        version: int,
+        aliases: Mapping[str, str],
+        by_symptom: Mapping[Tuple[str, str], Tuple[Tuple[str, TraditionalRemedy], ...]]
+    ):
+        self.version = version
+        self._aliases = aliases
+        self._by_symptom = by_symptom
+
+    @classmethod
+    def from_data(cls, data: dict) -> "RemedyIndex":
+        """Build the index from the bundled remedies document"""
+
+        aliases = {}
+        for symptom_id, names_by_language in data["symptoms"].items():
+            aliases[symptom_id.lower()] = symptom_id
+            for names in names_by_language.values():
+                for name in names:
+                    aliases[name.lower()] = symptom_id
+
+        by_symptom: Dict[Tuple[str, str], list] = {}
+        for entry in data["remedies"]:
+            remedy = TraditionalRemedy(
+                name=entry["name"],
+                ingredients=entry["ingredients"],
+                preparation=entry["preparation"],
+                usage=entry["usage"],
+                benefits=entry["benefits"],
+                language=entry["language"],
+                contraindications=entry.get("contraindications", [])
+            )
+            for symptom_id in entry["symptoms"]:
+                if symptom_id not in data["symptoms"]:
+                    raise ValueError(f"Remedy {entry['id']} references unknown symptom {symptom_id}")
+                by_symptom.setdefault((symptom_id, entry["language"]), []).append((entry["id"], remedy))
+
+        return cls(
+            version=data.get("version", 0),
+            aliases=MappingProxyType(aliases),
+            by_symptom=MappingProxyType({key: tuple(remedies) for key, remedies in by_symptom.items()})
+        )
+
+    def canonical_symptom(self, term: str) -> Optional[str]:
+        return self._aliases.get(term.strip().lower())
+
+    def lookup(
+        self,
+        symptoms: Iterable[str],
+        language: Optional[LanguageEnum] = None,
+        exclude_tags: Iterable[str] = ()
+    ) -> List[TraditionalRemedy]:
+        """Remedies for the given symptoms in O(len(symptoms)), preferring the session language"""
+
+        language_code = getattr(language, "value", language) or LanguageEnum.ENGLISH.value
+        excluded: FrozenSet[str] = frozenset(exclude_tags)
+
+        remedies = []
+        seen = set()
+        for term in symptoms:
+            symptom_id = self.canonical_symptom(term)
+            if symptom_id is None:
+                continue
+
+            candidates = (
+                self._by_symptom.get((symptom_id, language_code))
+                or self._by_symptom.get((symptom_id, LanguageEnum.ENGLISH.value), ())
+            )
+            for remedy_id, remedy in candidates:
+                if remedy_id in seen or excluded.intersection(remedy.contraindications):
+                    continue
+                seen.add(remedy_id)
+                remedies.append(remedy)
+
+        return remedies
+
+
+class RemedyStore:
+    """Holds the current RemedyIndex and swaps in a new one when the data file changes"""
+
+    def __init__(self, path: Path = REMEDIES_PATH, reload_interval: float = None):
+        self.path = Path(path)
+        self.reload_interval = (
+            reload_interval if reload_interval is not None
+            else float(os.getenv("REMEDIES_RELOAD_SECONDS", "30"))
+        )
+
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._index = None
+        self.reload(force=True)
+
+    @property
+    def index(self) -> RemedyIndex:
+        """Current index, checking the data file for changes at most every reload_interval"""
+
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+        return self._index
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if the data file changed; returns True when a new index was swapped in"""
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = self.path.stat().st_mtime
+                if not force and mtime == self._mtime:
+                    return False
+
+                with open(self.path, encoding="utf-8") as f:
+                    index = RemedyIndex.from_data(json.load(f))
+
+            except Exception as e:
+                # Keep serving the previous index if a bad edit is deployed
+                if self._index is None:
+                    raise
+                logger.error(f"Could not reload remedies from {self.path}: {e}")
+                return False
+
+            previous_version = self._index.version if self._index else None
+            self._index = index
+            self._mtime = mtime
+
+        if previous_version is not None:
+            logger.info(f"Reloaded traditional remedies: version {previous_version} -> {index.version}")
+        return True
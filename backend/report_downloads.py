@@ -0,0 +1,178 @@
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from http_caching import CACHE_REVALIDATE, etag_matches
+
+CHUNK_SIZE = 256 * 1024
+
+# When set (e.g. "/protected-reports/"), nginx serves the file itself via X-Accel-Redirect
+ACCEL_REDIRECT_PREFIX = os.getenv("REPORTS_ACCEL_REDIRECT_PREFIX", "")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single-range `bytes=` header, or None to send the whole file.
+
+    Multi-range and malformed headers are ignored, which RFC 9110 allows.
+    """
+
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            # Suffix range: the final N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def report_validators(report: dict) -> Tuple[str, str, datetime]:
+    """Strong ETag, Last-Modified header and its second-precision datetime from report metadata"""
+
+    created_at = report["created_at"].replace(tzinfo=timezone.utc, microsecond=0)
+    etag = f'"{report["size"]:x}-{int(created_at.timestamp()):x}"'
+    return etag, format_datetime(created_at, usegmt=True), created_at
+
+
+def _not_modified_since(header: Optional[str], modified: datetime) -> bool:
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+class ReportFileResponse(Response):
+    """Serve a local report file with Range support and the fastest transfer the server offers.
+
+    In order of preference: X-Accel-Redirect to the fronting nginx, the ASGI
+    zero-copy send extension (sendfile), the path send extension, and finally
+    chunked reads in the threadpool.
+    """
+
+    def __init__(self, path: str, filename: str, report: dict, request: Request):
+        self.path = path
+        self.filename = filename
+        self.size = report["size"]
+        self.range = None
+        self.head = request.method == "HEAD"
+
+        etag, last_modified, modified = report_validators(report)
+
+        if etag_matches(request, etag) or (
+            "if-none-match" not in request.headers
+            and _not_modified_since(request.headers.get("if-modified-since"), modified)
+        ):
+            status_code = 304
+        else:
+            status_code = 200
+            if_range = request.headers.get("if-range")
+            if not if_range or if_range in (etag, last_modified):
+                try:
+                    self.range = parse_range(request.headers.get("range"), self.size)
+                except RangeNotSatisfiable:
+                    status_code = 416
+
+        if self.range:
+            status_code = 206
+
+        super().__init__(status_code=status_code)
+
+        self.headers["ETag"] = etag
+        self.headers["Last-Modified"] = last_modified
+        self.headers["Cache-Control"] = CACHE_REVALIDATE
+        self.headers["Accept-Ranges"] = "bytes"
+
+        if status_code == 416:
+            self.headers["Content-Range"] = f"bytes */{self.size}"
+        elif status_code in (200, 206):
+            self.headers["Content-Type"] = "application/pdf"
+            self.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            start, end = self.range or (0, self.size - 1)
+            self.headers["Content-Length"] = str(end - start + 1)
+            if self.range:
+                self.headers["Content-Range"] = f"bytes {start}-{end}/{self.size}"
+
+    def init_headers(self, headers=None):
+        # Content-Length is set explicitly once the byte range is known
+        self.raw_headers = []
+
+    async def __call__(self, scope, receive, send):
+        if self.status_code not in (200, 206) or self.head:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if ACCEL_REDIRECT_PREFIX:
+            # nginx handles Range itself and transfers with sendfile; we only send headers
+            self.headers["X-Accel-Redirect"] = ACCEL_REDIRECT_PREFIX + self.filename
+            del self.headers["Content-Length"]
+            if "content-range" in self.headers:
+                del self.headers["Content-Range"]
+            await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        try:
+            source = await run_in_threadpool(open, self.path, "rb")
+        except FileNotFoundError:
+            # Metadata outlived the file (sweeper mid-batch); nothing has been sent yet
+            await Response(status_code=404)(scope, receive, send)
+            return
+
+        start, end = self.range or (0, self.size - 1)
+        length = end - start + 1
+        extensions = scope.get("extensions") or {}
+
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+            if "http.response.zerocopysend" in extensions:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": source,
+                    "offset": start,
+                    "count": length
+                })
+            elif "http.response.pathsend" in extensions and not self.range:
+                await send({"type": "http.response.pathsend", "path": self.path})
+            else:
+                await run_in_threadpool(source.seek, start)
+                remaining = length
+                while remaining > 0:
+                    chunk = await run_in_threadpool(source.read, min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0 or length == 0:
+                    # File shrank underneath us; end the body rather than hang the client
+                    await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(source.close)
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+import zipfile
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from models import Session, HealthGuide, ExportReportsRequest
+from pdf_workers import RenderPool
+from read_models import NO_ID, fetch_messages
+from report_retention import ReportIndex
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_TRACKED_EXPORTS = 100
+
+
+class ExportAbortedError(Exception):
+    """A report failed part-way into its archive entry, so the archive cannot be completed"""
+
+
+class _ZipStream:
+    """Write-only, non-seekable sink for ZipFile whose bytes are drained as they are produced"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportProgress:
+    """Progress of one export, readable while the archive is still streaming"""
+
+    def __init__(self, total: int):
+        self.id = str(uuid.uuid4())
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.finished = False
+        self.started_at = time.monotonic()
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.skipped + self.failed
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.finished:
+            return 0.0
+        if not self.processed:
+            return None
+        rate = self.processed / (time.monotonic() - self.started_at)
+        return max(self.total - self.processed, 0) / rate
+
+    def as_dict(self) -> Dict:
+        eta = self.eta_seconds()
+        return {
+            "export_id": self.id,
+            "total": self.total,
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "finished": self.finished,
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        }
+
+
+class ReportExporter:
+    """Stream ZIP archives of session reports, rendering missing ones in parallel"""
+
+    def __init__(self, db, pdf_service, render_pool: RenderPool, report_index: ReportIndex, concurrency: int = None):
+        self.db = db
+        self.pdf_service = pdf_service
+        self.render_pool = render_pool
+        self.report_index = report_index
+        self.concurrency = concurrency or int(os.getenv("EXPORT_CONCURRENCY", "4"))
+        self._exports: "OrderedDict[str, ExportProgress]" = OrderedDict()
+
+    def _query(self, request: ExportReportsRequest) -> Dict:
+        query = {
+            "health_guide_generated": True,
+            "created_at": {"$gte": request.start, "$lt": request.end}
+        }
+        if request.language:
+            query["language"] = request.language
+        return query
+
+    async def start(self, request: ExportReportsRequest) -> ExportProgress:
+        """Register an export so its progress can be polled while it streams"""
+
+        progress = ExportProgress(await self.db.sessions.count_documents(self._query(request)))
+        self._exports[progress.id] = progress
+        while len(self._exports) > MAX_TRACKED_EXPORTS:
+            self._exports.popitem(last=False)
+        return progress
+
+    def progress(self, export_id: str) -> Optional[ExportProgress]:
+        return self._exports.get(export_id)
+
+    async def _report_for(self, session_data: dict, include_chat_history: bool) -> Tuple[Session, Optional[str]]:
+        """Reuse the newest report for a session or render a new one"""
+
+        session = Session(**session_data)
+
+        existing = await self.report_index.latest_for_session(session.id)
+        if existing:
+            return session, existing["filename"]
+
+        guide_data = await self.db.health_guides.find_one({"session_id": session.id}, NO_ID)
+        if not guide_data:
+            return session, None
+
+        messages = await fetch_messages(self.db, session.id) if include_chat_history else None
+        filename = await self.render_pool.run(
+            self.pdf_service.generate_health_report,
+            session, HealthGuide(**guide_data), messages, include_chat_history
+        )
+        await self.report_index.record(filename, session.id)
+        return session, filename
+
+    async def _write_entry(self, archive: zipfile.ZipFile, stream: _ZipStream, session: Session, filename: str):
+        """Copy one report into the archive, yielding archive bytes as they are produced
+
+        Failures before the first chunk is read leave the archive untouched; once
+        the entry's local header is written a failure raises ExportAbortedError,
+        since the bytes already sent cannot be taken back.
+        """
+
+        entry = zipfile.ZipInfo(filename, date_time=session.created_at.timetuple()[:6])
+        # Opening and reading may be disk or S3 I/O, so both run in the threadpool
+        source = await run_in_threadpool(self.report_index.storage.open, filename)
+        try:
+            chunk = await run_in_threadpool(source.read, CHUNK_SIZE)
+            try:
+                with archive.open(entry, "w") as target:
+                    while chunk:
+                        target.write(chunk)
+                        yield stream.drain()
+                        chunk = await run_in_threadpool(source.read, CHUNK_SIZE)
+            except Exception as e:
+                raise ExportAbortedError(f"{filename} failed after its entry was started: {e}") from e
+        finally:
+            await run_in_threadpool(source.close)
+        yield stream.drain()
+
+    async def stream(self, progress: ExportProgress, request: ExportReportsRequest) -> AsyncIterator[bytes]:
+        """Yield the ZIP archive incrementally; at most `concurrency` reports are held at once"""
+
+        stream = _ZipStream()
+        # PDFs are already compressed, so store them as-is
+        archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED)
+        pending = deque()
+        failures = []
+
+        async def emit(session_id: str, task: asyncio.Future):
+            try:
+                session, filename = await task
+            except Exception as e:
+                progress.failed += 1
+                failures.append(f"{session_id}: {e}")
+                logger.error(f"Report export failed for session {session_id}: {e}")
+                return
+
+            if filename is None:
+                progress.skipped += 1
+                return
+
+            try:
+                async for chunk in self._write_entry(archive, stream, session, filename):
+                    if chunk:
+                        yield chunk
+                progress.done += 1
+            except ExportAbortedError as e:
+                progress.failed += 1
+                logger.error(f"Report export aborted at session {session.id}: {e}")
+                raise
+            except Exception as e:
+                progress.failed += 1
+                failures.append(f"{session.id}: {e}")
+
+        try:
+            cursor = self.db.sessions.find(self._query(request), NO_ID).sort("created_at", 1).batch_size(100)
+            async for session_data in cursor:
+                task = asyncio.ensure_future(self._report_for(session_data, request.include_chat_history))
+                pending.append((session_data["id"], task))
+
+                if len(pending) >= self.concurrency:
+                    async for chunk in emit(*pending.popleft()):
+                        yield chunk
+
+            while pending:
+                async for chunk in emit(*pending.popleft()):
+                    yield chunk
+
+            if failures:
+                archive.writestr("export_errors.txt", "\n".join(failures))
+            archive.close()
+            yield stream.drain()
+
+        finally:
+            for _, task in pending:
+                task.cancel()
+            progress.finished = True
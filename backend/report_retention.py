@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from report_storage import ReportStorage
+from session_locks import MongoLease, SessionBusyError
+
+logger = logging.getLogger(__name__)
+
+# Metadata outlives the retention window by this much, so the sweeper deletes the
+# file before MongoDB's TTL monitor drops the document that points at it
+TTL_GRACE = timedelta(days=1)
+
+# dr_arogya_health_report_<session id>_<YYYYmmdd_HHMMSS>[_<suffix>].pdf, as written by PDFService
+REPORT_FILENAME = re.compile(r"^dr_arogya_health_report_(?P<session_id>.+)_(?P<created>\d{8}_\d{6})(?:_[0-9a-f]+)?\.pdf$")
+
+
+class ReportIndex:
+    """MongoDB metadata for every generated report: storage, session, size, created_at"""
+
+    def __init__(self, collection, storage: ReportStorage, retention_days: float = None):
+        self.collection = collection
+        self.storage = storage
+        self.retention = timedelta(days=retention_days or float(os.getenv("REPORT_RETENTION_DAYS", "7")))
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("filename", unique=True)
+        await self.collection.create_index([("session_id", 1), ("created_at", -1)])
+        try:
+            await self.collection.create_index(
+                "created_at", expireAfterSeconds=int((self.retention + TTL_GRACE).total_seconds())
+            )
+        except Exception as e:
+            logger.warning(f"Could not create report TTL index (retention changed?): {e}")
+
+    async def record(self, filename: str, session_id: str) -> Dict:
+        """Store metadata for a report that was just written"""
+
+        size = await asyncio.to_thread(self.storage.size, filename)
+        document = {
+            "filename": filename,
+            "session_id": session_id,
+            "storage": self.storage.kind,
+            "size": size,
+            "created_at": datetime.utcnow()
+        }
+        await self.collection.update_one({"filename": filename}, {"$set": document}, upsert=True)
+        return document
+
+    async def backfill(self) -> Dict[str, int]:
+        """Index reports already in storage that have no metadata (written before the index existed).
+
+        created_at comes from the timestamp in the filename, so old reports fall
+        straight into the sweeper's next run; unrecognised files are left alone.
+        """
+
+        filenames = await asyncio.to_thread(self.storage.list_filenames)
+        summary = {"files": len(filenames), "indexed": 0, "skipped": 0}
+
+        for filename in filenames:
+            match = REPORT_FILENAME.match(filename)
+            if not match:
+                logger.warning(f"Not indexing {filename}: not a report filename")
+                summary["skipped"] += 1
+                continue
+
+            size = await asyncio.to_thread(self.storage.size, filename)
+            result = await self.collection.update_one(
+                {"filename": filename},
+                {"$setOnInsert": {
+                    "filename": filename,
+                    "session_id": match["session_id"],
+                    "storage": self.storage.kind,
+                    "size": size,
+                    "created_at": datetime.strptime(match["created"], "%Y%m%d_%H%M%S")
+                }},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                summary["indexed"] += 1
+
+        return summary
+
+    async def get(self, filename: str) -> Optional[Dict]:
+        return await self.collection.find_one({"filename": filename}, {"_id": 0})
+
+    async def latest_for_session(self, session_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"session_id": session_id}, {"_id": 0}, sort=[("created_at", -1)]
+        )
+
+    async def expired_batch(self, batch_size: int) -> List[Dict]:
+        cutoff = datetime.utcnow() - self.retention
+        return await self.collection.find(
+            {"created_at": {"$lt": cutoff}}, {"_id": 1, "filename": 1, "size": 1}
+        ).limit(batch_size).to_list(batch_size)
+
+
+class RetentionSweeper:
+    """Periodically delete expired reports in batches, off the event loop"""
+
+    def __init__(self, index: ReportIndex, lease: MongoLease = None, interval_seconds: float = None, batch_size: int = 200):
+        self.index = index
+        self.lease = lease
+        self.interval_seconds = interval_seconds or float(os.getenv("REPORT_SWEEP_SECONDS", "3600"))
+        self.batch_size = batch_size
+        self._task = None
+
+        self.stats = {
+            "runs": 0,
+            "files_deleted": 0,
+            "bytes_reclaimed": 0,
+            "last_run_at": None,
+            "last_run_files_deleted": 0,
+            "last_run_bytes_reclaimed": 0,
+            "last_error": None
+        }
+
+    async def sweep_once(self) -> Dict:
+        """Delete every expired report, one batch at a time"""
+
+        files_deleted = 0
+        bytes_reclaimed = 0
+
+        while True:
+            batch = await self.index.expired_batch(self.batch_size)
+            if not batch:
+                break
+
+            files_deleted += await asyncio.to_thread(
+                self.index.storage.delete_many, [report["filename"] for report in batch]
+            )
+            bytes_reclaimed += sum(report.get("size", 0) for report in batch)
+            await self.index.collection.delete_many({"_id": {"$in": [report["_id"] for report in batch]}})
+
+        self.stats["runs"] += 1
+        self.stats["files_deleted"] += files_deleted
+        self.stats["bytes_reclaimed"] += bytes_reclaimed
+        self.stats["last_run_at"] = datetime.utcnow()
+        self.stats["last_run_files_deleted"] = files_deleted
+        self.stats["last_run_bytes_reclaimed"] = bytes_reclaimed
+
+        if files_deleted:
+            logger.info(f"Report retention sweep removed {files_deleted} files ({bytes_reclaimed} bytes)")
+        return self.stats
+
+    async def _run(self):
+        while True:
+            try:
+                if self.lease:
+                    # One worker sweeps at a time; the others skip this round
+                    async with self.lease.hold("report-retention", wait_seconds=0):
+                        await self.sweep_once()
+                else:
+                    await self.sweep_once()
+            except SessionBusyError:
+                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                logger.error(f"Report retention sweep failed: {e}")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,177 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", "/app/backend/reports")
+
+# Renders below this size stay in memory before upload; larger ones spill to disk
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class ReportStorage(ABC):
+    """Where rendered PDF reports live and how clients reach them"""
+
+    kind = "abstract"
+
+    @abstractmethod
+    def writer(self, filename: str):
+        """Context manager yielding a binary file the renderer writes the report into"""
+
+    @abstractmethod
+    def open(self, filename: str) -> BinaryIO:
+        """Readable binary stream of a stored report"""
+
+    @abstractmethod
+    def size(self, filename: str) -> int:
+        """Size of a stored report in bytes"""
+
+    @abstractmethod
+    def delete_many(self, filenames: Iterable[str]) -> int:
+        """Delete reports, ignoring ones already gone; returns how many were requested"""
+
+    @abstractmethod
+    def url(self, filename: str) -> str:
+        """URL clients download the report from"""
+
+    @abstractmethod
+    def list_filenames(self) -> List[str]:
+        """Filenames of every stored report"""
+
+    def local_path(self, filename: str) -> Optional[str]:
+        """Filesystem path when the report is on local disk, else None"""
+        return None
+
+
+class LocalReportStorage(ReportStorage):
+    """Reports on the local filesystem, served by the API itself"""
+
+    kind = "local"
+
+    def __init__(self, reports_dir: str = REPORTS_DIR):
+        self.reports_dir = reports_dir
+        os.makedirs(self.reports_dir, exist_ok=True)
+
+    def local_path(self, filename: str) -> str:
+        return os.path.join(self.reports_dir, filename)
+
+    @contextmanager
+    def writer(self, filename: str) -> Iterator[BinaryIO]:
+        with open(self.local_path(filename), "wb") as output:
+            yield output
+
+    def open(self, filename: str) -> BinaryIO:
+        return open(self.local_path(filename), "rb")
+
+    def size(self, filename: str) -> int:
+        return os.path.getsize(self.local_path(filename))
+
+    def delete_many(self, filenames: Iterable[str]) -> int:
+        count = 0
+        for filename in filenames:
+            try:
+                os.remove(self.local_path(filename))
+            except FileNotFoundError:
+                pass
+            count += 1
+        return count
+
+    def url(self, filename: str) -> str:
+        return f"/reports/{filename}"
+
+    def list_filenames(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.reports_dir) if name.endswith(".pdf"))
+
+
+class S3ReportStorage(ReportStorage):
+    """Reports in an S3-compatible bucket, downloaded by clients through presigned URLs.
+
+    S3_ENDPOINT_URL points it at any S3 stand-in (MinIO, LocalStack, moto server).
+    """
+
+    kind = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "reports/",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        url_expiry_seconds: int = 900
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expiry_seconds = url_expiry_seconds
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.transfer_config = TransferConfig(multipart_threshold=SPOOL_BYTES, multipart_chunksize=SPOOL_BYTES)
+
+    def _key(self, filename: str) -> str:
+        return f"{self.prefix}{filename}"
+
+    @contextmanager
+    def writer(self, filename: str) -> Iterator[BinaryIO]:
+        # ReportLab needs a writable file; spool it and hand it to a (multipart) upload
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as output:
+            yield output
+            output.seek(0)
+            self.client.upload_fileobj(
+                output, self.bucket, self._key(filename),
+                ExtraArgs={"ContentType": "application/pdf"},
+                Config=self.transfer_config
+            )
+
+    def open(self, filename: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(filename))["Body"]
+
+    def size(self, filename: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._key(filename))["ContentLength"]
+
+    def delete_many(self, filenames: Iterable[str]) -> int:
+        keys = [{"Key": self._key(filename)} for filename in filenames]
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys[start:start + 1000], "Quiet": True})
+        return len(keys)
+
+    def url(self, filename: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(filename),
+                "ResponseContentType": "application/pdf",
+                "ResponseContentDisposition": f'attachment; filename="{filename}"'
+            },
+            ExpiresIn=self.url_expiry_seconds
+        )
+
+    def list_filenames(self) -> List[str]:
+        filenames = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                filename = item["Key"][len(self.prefix):]
+                if filename.endswith(".pdf") and "/" not in filename:
+                    filenames.append(filename)
+        return filenames
+
+
+def create_report_storage() -> ReportStorage:
+    """Build the storage backend selected by REPORT_STORAGE (local or s3)"""
+
+    backend = os.getenv("REPORT_STORAGE", "local").lower()
+
+    if backend == "s3":
+        return S3ReportStorage(
+            bucket=os.environ["S3_BUCKET"],
+            prefix=os.getenv("S3_PREFIX", "reports/"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region=os.getenv("S3_REGION") or None,
+            url_expiry_seconds=int(os.getenv("S3_URL_EXPIRY_SECONDS", "900"))
+        )
+    if backend == "local":
+        return LocalReportStorage()
+
+    raise ValueError(f"Unknown REPORT_STORAGE backend: {backend}")
@@ -0,0 +1,219 @@
+import copy
+from functools import lru_cache
+from typing import Dict, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, TableStyle
+
+from localization import get_catalog
+from models import LanguageEnum
+from pdf_fonts import LATIN, LANGUAGE_SCRIPTS, markup, paragraph, register_fonts
+
+GUIDE_SECTIONS = ("symptoms", "conditions", "otc", "warnings", "diet", "lifestyle", "see_doctor", "remedies", "chat")
+DETAIL_LABELS = ("session_id", "generated_on", "language", "stage")
+
+HEADER_COLUMN_WIDTHS = [2*inch, 4*inch]
+CHAT_COLUMN_WIDTHS = [1*inch, 1.5*inch, 3.5*inch]
+
+HEADER_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+CHAT_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+CHAT_HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+], parent=CHAT_TABLE_STYLE)
+
+
+def build_stylesheet(language: Optional[LanguageEnum]) -> StyleSheet1:
+    """Report paragraph styles for a language"""
+
+    register_fonts()
+    styles = getSampleStyleSheet()
+
+    # Indic scripts stack matras above and below the line, so give them more leading
+    line_height = 1.2 if LANGUAGE_SCRIPTS.get(language, LATIN) == LATIN else 1.5
+
+    # Title style
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#2E86AB'),
+        fontName='Helvetica-Bold'
+    ))
+
+    # Section header style
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        spaceBefore=16,
+        textColor=colors.HexColor('#A23B72'),
+        fontName='Helvetica-Bold'
+    ))
+
+    # Body text style
+    styles.add(ParagraphStyle(
+        name='CustomBodyText',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY,
+        fontName='Helvetica'
+    ))
+
+    # Warning style
+    styles.add(ParagraphStyle(
+        name='Warning',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.red,
+        fontName='Helvetica-Bold',
+        spaceAfter=12,
+        spaceBefore=12
+    ))
+
+    # Traditional remedy style
+    styles.add(ParagraphStyle(
+        name='TraditionalRemedy',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#F18F01'),
+        fontName='Helvetica',
+        spaceAfter=8
+    ))
+
+    # Report details labels
+    styles.add(ParagraphStyle(
+        name='DetailLabel',
+        parent=styles['Normal'],
+        fontSize=9,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Chat history table cells
+    styles.add(ParagraphStyle(
+        name='ChatCell',
+        parent=styles['Normal'],
+        fontSize=8,
+        fontName='Helvetica'
+    ))
+
+    # Chat history column headings
+    styles.add(ParagraphStyle(
+        name='ChatHeaderCell',
+        parent=styles['ChatCell'],
+        textColor=colors.whitesmoke,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Note in place of windowed-out chat messages
+    styles.add(ParagraphStyle(
+        name='ChatSummary',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=TA_CENTER,
+        textColor=colors.grey,
+        spaceBefore=6,
+        spaceAfter=6
+    ))
+
+    # ReportLab only shapes a paragraph (through HarfBuzz) when its base font is shapable, so Indic
+    # reports use the script's Noto font throughout; it also covers Latin text. Script runs in
+    # other reports are shaped paragraph by paragraph (pdf_fonts.paragraph)
+    regular, bold = register_fonts().fonts_for_language(language)
+    shaped = LANGUAGE_SCRIPTS.get(language, LATIN) != LATIN and regular != "Helvetica"
+
+    for style in styles.byName.values():
+        if isinstance(style, ParagraphStyle):
+            style.leading = max(style.leading, style.fontSize * line_height)
+            if shaped:
+                style.fontName = bold if style.fontName.endswith("Bold") else regular
+                style.shaping = 1
+
+    return styles
+
+
+class ReportTemplate:
+    """Everything in a report that depends only on its language, parsed once per process.
+
+    ReportLab stores layout state on a flowable while wrapping and splitting it,
+    and renders run concurrently in the render pool, so the Paragraphs here are
+    prototypes: renders take shallow copies, which share the parsed text.
+    """
+
+    def __init__(self, language: Optional[LanguageEnum]):
+        catalog = get_catalog()
+
+        def text(key: str) -> str:
+            return catalog.get(f"report.{key}", language)
+
+        self.language = language
+        self.styles = styles = build_stylesheet(language)
+
+        prototypes = {
+            "title": paragraph(markup(text("title")), styles['CustomTitle']),
+            "warning_intro": paragraph(markup(text("warning_intro")), styles['Warning']),
+            "remedies_intro": paragraph(markup(text("remedies_intro")), styles['CustomBodyText']),
+            "chat_intro": paragraph(markup(text("chat_intro")), styles['CustomBodyText']),
+            "disclaimer": paragraph(
+                f"<b>{markup(text('disclaimer.title'))}</b><br/><br/>"
+                f"{markup(text('disclaimer.body'))}<br/><br/>"
+                f"<b>{markup(text('disclaimer.about_label'))}</b> {markup(text('disclaimer.about'))}<br/><br/>"
+                f"{markup(text('disclaimer.generated_by'))}",
+                styles['CustomBodyText']
+            ),
+        }
+        for section in GUIDE_SECTIONS:
+            prototypes[f"section.{section}"] = paragraph(markup(text(f"sections.{section}")), styles['SectionHeader'])
+        for label in DETAIL_LABELS:
+            prototypes[f"detail.{label}"] = paragraph(markup(text(f"details.{label}")), styles['DetailLabel'])
+        for index, column in enumerate(text("chat_columns")):
+            prototypes[f"chat_column.{index}"] = paragraph(markup(column), styles['ChatHeaderCell'])
+        for sender in ("user", "dr_arogya"):
+            prototypes[f"speaker.{sender}"] = paragraph(markup(text(f"chat_speakers.{sender}")), styles['ChatCell'])
+        self._prototypes: Dict[str, Paragraph] = prototypes
+
+        # Label markup prefixed to dynamic remedy text
+        labels = {key: markup(text(f"remedy_labels.{key}")) for key in ("ingredients", "preparation", "usage", "benefits")}
+        self.ingredients_prefix = f"{labels['ingredients']}: "
+        self.preparation_prefix = f"<b>{labels['preparation']}:</b> "
+        self.usage_prefix = f"<b>{labels['usage']}:</b> "
+        self.benefits_prefix = f"<b>{labels['benefits']}:</b> "
+
+        self._messages_omitted = text("messages_omitted")
+
+    def static(self, name: str) -> Paragraph:
+        """A private copy of a prebuilt paragraph, safe to lay out in this render"""
+        return copy.copy(self._prototypes[name])
+
+    def chat_header_row(self) -> list:
+        return [self.static(f"chat_column.{index}") for index in range(len(CHAT_COLUMN_WIDTHS))]
+
+    def messages_omitted(self, count: int) -> Paragraph:
+        return paragraph(f"<i>{markup(self._messages_omitted.format(count=count))}</i>", self.styles['ChatSummary'])
+
+
+@lru_cache(maxsize=None)
+def get_report_template(language: Optional[LanguageEnum]) -> ReportTemplate:
+    """Compile the report template for a language once per process"""
+    return ReportTemplate(language)
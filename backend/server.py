@@ -1,14 +1,16 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import RedirectResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import json
 import uuid
 from datetime import datetime
 
@@ -16,12 +18,34 @@ from datetime import datetime
 from models import (
     Session, Message, HealthGuide, Feedback,
     CreateSessionRequest, CreateMessageRequest, CreateFeedbackRequest, 
-    PDFReportRequest, PDFReportResponse, ConversationResponse,
-    LanguageEnum, ConversationStageEnum, SeverityEnum,
+    PDFReportRequest, PDFReportResponse, ConversationResponse, ExportReportsRequest,
+    LanguageEnum, ConversationStageEnum, SeverityEnum, GuideStatusEnum,
     LanguageSelection, ApiResponse
 )
 from dr_arogya_service import DrArogyaService
-from pdf_service import PDFService
+from session_locks import MongoLease, SessionBusyError, SessionGuard
+from guide_tasks import GuideTaskPool
+from localization import get_catalog
+from lazy_services import LazyService
+from health import PoolMonitor, ReadinessProbe, llm_check, mongo_check, pdf_check
+from fast_json import FastJSONResponse
+from read_models import NO_ID, projection, fetch_message_documents, fetch_messages
+from pdf_workers import RenderPool
+from report_export import ReportExporter
+from report_retention import ReportIndex, RetentionSweeper
+from report_storage import create_report_storage
+from report_downloads import ReportFileResponse
+from admin_auth import require_admin
+from feedback_rollups import FeedbackRollups, ALL as ROLLUP_ALL
+import ndjson_export
+from ndjson_export import ExportCheckpoint, export_records, ndjson_stream
+from idempotency import IdempotencyStore, idempotent, is_retry
+from rate_limit import LLM as RATE_LIMIT_LLM, RateLimiter, RateLimitMiddleware, SessionUsers, create_rate_limit_backend
+from http_caching import (
+    CompressionMiddleware, content_etag, version_etag, etag_matches, not_modified, set_validators,
+    CACHE_IMMUTABLE, CACHE_REVALIDATE, CACHE_PUBLIC_DAY, CACHE_NO_STORE
+)
+from ws_hub import ConversationHub, CLOSE_SESSION_NOT_FOUND, CLOSE_TRY_AGAIN_LATER
 
 
 ROOT_DIR = Path(__file__).parent
@@ -29,21 +53,56 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Pool events feed the saturation figures reported by /readyz
+pool_monitor = PoolMonitor()
+client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_monitor])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI(title="Dr. Arogya - AI Health Companion API")
+app = FastAPI(title="Dr. Arogya - AI Health Companion API", default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Compile the localisation catalog up front so missing translations are reported at startup
+catalog = get_catalog()
+
+# Services named in WARMUP_SERVICES (pdf, llm or all) are loaded at startup instead of on first use
+WARMUP_SERVICES = {name.strip() for name in os.getenv("WARMUP_SERVICES", "").lower().split(",") if name.strip()}
+
+def _create_pdf_service():
+    # ReportLab, fonts and templates only load on workers that render a report
+    from pdf_service import PDFService
+    return PDFService(report_storage)
+
 # Initialize services
 dr_arogya_service = DrArogyaService()
-pdf_service = PDFService()
+report_storage = create_report_storage()
+pdf_service = LazyService(_create_pdf_service, "PDF service")
+render_pool = RenderPool()
+report_index = ReportIndex(db.reports, report_storage)
+report_exporter = ReportExporter(db, pdf_service, render_pool, report_index)
+
+# Per-session serialisation
+session_guard = SessionGuard(MongoLease(db.session_leases))
+
+# Expired reports are swept periodically in the background
+retention_sweeper = RetentionSweeper(report_index, lease=session_guard.lease)
 
-# Serve static files for PDF downloads
-app.mount("/reports", StaticFiles(directory="/app/backend/reports"), name="reports")
+# Feedback counters per day and language, maintained on every submission
+feedback_rollups = FeedbackRollups(db.feedback_rollups)
+
+# Live conversation sockets handled by this worker
+conversation_hub = ConversationHub()
+
+# Socket turns still running, referenced here so they finish even after their socket closes
+socket_turns: Set[asyncio.Task] = set()
+
+# Stored responses for POST retries carrying an Idempotency-Key
+idempotency_store = IdempotencyStore(db.idempotency_keys)
+
+# Token buckets per IP, session and user in front of the LLM-backed and read endpoints
+rate_limiter = RateLimiter(create_rate_limit_backend(db.rate_limits), session_users=SessionUsers(db.sessions))
 
 # Basic status endpoint
 @api_router.get("/")
@@ -52,26 +111,40 @@ async def root():
 
 # === LANGUAGE SELECTION ENDPOINTS ===
 
+LANGUAGE_OPTIONS = [
+    {"code": LanguageEnum.ENGLISH, "name": "English", "native_name": "English"},
+    {"code": LanguageEnum.HINDI, "name": "Hindi", "native_name": "हिन्दी"},
+    {"code": LanguageEnum.KANNADA, "name": "Kannada", "native_name": "ಕನ್ನಡ"},
+    {"code": LanguageEnum.MARATHI, "name": "Marathi", "native_name": "मराठी"},
+    {"code": LanguageEnum.TELUGU, "name": "Telugu", "native_name": "తెలుగు"},
+    {"code": LanguageEnum.TAMIL, "name": "Tamil", "native_name": "தமிழ்"},
+    {"code": LanguageEnum.BENGALI, "name": "Bengali", "native_name": "বাংলা"},
+    {"code": LanguageEnum.GUJARATI, "name": "Gujarati", "native_name": "ગુજરાતી"},
+]
+# Only fully translated languages are offered; the rest would greet and report in English
+SUPPORTED_LANGUAGES = [language for language in LANGUAGE_OPTIONS if catalog.is_complete(language["code"])]
+LANGUAGES_ETAG = content_etag(json.dumps([{**language, "code": language["code"].value} for language in SUPPORTED_LANGUAGES]).encode())
+
 @api_router.get("/languages")
-async def get_available_languages():
+async def get_available_languages(request: Request, response: Response):
     """Get list of supported languages"""
-    languages = [
-        {"code": LanguageEnum.ENGLISH, "name": "English", "native_name": "English"},
-        {"code": LanguageEnum.HINDI, "name": "Hindi", "native_name": "हिन्दी"},
-        {"code": LanguageEnum.KANNADA, "name": "Kannada", "native_name": "ಕನ್ನಡ"},
-        {"code": LanguageEnum.MARATHI, "name": "Marathi", "native_name": "मराठी"},
-        {"code": LanguageEnum.TELUGU, "name": "Telugu", "native_name": "తెలుగు"},
-        {"code": LanguageEnum.TAMIL, "name": "Tamil", "native_name": "தமிழ்"},
-        {"code": LanguageEnum.BENGALI, "name": "Bengali", "native_name": "বাংলা"},
-        {"code": LanguageEnum.GUJARATI, "name": "Gujarati", "native_name": "ગુજરાતી"},
-    ]
-    return ApiResponse(success=True, message="Languages retrieved", data=languages)
+    if etag_matches(request, LANGUAGES_ETAG):
+        return not_modified(LANGUAGES_ETAG, CACHE_PUBLIC_DAY)
+    
+    set_validators(response, LANGUAGES_ETAG, CACHE_PUBLIC_DAY)
+    return ApiResponse(success=True, message="Languages retrieved", data=SUPPORTED_LANGUAGES)
 
 # === SESSION MANAGEMENT ENDPOINTS ===
 
+def require_offered_language(language: Optional[LanguageEnum]):
+    if language is not None and not catalog.is_complete(language):
+        raise HTTPException(status_code=422, detail=f"Language not available: {language.value}")
+
+
 @api_router.post("/sessions", response_model=ApiResponse)
 async def create_session(request: CreateSessionRequest):
     """Create a new consultation session"""
+    require_offered_language(request.language)
     try:
         session = Session(
             user_id=request.user_id,
@@ -90,7 +163,7 @@ async def create_session(request: CreateSessionRequest):
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
 
 @api_router.get("/sessions/{session_id}", response_model=ApiResponse)
-async def get_session(session_id: str):
+async def get_session(session_id: str, request: Request):
     """Get session details"""
     try:
         session_data = await db.sessions.find_one({"id": session_id})
@@ -98,12 +171,17 @@ async def get_session(session_id: str):
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
         
+        # Every session write bumps the version, so it identifies the representation
+        etag = version_etag(session_id, session_data.get("version", 0), session_data["updated_at"].timestamp())
+        if etag_matches(request, etag):
+            return not_modified(etag, CACHE_REVALIDATE)
+        
         session = Session(**session_data)
         
-        return ApiResponse(
-            success=True,
-            message="Session retrieved",
-            data=session
+        # Returned directly so the session is not re-validated against response_model
+        return FastJSONResponse(
+            {"success": True, "message": "Session retrieved", "data": session},
+            headers={"ETag": etag, "Cache-Control": CACHE_REVALIDATE}
         )
         
     except HTTPException:
@@ -114,55 +192,39 @@ async def get_session(session_id: str):
 @api_router.post("/sessions/{session_id}/language", response_model=ApiResponse)
 async def set_session_language(session_id: str, language_selection: LanguageSelection):
     """Set language for session"""
+    require_offered_language(language_selection.selected_language)
     try:
-        session_data = await db.sessions.find_one({"id": session_id})
-        
-        if not session_data:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Update session language and stage
-        await db.sessions.update_one(
-            {"id": session_id},
-            {
-                "$set": {
-                    "language": language_selection.selected_language,
-                    "current_stage": ConversationStageEnum.GREETING,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-        
-        # Generate welcome message
-        if language_selection.selected_language == LanguageEnum.HINDI:
-            welcome_message = """नमस्ते! 🙏 मैं डॉ. आरोग्य हूं, आपका व्यक्तिगत स्वास्थ्य सहायक।
-
-मुझे आपकी स्वास्थ्य संबंधी समस्या समझने और आपको बेहतर महसूस कराने में खुशी होगी।
-
-मैं आपसे कुछ सवाल पूछूंगा ताकि आपकी स्थिति को बेहतर तरीके से समझ सकूं। इसके बाद, मैं आपके लिए एक पूरा स्वास्थ्य गाइड तैयार करूंगा जो आपको डॉक्टर के पास जाने के लिए तैयार करेगा।
-
-⚠️ महत्वपूर्ण: मैं एक AI सहायक हूं, डॉक्टर नहीं। यदि यह मेडिकल इमरजेंसी है, तो कृपया तुरंत नजदीकी अस्पताल जाएं।
-
-कृपया अपनी स्वास्थ्य समस्या के बारे में बताएं।"""
-        else:
-            welcome_message = """Hello! 🙏 I'm Dr. Arogya, your personal health assistant.
-
-I'm here to help you understand your health concerns and feel better.
-
-I'll ask you a few questions to understand your condition better. Based on your answers, I will prepare a complete health guide to help you feel more prepared for your doctor's visit. This will include potential next steps, lifestyle advice, and even some trusted दादी माँ के नुस्खे (grandmother's remedies).
-
-⚠️ Important: I am an AI assistant, not a human doctor. If this is a medical emergency, please stop now and call your nearest hospital immediately.
-
-Please tell me about your health concern."""
-        
-        # Create welcome message
-        welcome_msg = Message(
-            session_id=session_id,
-            sender="dr_arogya",
-            content=welcome_message,
-            language=language_selection.selected_language
-        )
-        
-        await db.messages.insert_one(welcome_msg.dict())
+        # Serialised with conversation turns, whose versioned commit would otherwise conflict with this write
+        async with session_guard.hold(session_id):
+            # Update session language and stage
+            session_data = await db.sessions.find_one_and_update(
+                {"id": session_id},
+                {
+                    "$set": {
+                        "language": language_selection.selected_language,
+                        "current_stage": ConversationStageEnum.GREETING,
+                        "updated_at": datetime.utcnow()
+                    },
+                    "$inc": {"version": 1}
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            
+            if not session_data:
+                raise HTTPException(status_code=404, detail="Session not found")
+            
+            # Generate welcome message
+            welcome_message = catalog.get("welcome_message", language_selection.selected_language)
+            
+            # Create welcome message
+            welcome_msg = Message(
+                session_id=session_id,
+                sender="dr_arogya",
+                content=welcome_message,
+                language=language_selection.selected_language
+            )
+            
+            await db.messages.insert_one(welcome_msg.dict())
         
         return ApiResponse(
             success=True,
@@ -170,6 +232,8 @@ Please tell me about your health concern."""
             data={"message": welcome_msg}
         )
         
+    except SessionBusyError:
+        raise HTTPException(status_code=409, detail="Another message for this session is still being processed")
     except HTTPException:
         raise
     except Exception as e:
@@ -178,141 +242,188 @@ Please tell me about your health concern."""
 # === CONVERSATION ENDPOINTS ===
 
 @api_router.post("/sessions/{session_id}/messages", response_model=ConversationResponse)
-async def send_message(session_id: str, request: CreateMessageRequest):
-    """Send message in conversation"""
+async def send_message(session_id: str, request: CreateMessageRequest, http_request: Request):
+    """Send message in conversation (retries with the same Idempotency-Key get the original reply)"""
+    return await idempotent(idempotency_store, http_request, request, lambda: _send_message(session_id, request))
+
+async def _send_message(session_id: str, request: CreateMessageRequest) -> ConversationResponse:
     try:
-        # Get session
-        session_data = await db.sessions.find_one({"id": session_id})
-        
-        if not session_data:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        session = Session(**session_data)
-        
-        # Create user message
-        user_message = Message(
-            session_id=session_id,
-            sender="user",
-            content=request.content,
-            language=request.language or session.language
-        )
-        
-        # Store user message
-        await db.messages.insert_one(user_message.dict())
-        
-        # Generate AI response
-        ai_response_text, emergency_detected = await dr_arogya_service.generate_response(
-            session, request.content
-        )
-        
-        # Update session if emergency detected
-        if emergency_detected:
-            await db.sessions.update_one(
-                {"id": session_id},
-                {
-                    "$set": {
-                        "emergency_detected": True,
-                        "severity_level": SeverityEnum.EMERGENCY,
-                        "current_stage": ConversationStageEnum.EMERGENCY_ALERT,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            session.emergency_detected = True
-            session.severity_level = SeverityEnum.EMERGENCY
-            session.current_stage = ConversationStageEnum.EMERGENCY_ALERT
-        else:
-            # Update conversation stage based on content
-            new_stage = await _determine_conversation_stage(session, request.content)
-            
-            await db.sessions.update_one(
-                {"id": session_id},
-                {
-                    "$set": {
-                        "current_stage": new_stage,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            session.current_stage = new_stage
-        
-        # Create AI response message
-        ai_message = Message(
-            session_id=session_id,
-            sender="dr_arogya",
-            content=ai_response_text,
-            language=session.language
-        )
-        
-        # Store AI message
-        await db.messages.insert_one(ai_message.dict())
-        
-        # Generate health guide if conversation is complete
-        health_guide = None
-        if session.current_stage == ConversationStageEnum.HEALTH_GUIDE_GENERATION:
-            messages = await db.messages.find({"session_id": session_id}).to_list(1000)
-            message_objects = [Message(**msg) for msg in messages]
-            
-            health_guide = await dr_arogya_service.generate_health_guide(session, message_objects)
-            await db.health_guides.insert_one(health_guide.dict())
-            
-            # Update session
-            await db.sessions.update_one(
-                {"id": session_id},
-                {
-                    "$set": {
-                        "health_guide_generated": True,
-                        "current_stage": ConversationStageEnum.FEEDBACK,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-        
-        return ConversationResponse(
-            message=ai_message,
-            session=session,
-            health_guide=health_guide,
-            emergency_alert=emergency_detected
-        )
+        # One turn at a time per session, across tabs and workers
+        async with session_guard.hold(session_id):
+            return await _run_conversation_turn(session_id, request)
         
+    except SessionBusyError:
+        raise HTTPException(status_code=409, detail="Another message for this session is still being processed")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
 @api_router.get("/sessions/{session_id}/messages", response_model=ApiResponse)
-async def get_session_messages(session_id: str):
+async def get_session_messages(session_id: str, request: Request):
     """Get all messages for a session"""
     try:
-        messages_data = await db.messages.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
-        messages = [Message(**msg) for msg in messages_data]
+        # Messages are append-only: the count and newest id identify the list
+        # without loading it, so a matching poll costs two indexed lookups
+        last_message = await db.messages.find_one(
+            {"session_id": session_id}, {"_id": 0, "id": 1}, sort=[("timestamp", -1)]
+        )
+        message_count = await db.messages.count_documents({"session_id": session_id})
+        etag = version_etag(session_id, message_count, last_message["id"] if last_message else "empty")
         
-        return ApiResponse(
-            success=True,
-            message="Messages retrieved",
-            data=messages
+        if etag_matches(request, etag):
+            return not_modified(etag, CACHE_REVALIDATE)
+        
+        # Stored documents go straight to JSON without building models
+        messages_data = await fetch_message_documents(db, session_id)
+        
+        # Returned directly so the list is not re-validated against response_model
+        return FastJSONResponse(
+            {"success": True, "message": "Messages retrieved", "data": messages_data},
+            headers={"ETag": etag, "Cache-Control": CACHE_REVALIDATE}
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving messages: {str(e)}")
 
+@api_router.websocket("/ws/sessions/{session_id}")
+async def conversation_socket(websocket: WebSocket, session_id: str):
+    """Long-lived conversation channel: user messages in, replies and session events out"""
+    
+    # Accept before refusing: a close during the handshake reaches browsers as 1006, hiding the code
+    await websocket.accept()
+    
+    session_data = await db.sessions.find_one({"id": session_id})
+    if not session_data:
+        await websocket.close(code=CLOSE_SESSION_NOT_FOUND)
+        return
+    
+    if not conversation_hub.has_capacity():
+        await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+        return
+    
+    conversation_hub.register(session_id, websocket)
+    
+    last_seen = {"at": asyncio.get_running_loop().time()}
+    heartbeat = asyncio.create_task(conversation_hub.heartbeat(websocket, last_seen))
+    
+    async def publish(event: Dict[str, Any]):
+        await conversation_hub.publish(session_id, event)
+    
+    async def run_turn(request: CreateMessageRequest):
+        try:
+            async with session_guard.hold(session_id):
+                await _run_conversation_turn(session_id, request, publish=publish)
+            return
+        except SessionBusyError:
+            detail = "Another message for this session is still being processed"
+        except HTTPException as e:
+            detail = e.detail
+        except Exception as e:
+            detail = f"Error processing message: {str(e)}"
+        
+        try:
+            await conversation_hub.send(websocket, {"type": "error", "detail": detail})
+        except Exception:
+            pass  # The socket closed while the turn ran
+    
+    # Turns run beside the receive loop so pongs keep arriving while one waits on the lease or the LLM
+    turn: Optional[asyncio.Task] = None
+    
+    try:
+        while True:
+            raw_event = await websocket.receive_text()
+            last_seen["at"] = asyncio.get_running_loop().time()
+            
+            try:
+                event = json.loads(raw_event)
+                event_type = event.get("type")
+            except (ValueError, AttributeError):
+                await conversation_hub.send(websocket, {"type": "error", "detail": "Events must be JSON objects"})
+                continue
+            
+            if event_type == "pong":
+                continue
+            
+            if event_type == "resume":
+                await _resume_conversation(websocket, session_id, event.get("last_message_id"))
+            
+            elif event_type == "message":
+                if turn is not None and not turn.done():
+                    await conversation_hub.send(websocket, {"type": "error", "detail": "Another message for this session is still being processed"})
+                    continue
+                
+                # Socket turns draw from the same LLM budget as POST /messages
+                if rate_limiter.enabled:
+                    decision = await rate_limiter.check(rate_limiter.policies[RATE_LIMIT_LLM], await rate_limiter.keys(websocket.scope, session_id))
+                    if not decision.allowed:
+                        await conversation_hub.send(websocket, {
+                            "type": "error",
+                            "detail": "Rate limit exceeded, please retry later",
+                            "retry_after": decision.retry_after
+                        })
+                        continue
+                
+                try:
+                    request = CreateMessageRequest(content=event.get("content", ""), language=event.get("language"))
+                except Exception as e:
+                    await conversation_hub.send(websocket, {"type": "error", "detail": f"Error processing message: {str(e)}"})
+                    continue
+                
+                # A turn outlives its socket (like an HTTP turn whose client went away); the reply is stored and published
+                turn = asyncio.create_task(run_turn(request))
+                socket_turns.add(turn)
+                turn.add_done_callback(socket_turns.discard)
+            
+            else:
+                await conversation_hub.send(websocket, {"type": "error", "detail": f"Unknown event type: {event_type}"})
+    
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the heartbeat closed the socket underneath receive_text
+        pass
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+        conversation_hub.unregister(session_id, websocket)
+
 # === HEALTH GUIDE ENDPOINTS ===
 
 @api_router.get("/sessions/{session_id}/health-guide", response_model=ApiResponse)
-async def get_health_guide(session_id: str):
+async def get_health_guide(session_id: str, request: Request, response: Response):
     """Get health guide for session"""
     try:
-        guide_data = await db.health_guides.find_one({"session_id": session_id})
+        # A stored guide never changes, so its id is a strong validator; revalidating
+        # clients only need the id, not the whole document
+        if request.headers.get("if-none-match"):
+            guide_ref = await db.health_guides.find_one({"session_id": session_id}, {"_id": 0, "id": 1})
+            if guide_ref and etag_matches(request, f'"{guide_ref["id"]}"'):
+                return not_modified(f'"{guide_ref["id"]}"', CACHE_IMMUTABLE)
+        
+        guide_data = await db.health_guides.find_one({"session_id": session_id}, NO_ID)
         
         if not guide_data:
+            session_data = await db.sessions.find_one({"id": session_id}, projection(["health_guide_status"]))
+            guide_status = session_data.get("health_guide_status") if session_data else None
+            
+            if guide_status == GuideStatusEnum.PENDING:
+                response.status_code = 202
+                response.headers["Cache-Control"] = CACHE_NO_STORE
+                return ApiResponse(
+                    success=True,
+                    message="Health guide is being prepared",
+                    data={"status": GuideStatusEnum.PENDING}
+                )
+            if guide_status == GuideStatusEnum.FAILED:
+                raise HTTPException(status_code=500, detail="Health guide generation failed")
+            
             raise HTTPException(status_code=404, detail="Health guide not found")
         
         health_guide = HealthGuide(**guide_data)
         
-        return ApiResponse(
-            success=True,
-            message="Health guide retrieved",
-            data=health_guide
+        # Returned directly: the guide's lists skip response_model re-validation
+        return FastJSONResponse(
+            {"success": True, "message": "Health guide retrieved", "data": health_guide},
+            headers={"ETag": f'"{health_guide.id}"', "Cache-Control": CACHE_IMMUTABLE}
         )
         
     except HTTPException:
@@ -323,19 +434,33 @@ async def get_health_guide(session_id: str):
 # === PDF GENERATION ENDPOINTS ===
 
 @api_router.post("/sessions/{session_id}/generate-pdf", response_model=PDFReportResponse)
-async def generate_pdf_report(session_id: str, request: PDFReportRequest):
-    """Generate PDF health report"""
+async def generate_pdf_report(session_id: str, request: PDFReportRequest, http_request: Request):
+    """Generate PDF health report (retries with the same Idempotency-Key get the original report)"""
+    return await idempotent(
+        idempotency_store, http_request, request, lambda: _generate_pdf_report(session_id, request),
+        # Presigned URLs expire long before the stored response does
+        refresh=lambda body: {**body, "pdf_url": report_storage.url(body["filename"])}
+    )
+
+async def _generate_pdf_report(session_id: str, request: PDFReportRequest) -> PDFReportResponse:
     try:
         # Get session
-        session_data = await db.sessions.find_one({"id": session_id})
+        session_data = await db.sessions.find_one({"id": session_id}, NO_ID)
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
         
         session = Session(**session_data)
         
         # Get health guide
-        guide_data = await db.health_guides.find_one({"session_id": session_id})
+        guide_data = await db.health_guides.find_one({"session_id": session_id}, NO_ID)
         if not guide_data:
+            if session.health_guide_status == GuideStatusEnum.PENDING:
+                # Guides are built in the background; clients poll GET /health-guide until it returns 200
+                raise HTTPException(
+                    status_code=409,
+                    detail="Health guide is still being prepared, retry once it is ready",
+                    headers={"Retry-After": "3"}
+                )
             raise HTTPException(status_code=404, detail="Health guide not found")
         
         health_guide = HealthGuide(**guide_data)
@@ -343,15 +468,17 @@ async def generate_pdf_report(session_id: str, request: PDFReportRequest):
         # Get messages if requested
         messages = None
         if request.include_chat_history:
-            messages_data = await db.messages.find({"session_id": session_id}).sort("timestamp", 1).to_list(1000)
-            messages = [Message(**msg) for msg in messages_data]
+            messages = await fetch_messages(db, session_id)
         
-        # Generate PDF
-        filename = pdf_service.generate_health_report(
+        # Generate PDF off the event loop
+        await pdf_service.ready()
+        filename = await render_pool.run(
+            pdf_service.generate_health_report,
             session, health_guide, messages, request.include_chat_history
         )
+        await report_index.record(filename, session_id)
         
-        pdf_url = f"/reports/{filename}"
+        pdf_url = pdf_service.get_report_url(filename)
         
         return PDFReportResponse(
             pdf_url=pdf_url,
@@ -363,42 +490,120 @@ async def generate_pdf_report(session_id: str, request: PDFReportRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
-@api_router.get("/reports/{filename}")
-async def download_pdf_report(filename: str):
-    """Download PDF report"""
+@api_router.api_route("/reports/{filename}", methods=["GET", "HEAD"])
+async def download_pdf_report(filename: str, request: Request):
+    """Download PDF report (also served at /reports/{filename})"""
     try:
-        filepath = pdf_service.get_report_path(filename)
-        
-        if not os.path.exists(filepath):
+        # Only filenames the index knows about are served; nothing touches the filesystem here
+        report = await report_index.get(filename)
+        if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
-        return FileResponse(
-            path=filepath,
-            filename=filename,
-            media_type='application/pdf'
-        )
+        filepath = report_storage.local_path(filename)
+        if filepath is None:
+            # Object storage: send the client straight to the bucket
+            return RedirectResponse(report_storage.url(filename), status_code=307)
+        
+        return ReportFileResponse(filepath, filename, report, request)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading PDF: {str(e)}")
 
+# === ADMIN ENDPOINTS ===
+
+@api_router.post("/admin/reports/export", dependencies=[Depends(require_admin)])
+async def export_reports(request: ExportReportsRequest):
+    """Stream a ZIP of all session reports in a date range, rendering missing ones"""
+    
+    await pdf_service.ready()
+    progress = await report_exporter.start(request)
+    archive_name = f"dr_arogya_reports_{request.start:%Y%m%d}_{request.end:%Y%m%d}.zip"
+    
+    return StreamingResponse(
+        report_exporter.stream(progress, request),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{archive_name}"',
+            "X-Export-Id": progress.id,
+            "X-Export-Total": str(progress.total)
+        }
+    )
+
+@api_router.get("/admin/reports/export/{export_id}", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def get_export_progress(export_id: str, response: Response):
+    """Progress and ETA of a running report export"""
+    
+    progress = report_exporter.progress(export_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Export not found")
+    
+    eta = progress.eta_seconds()
+    response.headers["X-Export-Progress"] = f"{progress.processed}/{progress.total}"
+    if eta is not None:
+        response.headers["X-Export-ETA"] = str(round(eta))
+    
+    return ApiResponse(success=True, message="Export progress", data=progress.as_dict())
+
+@api_router.get("/admin/reports/retention", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def get_report_retention_stats():
+    """Report retention sweeper statistics, including disk space reclaimed"""
+    return ApiResponse(success=True, message="Report retention statistics", data=retention_sweeper.stats)
+
+@api_router.get("/admin/metrics/llm", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def get_llm_metrics():
+    """LLM latency against its SLO, degraded-mode switches and local responses served"""
+    return ApiResponse(success=True, message="LLM metrics", data=dr_arogya_service.slo.stats)
+
+@api_router.get("/admin/export/consultations", dependencies=[Depends(require_admin)])
+async def export_consultations(
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    batch_size: int = Query(ndjson_export.DEFAULT_BATCH_SIZE, ge=1, le=ndjson_export.MAX_BATCH_SIZE),
+    gzip: bool = False
+):
+    """Stream sessions with their messages and health guides as NDJSON, resumable from a checkpoint record"""
+    
+    if (after_created_at is None) != (after_id is None):
+        raise HTTPException(status_code=400, detail="after_created_at and after_id must be given together")
+    
+    after = ExportCheckpoint(after_created_at, after_id) if after_id else None
+    filename = "dr_arogya_consultations.ndjson" + (".gz" if gzip else "")
+    
+    return StreamingResponse(
+        ndjson_stream(export_records(db, after, batch_size), gzip=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # === FEEDBACK ENDPOINTS ===
 
 @api_router.post("/sessions/{session_id}/feedback", response_model=ApiResponse)
 async def submit_feedback(session_id: str, request: CreateFeedbackRequest):
     """Submit feedback for session"""
     try:
+        # Language and stage are recorded with the feedback so rollups never need a join
+        session_data = await db.sessions.find_one({"id": session_id}, projection(["language", "current_stage"])) or {}
+        
         feedback = Feedback(
             session_id=session_id,
             rating=request.rating,
             comments=request.comments,
             helpful_aspects=request.helpful_aspects,
-            improvement_suggestions=request.improvement_suggestions
+            improvement_suggestions=request.improvement_suggestions,
+            language=session_data.get("language"),
+            stage=session_data.get("current_stage")
         )
         
         await db.feedback.insert_one(feedback.dict())
         
+        try:
+            await feedback_rollups.record(feedback)
+        except Exception as e:
+            # The raw feedback is stored; `manage.py rebuild-feedback-rollups` repairs the counters
+            logger.error(f"Error updating feedback rollups for session {session_id}: {e}")
+        
         return ApiResponse(
             success=True,
             message="Feedback submitted successfully",
@@ -408,8 +613,184 @@ async def submit_feedback(session_id: str, request: CreateFeedbackRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting feedback: {str(e)}")
 
+# === ANALYTICS ENDPOINTS ===
+
+@api_router.get("/analytics/feedback", response_model=ApiResponse, dependencies=[Depends(require_admin)])
+async def get_feedback_analytics(
+    response: Response,
+    day: str = Query(ROLLUP_ALL, pattern=r"^(all|\d{4}-\d{2}-\d{2})$"),
+    language: str = Query(ROLLUP_ALL, pattern=r"^[a-z]+$")
+):
+    """Aggregated feedback for one day (UTC, YYYY-MM-DD) and language; "all" for totals"""
+    
+    response.headers["Cache-Control"] = "private, max-age=60"
+    return ApiResponse(
+        success=True,
+        message="Feedback analytics",
+        data=await feedback_rollups.get(day, language)
+    )
+
 # === UTILITY FUNCTIONS ===
 
+async def _commit_session(session: Session, changes: dict) -> Session:
+    """Apply one optimistic-concurrency write to a session and return the stored state"""
+    
+    # Sessions created before versioning have no version field yet
+    expected_version = session.version if session.version else {"$in": [0, None]}
+    
+    session_data = await db.sessions.find_one_and_update(
+        {"id": session.id, "version": expected_version},
+        {
+            "$set": {**changes, "updated_at": datetime.utcnow()},
+            "$inc": {"version": 1}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if not session_data:
+        raise HTTPException(status_code=409, detail="Session was updated by another request, please retry")
+    
+    return Session(**session_data)
+
+async def _run_conversation_turn(
+    session_id: str,
+    request: CreateMessageRequest,
+    publish: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+) -> ConversationResponse:
+    """Process one user message; callers must hold the session guard"""
+    
+    # Get session
+    session_data = await db.sessions.find_one({"id": session_id})
+    
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = Session(**session_data)
+    
+    # Create user message
+    user_message = Message(
+        session_id=session_id,
+        sender="user",
+        content=request.content,
+        language=request.language or session.language
+    )
+    
+    if publish:
+        await publish({"type": "message", "message": user_message})
+        await publish({"type": "typing"})
+    
+    # Symptoms are kept on the session as they come up (local replies, guides and analytics read them)
+    new_symptoms = [symptom for symptom in dr_arogya_service.extract_symptoms(request.content) if symptom not in session.symptoms]
+    
+    # Generate AI response
+    ai_response_text, emergency_detected = await dr_arogya_service.generate_response(
+        session, request.content
+    )
+    
+    # Work out the session changes for this turn
+    if emergency_detected:
+        session_changes = {
+            "emergency_detected": True,
+            "severity_level": SeverityEnum.EMERGENCY,
+            "current_stage": ConversationStageEnum.EMERGENCY_ALERT
+        }
+    else:
+        # Update conversation stage based on content
+        new_stage = await _determine_conversation_stage(session, request.content)
+        session_changes = {"current_stage": new_stage}
+    
+    if new_symptoms:
+        session_changes["symptoms"] = session.symptoms + new_symptoms
+    
+    # Create AI response message
+    ai_message = Message(
+        session_id=session_id,
+        sender="dr_arogya",
+        content=ai_response_text,
+        language=session.language
+    )
+    
+    # Queue health guide generation once the conversation is complete
+    start_guide = (
+        session_changes["current_stage"] == ConversationStageEnum.HEALTH_GUIDE_GENERATION
+        and session.health_guide_status not in (GuideStatusEnum.PENDING, GuideStatusEnum.READY)
+    )
+    if start_guide:
+        session_changes["health_guide_status"] = GuideStatusEnum.PENDING
+    
+    # Single versioned write for the whole turn; the messages are stored only once it succeeds,
+    # so a conflicting turn leaves nothing behind for a retry to duplicate
+    session = await _commit_session(session, session_changes)
+    await db.messages.insert_many([user_message.dict(), ai_message.dict()])
+    
+    # The guide is built in the background; clients poll GET /health-guide for it
+    if start_guide:
+        guide_tasks.submit(session)
+    
+    if publish:
+        await publish({"type": "message", "message": ai_message})
+        await publish({"type": "stage", "session": session})
+        if emergency_detected:
+            await publish({"type": "emergency"})
+    
+    return ConversationResponse(
+        message=ai_message,
+        session=session,
+        emergency_alert=emergency_detected
+    )
+
+async def _resume_conversation(websocket: WebSocket, session_id: str, last_message_id: Optional[str]):
+    """Send a (re)connecting socket the session and whatever messages it missed"""
+    
+    query = {}
+    if last_message_id:
+        last_message = await db.messages.find_one(
+            {"session_id": session_id, "id": last_message_id}, projection(["timestamp"])
+        )
+        if last_message:
+            query["timestamp"] = {"$gt": last_message["timestamp"]}
+    
+    messages_data = await fetch_message_documents(db, session_id, query=query)
+    session_data = await db.sessions.find_one({"id": session_id}, NO_ID)
+    
+    await conversation_hub.send(websocket, {
+        "type": "resumed",
+        "session": Session(**session_data),
+        "messages": messages_data
+    })
+
+async def _publish_guide_status(session_id: str, status: GuideStatusEnum):
+    """Tell open conversation sockets that the health guide finished"""
+    
+    if status == GuideStatusEnum.READY:
+        guide_data = await db.health_guides.find_one({"session_id": session_id}, NO_ID)
+        await conversation_hub.publish(session_id, {"type": "guide_ready", "health_guide": HealthGuide(**guide_data)})
+    else:
+        await conversation_hub.publish(session_id, {"type": "guide_failed"})
+
+async def _get_or_create_health_guide(session: Session) -> HealthGuide:
+    """Return the session's health guide, generating and storing it at most once"""
+    
+    guide_data = await db.health_guides.find_one({"session_id": session.id}, NO_ID)
+    if guide_data:
+        return HealthGuide(**guide_data)
+    
+    messages = await fetch_messages(db, session.id)
+    
+    health_guide = await dr_arogya_service.generate_health_guide(session, messages)
+    
+    # Another worker may have stored a guide meanwhile; keep whichever landed first
+    result = await db.health_guides.update_one(
+        {"session_id": session.id},
+        {"$setOnInsert": health_guide.dict()},
+        upsert=True
+    )
+    if result.upserted_id is None:
+        guide_data = await db.health_guides.find_one({"session_id": session.id}, NO_ID)
+        return HealthGuide(**guide_data)
+    
+    return health_guide
+
 async def _determine_conversation_stage(session: Session, user_message: str) -> ConversationStageEnum:
     """Determine next conversation stage based on current stage and user input"""
     
@@ -435,9 +816,40 @@ async def _determine_conversation_stage(session: Session, user_message: str) ->
     
     return current_stage
 
+# Background health guide generation
+guide_tasks = GuideTaskPool(db, session_guard, _get_or_create_health_guide)
+guide_tasks.listeners.append(_publish_guide_status)
+
+# === HEALTH PROBES ===
+
+# Served outside /api, so load balancer probes are never rate limited
+readiness_probe = ReadinessProbe({
+    "mongo": mongo_check(client, pool_monitor),
+    "llm": llm_check(dr_arogya_service.slo),
+    "pdf": pdf_check(render_pool, guide_tasks)
+})
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and its event loop is serving requests"""
+    return FastJSONResponse({"status": "alive"}, headers={"Cache-Control": CACHE_NO_STORE})
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: Mongo answers a ping, its pool is not saturated and the PDF queue is short (503 otherwise)"""
+    ready, report = await readiness_probe.check()
+    return FastJSONResponse(report, status_code=200 if ready else 503, headers={"Cache-Control": CACHE_NO_STORE})
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Legacy download URLs (pdf_url from local storage) share the API handler
+app.add_api_route("/reports/{filename}", download_pdf_report, methods=["GET", "HEAD"], include_in_schema=False)
+
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, is_retry=is_retry(idempotency_store))
+
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -456,10 +868,30 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_db_client():
     logger.info("Dr. Arogya AI Health Companion - Starting up! 🏥")
-    # Cleanup old PDF reports on startup
-    pdf_service.cleanup_old_reports()
+    await session_guard.lease.ensure_indexes()
+    await db.messages.create_index([("session_id", 1), ("timestamp", 1)])
+    try:
+        await db.health_guides.create_index("session_id", unique=True)
+    except Exception as e:
+        logger.warning(f"Could not create unique health guide index (duplicate guides?): {e}")
+    await guide_tasks.resume_pending()
+    await report_index.ensure_indexes()
+    await feedback_rollups.ensure_indexes(db.sessions)
+    await ndjson_export.ensure_indexes(db)
+    await idempotency_store.ensure_indexes()
+    await rate_limiter.backend.ensure_indexes()
+    retention_sweeper.start()
+    # Load the grounding index (building it if the corpus changed) off the event loop, before the first guide
+    await asyncio.to_thread(dr_arogya_service.load_grounding_index)
+    if WARMUP_SERVICES & {"pdf", "all"}:
+        await pdf_service.ready()
+    if WARMUP_SERVICES & {"llm", "all"}:
+        await asyncio.to_thread(dr_arogya_service.warm_up)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await guide_tasks.shutdown()
+    await retention_sweeper.stop()
+    render_pool.shutdown()
     client.close()
     logger.info("Dr. Arogya AI Health Companion - Shutting down! 👋")
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBusyError(Exception):
+    """Raised when a session lease could not be acquired in time"""
+
+
+class SessionLockManager:
+    """Per-session asyncio locks for requests handled by this worker"""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._holders: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        """Serialise callers for one session inside this process"""
+
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._holders[session_id] = self._holders.get(session_id, 0) + 1
+
+        try:
+            async with lock:
+                yield
+        finally:
+            # Drop the lock once nobody is holding or waiting for it
+            self._holders[session_id] -= 1
+            if not self._holders[session_id]:
+                del self._holders[session_id]
+                del self._locks[session_id]
+
+
+class MongoLease:
+    """Expiring per-session lease shared by all workers through MongoDB"""
+
+    def __init__(self, collection, ttl_seconds: float = None, wait_seconds: float = None):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SESSION_LEASE_TTL_SECONDS", "120"))
+        self.wait_seconds = wait_seconds or float(os.getenv("SESSION_LEASE_WAIT_SECONDS", "60"))
+
+    async def ensure_indexes(self):
+        """Let MongoDB garbage collect leases abandoned by crashed workers"""
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def _try_acquire(self, key: str, owner: str) -> bool:
+        now = datetime.utcnow()
+
+        try:
+            # Take over a missing or expired lease; a live one makes the upsert collide
+            await self.collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$lt": now}},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=self.ttl_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _renew(self, key: str, owner: str):
+        """Push the expiry out while the holder works, so long turns and guides keep their lease"""
+
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            try:
+                result = await self.collection.update_one(
+                    {"_id": key, "owner": owner},
+                    {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)}}
+                )
+            except Exception as e:
+                logger.warning(f"Could not renew lease {key}: {e}")
+                continue
+            if not result.matched_count:
+                logger.warning(f"Lease {key} expired and was taken over while held")
+                return
+
+    async def expires_in(self, key: str) -> float:
+        """Seconds until the current holder's lease on key lapses; 0 when nobody holds it"""
+
+        lease = await self.collection.find_one({"_id": key}, {"expires_at": 1})
+        if lease is None:
+            return 0.0
+        return max((lease["expires_at"] - datetime.utcnow()).total_seconds(), 0.0)
+
+    @asynccontextmanager
+    async def hold(self, key: str, wait_seconds: float = None):
+        """Hold the lease for key, waiting up to wait_seconds for the current owner"""
+
+        owner = str(uuid.uuid4())
+        wait_seconds = self.wait_seconds if wait_seconds is None else wait_seconds
+        deadline = asyncio.get_running_loop().time() + wait_seconds
+        delay = 0.05
+
+        while not await self._try_acquire(key, owner):
+            if asyncio.get_running_loop().time() >= deadline:
+                raise SessionBusyError(f"Session {key} is busy")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        renewal = asyncio.create_task(self._renew(key, owner))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            await self.collection.delete_one({"_id": key, "owner": owner})
+
+
+class SessionGuard:
+    """Serialise work on a session within this worker and across workers"""
+
+    def __init__(self, lease: MongoLease):
+        self.local_locks = SessionLockManager()
+        self.lease = lease
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        # Queue locally first so concurrent requests on one worker don't poll MongoDB
+        async with self.local_locks.hold(session_id):
+            async with self.lease.hold(session_id):
+                yield
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def cancel_all(self):
+        """Cancel every shared computation (callers' cancellation never reaches them)"""
+        for task in list(self._inflight.values()):
+            task.cancel()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # A cancelled caller must not cancel the computation for everyone else
+        return await asyncio.shield(task)
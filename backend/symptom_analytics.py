@@ -0,0 +1,235 @@
+import logging
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from models import SeverityEnum
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.getenv("ANALYTICS_CHUNK_SIZE", "50000"))
+MAX_SYMPTOMS_PER_SESSION = 32
+MIN_SESSIONS = 5  # Symptoms and pairs seen in fewer sessions are left out of the results
+TOP_COOCCURRENCES = 20
+
+UNKNOWN = "unknown"
+SEVERITIES = [severity.value for severity in SeverityEnum] + [UNKNOWN]
+SESSION_PROJECTION = {"_id": 0, "id": 1, "language": 1, "symptoms": 1, "severity_level": 1, "emergency_detected": 1}
+
+SYMPTOMS_COLLECTION = "analytics_symptoms"
+LANGUAGES_COLLECTION = "analytics_language_outcomes"
+RUNS_COLLECTION = "analytics_runs"
+
+# A symptom pair (row, col) is packed into one int64 so pairs can be counted with np.unique
+PAIR_SHIFT = np.int64(32)
+PAIR_MASK = np.int64(0xFFFFFFFF)
+
+
+def _merge_counts(keys: np.ndarray, counts: np.ndarray):
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64)
+
+
+class SymptomAnalytics:
+    """Running symptom co-occurrence and per-language outcome counts over chunks of sessions.
+
+    With X the binary session-by-symptom matrix, the co-occurrence matrix is
+    X.T @ X. It is accumulated sparsely as COO pair counts over the upper
+    triangle, built per chunk by joining each session's symptoms with
+    themselves; the diagonal is the number of sessions per symptom.
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.pair_keys = np.empty(0, dtype=np.int64)
+        self.pair_counts = np.empty(0, dtype=np.int64)
+        self.symptom_emergencies = np.zeros(0, dtype=np.int64)
+        self.languages = pd.DataFrame()
+        self.sessions = 0
+
+    def _codes(self, symptoms: pd.Series) -> np.ndarray:
+        codes = symptoms.map(self.vocabulary)
+        missing = codes.isna()
+        if missing.any():
+            for symptom in pd.unique(symptoms[missing]):
+                self.vocabulary[symptom] = len(self.vocabulary)
+            codes = symptoms.map(self.vocabulary)
+        return codes.to_numpy(dtype=np.int64)
+
+    def add_chunk(self, sessions: pd.DataFrame, feedback: pd.DataFrame):
+        """Fold in a chunk of session documents and the feedback (session_id, rating) given on them"""
+
+        if sessions.empty:
+            return
+        sessions = sessions.reset_index(drop=True)
+        self.sessions += len(sessions)
+
+        emergency = sessions["emergency_detected"].eq(True).to_numpy()
+        language = sessions["language"].fillna(UNKNOWN).astype(str)
+        severity = sessions["severity_level"].fillna(UNKNOWN).astype(str)
+
+        # One row per (session, symptom), normalised and de-duplicated within a session
+        symptoms = sessions["symptoms"].explode().dropna().astype(str).str.strip().str.lower()
+        symptoms = symptoms[symptoms != ""]
+        pairs = pd.DataFrame({"row": symptoms.index.to_numpy(), "symptom": symptoms.to_numpy()})
+        pairs = pairs.drop_duplicates()
+        pairs = pairs[pairs.groupby("row").cumcount() < MAX_SYMPTOMS_PER_SESSION]
+
+        codes = self._codes(pairs["symptom"])
+        rows = pairs["row"].to_numpy()
+
+        # X.T @ X for this chunk: every symptom pair within a session, upper triangle only
+        entries = pd.DataFrame({"row": rows, "code": codes})
+        joined = entries.merge(entries, on="row", suffixes=("_a", "_b"))
+        a, b = joined["code_a"].to_numpy(), joined["code_b"].to_numpy()
+        upper = a <= b
+        keys = (a[upper] << PAIR_SHIFT) | b[upper]
+        self.pair_keys, self.pair_counts = _merge_counts(
+            np.concatenate([self.pair_keys, keys]),
+            np.concatenate([self.pair_counts, np.ones(len(keys), dtype=np.int64)])
+        )
+
+        emergencies = np.bincount(codes, weights=emergency[rows], minlength=len(self.vocabulary)).astype(np.int64)
+        emergencies[:len(self.symptom_emergencies)] += self.symptom_emergencies
+        self.symptom_emergencies = emergencies
+
+        # Outcomes per language, feedback averaged per session first
+        ratings = feedback.groupby("session_id")["rating"].agg(["sum", "count"])
+        rated = ratings.reindex(sessions["id"]).fillna(0).to_numpy()
+        frame = pd.DataFrame({
+            "language": language.to_numpy(),
+            "sessions": 1,
+            "emergencies": emergency.astype(np.int64),
+            "rating_sum": rated[:, 0],
+            "feedback_count": rated[:, 1]
+        })
+        stats = frame.groupby("language").sum()
+        stats = stats.join(pd.crosstab(language.to_numpy(), severity.to_numpy()).add_prefix("severity."))
+        self.languages = stats if self.languages.empty else self.languages.add(stats, fill_value=0)
+
+    def language_documents(self, generated_at: datetime) -> List[dict]:
+        documents = []
+        for language, row in self.languages.fillna(0).iterrows():
+            sessions = int(row["sessions"])
+            feedback_count = int(row["feedback_count"])
+            documents.append({
+                "_id": language,
+                "language": language,
+                "sessions": sessions,
+                "emergencies": int(row["emergencies"]),
+                "emergency_rate": round(float(row["emergencies"]) / sessions, 4) if sessions else None,
+                "severity": {severity: int(row.get(f"severity.{severity}", 0)) for severity in SEVERITIES},
+                "feedback_count": feedback_count,
+                "average_rating": round(float(row["rating_sum"]) / feedback_count, 2) if feedback_count else None,
+                "generated_at": generated_at
+            })
+        return documents
+
+    def symptom_documents(
+        self,
+        generated_at: datetime,
+        top: int = TOP_COOCCURRENCES,
+        min_sessions: int = MIN_SESSIONS
+    ) -> List[dict]:
+        """One document per common symptom with its most frequent companions and their lift"""
+
+        a = (self.pair_keys >> PAIR_SHIFT).astype(np.int64)
+        b = (self.pair_keys & PAIR_MASK).astype(np.int64)
+        diagonal = a == b
+
+        totals = np.zeros(len(self.vocabulary), dtype=np.int64)
+        totals[a[diagonal]] = self.pair_counts[diagonal]
+
+        # Mirror the upper triangle so every symptom lists its companions
+        common = ~diagonal & (self.pair_counts >= min_sessions)
+        pairs = pd.DataFrame({
+            "row": np.concatenate([a[common], b[common]]),
+            "col": np.concatenate([b[common], a[common]]),
+            "count": np.tile(self.pair_counts[common], 2)
+        })
+        pairs["lift"] = pairs["count"] * self.sessions / (totals[pairs["row"]] * totals[pairs["col"]])
+        pairs = pairs.sort_values(["row", "count"], ascending=[True, False]).groupby("row").head(top)
+
+        names = np.array(list(self.vocabulary), dtype=object)
+        companions = {
+            row: [
+                {"symptom": symptom, "sessions": int(count), "lift": round(float(lift), 3)}
+                for symptom, count, lift in zip(names[group["col"]], group["count"], group["lift"])
+            ]
+            for row, group in pairs.groupby("row")
+        }
+
+        return [
+            {
+                "_id": names[code],
+                "symptom": names[code],
+                "sessions": int(totals[code]),
+                "emergencies": int(self.symptom_emergencies[code]),
+                "emergency_rate": round(float(self.symptom_emergencies[code] / totals[code]), 4),
+                "co_occurs": companions.get(code, []),
+                "generated_at": generated_at
+            }
+            for code in np.flatnonzero(totals >= min_sessions)
+        ]
+
+
+def _chunks(cursor, size: int) -> Iterable[list]:
+    while True:
+        chunk = list(islice(cursor, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _replace_collection(db, name: str, documents: List[dict]):
+    """Swap in a freshly written collection so dashboards never read a half-written one"""
+
+    staging = db[f"{name}_staging"]
+    staging.drop()
+    for start in range(0, len(documents), 1000):
+        staging.insert_many(documents[start:start + 1000], ordered=False)
+    if documents:
+        staging.rename(name, dropTarget=True)
+    else:
+        db[name].drop()
+
+
+def run(db, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Recompute the symptom and language analytics from every session (synchronous pymongo database)"""
+
+    started = time.monotonic()
+    db.feedback.create_index("session_id")
+    analytics = SymptomAnalytics()
+
+    cursor = db.sessions.find({}, SESSION_PROJECTION, batch_size=min(chunk_size, 10000))
+    for chunk in _chunks(cursor, chunk_size):
+        sessions = pd.DataFrame.from_records(chunk, columns=list(SESSION_PROJECTION)[1:])
+        feedback = pd.DataFrame(
+            list(db.feedback.find({"session_id": {"$in": sessions["id"].tolist()}}, {"_id": 0, "session_id": 1, "rating": 1})),
+            columns=["session_id", "rating"]
+        )
+        analytics.add_chunk(sessions, feedback)
+        logger.info(f"Symptom analytics: {analytics.sessions} sessions processed")
+
+    generated_at = datetime.utcnow()
+    symptoms = analytics.symptom_documents(generated_at)
+    languages = analytics.language_documents(generated_at)
+    _replace_collection(db, SYMPTOMS_COLLECTION, symptoms)
+    _replace_collection(db, LANGUAGES_COLLECTION, languages)
+
+    summary = {
+        "generated_at": generated_at,
+        "sessions": analytics.sessions,
+        "symptoms": len(analytics.vocabulary),
+        "symptom_pairs": int(len(analytics.pair_keys)),
+        "symptoms_written": len(symptoms),
+        "languages_written": len(languages),
+        "duration_seconds": round(time.monotonic() - started, 1)
+    }
+    db[RUNS_COLLECTION].insert_one({**summary, "job": "symptom_analytics"})
+    return summary
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Set
+
+from fastapi import WebSocket
+
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+# Close code sent when this worker has no room for another socket ("try again later")
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_SESSION_NOT_FOUND = 4404
+CLOSE_HEARTBEAT_TIMEOUT = 4408
+
+
+class ConversationHub:
+    """Track live conversation sockets per session and fan events out to them"""
+
+    def __init__(self, max_connections: int = None, heartbeat_seconds: float = None):
+        self.max_connections = max_connections or int(os.getenv("WS_MAX_CONNECTIONS", "500"))
+        self.heartbeat_seconds = heartbeat_seconds or float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+
+        self._connections: Dict[str, Set[WebSocket]] = {}
+        self._count = 0
+
+    @property
+    def connection_count(self) -> int:
+        return self._count
+
+    def has_capacity(self) -> bool:
+        return self._count < self.max_connections
+
+    def register(self, session_id: str, websocket: WebSocket):
+        self._connections.setdefault(session_id, set()).add(websocket)
+        self._count += 1
+
+    def unregister(self, session_id: str, websocket: WebSocket):
+        sockets = self._connections.get(session_id)
+        if not sockets or websocket not in sockets:
+            return
+
+        sockets.discard(websocket)
+        self._count -= 1
+        if not sockets:
+            del self._connections[session_id]
+
+    async def send(self, websocket: WebSocket, event: Dict[str, Any]):
+        await websocket.send_text(dumps(event).decode())
+
+    async def publish(self, session_id: str, event: Dict[str, Any]):
+        """Send an event to every socket open on this session in this worker"""
+
+        payload = dumps(event).decode()
+        for websocket in list(self._connections.get(session_id, ())):
+            try:
+                await websocket.send_text(payload)
+            except Exception as e:
+                logger.info(f"Dropping conversation socket for session {session_id}: {e}")
+                self.unregister(session_id, websocket)
+
+    async def heartbeat(self, websocket: WebSocket, last_seen: Dict[str, float]):
+        """Ping the client periodically and close the socket if it stops answering"""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+
+            try:
+                if loop.time() - last_seen["at"] > 2 * self.heartbeat_seconds:
+                    await websocket.close(code=CLOSE_HEARTBEAT_TIMEOUT)
+                    return
+
+                await self.send(websocket, {"type": "ping"})
+            except Exception as e:
+                # The socket is already gone; the receive loop notices and cleans up
+                logger.info(f"Conversation socket heartbeat stopped: {e}")
+                return
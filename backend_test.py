@@ -82,7 +82,7 @@ class DrArogyaBackendTester:
                     languages = data["data"]
                     
                     # Check if we have expected languages
-                    expected_languages = ["english", "hindi", "kannada", "marathi"]
+                    expected_languages = ["english", "hindi"]
                     found_languages = [lang["code"] for lang in languages]
                     
                     if all(lang in found_languages for lang in expected_languages):
@@ -339,10 +339,14 @@ class DrArogyaBackendTester:
                 if response.status_code == 200:
                     data = response.json()
                     
-                    # Check if health guide was generated
-                    if data.get("health_guide"):
-                        self.log_test("Health Guide Generation", True, f"Health guide generated after {i+1} additional messages")
-                        return True
+                    # The guide is generated in the background once the turn marks it pending
+                    guide_status = data.get("session", {}).get("health_guide_status")
+                    if guide_status in ("pending", "ready"):
+                        if self.wait_for_health_guide():
+                            self.log_test("Health Guide Generation", True, f"Health guide generated after {i+1} additional messages")
+                            return True
+                        self.log_test("Health Guide Generation", False, "Health guide stayed pending or failed")
+                        return False
                         
                     # Small delay between messages
                     time.sleep(1)
@@ -358,6 +362,18 @@ class DrArogyaBackendTester:
             self.log_test("Health Guide Generation", False, f"Error: {str(e)}")
             return False
 
+    def wait_for_health_guide(self, timeout: float = 90) -> bool:
+        """Poll GET /health-guide until the background guide is ready (200) or fails"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = requests.get(f"{self.api_url}/sessions/{self.test_session_id}/health-guide", timeout=10)
+            if response.status_code == 200:
+                return True
+            if response.status_code != 202:
+                return False
+            time.sleep(2)
+        return False
+
     def test_get_health_guide(self) -> bool:
         """Test retrieving health guide"""
         if not self.test_session_id:
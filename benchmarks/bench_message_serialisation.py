@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialising get_session_messages for a 1000-message session
+Compares FastAPI's default jsonable_encoder + json path with the orjson FastJSONResponse
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from fast_json import FastJSONResponse
+from models import ApiResponse, LanguageEnum, Message
+
+MESSAGE_COUNT = 1000
+ROUNDS = 50
+
+
+def build_messages(count: int):
+    start = datetime.utcnow()
+    return [
+        Message(
+            session_id="bench-session",
+            sender="user" if i % 2 == 0 else "dr_arogya",
+            content=f"Message {i}: I have had a mild fever and headache since yesterday evening. " * 3,
+            language=LanguageEnum.HINDI,
+            timestamp=start + timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    messages = build_messages(MESSAGE_COUNT)
+    documents = [message.model_dump() for message in messages]
+    payload = ApiResponse(success=True, message="Messages retrieved", data=messages)
+
+    cases = {
+        "jsonable_encoder + JSONResponse (FastAPI default)": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        "pydantic model_dump_json": lambda: payload.model_dump_json(),
+        "FastJSONResponse (models)": lambda: FastJSONResponse(payload).body,
+        "FastJSONResponse (raw documents)": lambda: FastJSONResponse(
+            {"success": True, "message": "Messages retrieved", "data": documents}
+        ).body,
+    }
+
+    print(f"📊 Serialising {MESSAGE_COUNT} messages, best of 5 x {ROUNDS} rounds")
+    print("=" * 60)
+
+    baseline = None
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=ROUNDS, repeat=5)) / ROUNDS
+        baseline = baseline or best
+        print(f"{name:<52} {best * 1000:8.2f} ms  ({baseline / best:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
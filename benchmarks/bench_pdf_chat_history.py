@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: render time and peak memory of PDF reports with long chat histories
+Compares the chunked, windowed chat history with every message printed and with
+the previous single-Table layout, at 10, 100 and 1000 messages.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from reportlab.platypus import Paragraph, Table
+
+import pdf_service
+from models import HealthGuide, LanguageEnum, Message, Session, SeverityEnum
+from pdf_fonts import markup
+from pdf_service import PDFService
+from report_storage import LocalReportStorage
+from report_template import CHAT_COLUMN_WIDTHS, CHAT_HEADER_TABLE_STYLE
+
+MESSAGE_COUNTS = (10, 100, 1000)
+
+
+class SingleTablePDFService(PDFService):
+    """The previous layout: the whole history as one Table"""
+
+    def _chat_history_chunks(self, messages, template):
+        styles = template.styles
+        rows = [["Time", "Speaker", "Message"]]
+        for message in messages:
+            speaker = "You" if message.sender == "user" else "Dr. Arogya"
+            rows.append([
+                message.timestamp.strftime("%H:%M"), speaker,
+                Paragraph(markup(message.content[:200]), styles['ChatCell'])
+            ])
+        table = Table(rows, colWidths=CHAT_COLUMN_WIDTHS, repeatRows=1)
+        table.setStyle(CHAT_HEADER_TABLE_STYLE)
+        yield table
+
+
+def build_report(message_count: int):
+    session = Session(language=LanguageEnum.ENGLISH, symptoms=["fever"])
+    guide = HealthGuide(
+        session_id=session.id,
+        language=LanguageEnum.ENGLISH,
+        symptom_summary="Mild fever since yesterday.",
+        possible_conditions=["Viral fever"],
+        otc_recommendations=["Rest and fluids"],
+        warning_signs=["Fever above 103F"],
+        dietary_advice=["Light meals"],
+        lifestyle_tips=["Sleep well"],
+        when_to_see_doctor=["If fever lasts over 3 days"],
+        traditional_remedies=[],
+        severity_level=SeverityEnum.LOW
+    )
+    start = datetime.utcnow()
+    messages = [
+        Message(
+            session_id=session.id,
+            sender="user" if i % 2 == 0 else "dr_arogya",
+            content=f"Message {i}: I have had a mild fever and headache since yesterday evening. " * 3,
+            language=LanguageEnum.ENGLISH,
+            timestamp=start + timedelta(seconds=i)
+        )
+        for i in range(message_count)
+    ]
+    return session, guide, messages
+
+
+def measure(service: PDFService, report) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    service.generate_health_report(*report, include_chat_history=True)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / (1024 * 1024)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as reports_dir:
+        storage = LocalReportStorage(reports_dir)
+        variants = (
+            (f"windowed {pdf_service.HISTORY_HEAD}+{pdf_service.HISTORY_TAIL}", PDFService(storage), None),
+            ("chunked, all messages", PDFService(storage), (0, 0)),
+            ("single table (before)", SingleTablePDFService(storage), None),
+        )
+
+        for message_count in MESSAGE_COUNTS:
+            report = build_report(message_count)
+            print(f"{message_count} messages:")
+
+            for name, service, window in variants:
+                saved = pdf_service.HISTORY_HEAD, pdf_service.HISTORY_TAIL
+                if window:
+                    pdf_service.HISTORY_HEAD, pdf_service.HISTORY_TAIL = window
+                try:
+                    elapsed_ms, peak_mb = measure(service, report)
+                finally:
+                    pdf_service.HISTORY_HEAD, pdf_service.HISTORY_TAIL = saved
+                print(f"  {name:<24} {elapsed_ms:9.1f} ms  peak {peak_mb:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
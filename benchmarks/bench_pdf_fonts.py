@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF render time and file size per language with subset-embedded Noto fonts
+Set FONTS_DIR to a directory of Noto *-Regular.ttf / *-Bold.ttf files to include Indic scripts.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from models import HealthGuide, LanguageEnum, Message, Session, SeverityEnum, TraditionalRemedy
+from pdf_fonts import FONT_FAMILIES, LANGUAGE_SCRIPTS, _find_font_file, register_fonts
+from pdf_service import PDFService
+from report_storage import LocalReportStorage
+from report_template import get_report_template
+
+ROUNDS = 20
+
+SAMPLE_TEXT = {
+    LanguageEnum.ENGLISH: "Mild fever and headache since yesterday evening, with some body ache.",
+    LanguageEnum.HINDI: "कल शाम से हल्का बुखार और सिरदर्द है, साथ में बदन दर्द भी है।",
+    LanguageEnum.MARATHI: "कालपासून थोडा ताप आणि डोकेदुखी आहे, अंगदुखीही आहे.",
+    LanguageEnum.BENGALI: "গতকাল সন্ধ্যা থেকে হালকা জ্বর ও মাথাব্যথা, সাথে গা ব্যথা।",
+    LanguageEnum.GUJARATI: "ગઈકાલ સાંજથી હળવો તાવ અને માથાનો દુખાવો છે.",
+    LanguageEnum.TAMIL: "நேற்று மாலை முதல் லேசான காய்ச்சல் மற்றும் தலைவலி உள்ளது.",
+    LanguageEnum.TELUGU: "నిన్న సాయంత్రం నుండి తేలికపాటి జ్వరం మరియు తలనొప్పి ఉంది.",
+    LanguageEnum.KANNADA: "ನಿನ್ನೆ ಸಂಜೆಯಿಂದ ಸ್ವಲ್ಪ ಜ್ವರ ಮತ್ತು ತಲೆನೋವು ಇದೆ.",
+}
+
+
+def build_report(language: LanguageEnum):
+    text = SAMPLE_TEXT[language]
+    session = Session(language=language, symptoms=["fever", "headache"])
+    guide = HealthGuide(
+        session_id=session.id,
+        language=language,
+        symptom_summary=text,
+        possible_conditions=[text] * 3,
+        otc_recommendations=[text] * 3,
+        warning_signs=[text] * 3,
+        dietary_advice=[text] * 3,
+        lifestyle_tips=[text] * 3,
+        when_to_see_doctor=[text] * 3,
+        severity_level=SeverityEnum.LOW,
+        traditional_remedies=[
+            TraditionalRemedy(
+                name=text[:20], ingredients=[text[:10]], preparation=text,
+                usage=text, benefits=text, language=language
+            )
+        ]
+    )
+    messages = [
+        Message(session_id=session.id, sender="user" if i % 2 == 0 else "dr_arogya", content=text, language=language)
+        for i in range(20)
+    ]
+    return session, guide, messages
+
+
+def main():
+    fonts = register_fonts()
+    print(f"Registered scripts: {', '.join(fonts.scripts)}")
+
+    with tempfile.TemporaryDirectory() as reports_dir:
+        service = PDFService(LocalReportStorage(reports_dir))
+
+        for language in LanguageEnum:
+            session, guide, messages = build_report(language)
+
+            started = time.perf_counter()
+            get_report_template.cache_clear()
+            get_report_template(language)
+            template_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            for _ in range(ROUNDS):
+                filename = service.generate_health_report(session, guide, messages, True)
+            render_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+
+            size_kb = os.path.getsize(os.path.join(reports_dir, filename)) / 1024
+            family = FONT_FAMILIES.get(LANGUAGE_SCRIPTS[language])
+            font_path = _find_font_file(f"{family}-Regular.ttf") if family else None
+            if font_path:
+                full_font = f"{os.path.getsize(font_path) / 1024:7.1f} KB full font"
+            else:
+                full_font = f"{family} not installed" if family else "built-in Helvetica"
+
+            print(
+                f"{language.value:<9} render {render_ms:7.1f} ms  pdf {size_kb:7.1f} KB  "
+                f"({full_font}; template compile {template_ms:.2f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
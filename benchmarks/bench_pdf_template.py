@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: report throughput and per-render allocations
+Counts the ReportLab objects built per report (Paragraphs parse their markup on
+construction, so they dominate) and the tracemalloc peak, then measures
+single-thread and render-pool throughput.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+from models import HealthGuide, LanguageEnum, Message, Session, SeverityEnum, TraditionalRemedy
+from pdf_service import PDFService
+from report_storage import LocalReportStorage
+
+ROUNDS = 50
+WORKERS = 4
+
+
+def build_report(language: LanguageEnum):
+    session = Session(language=language, symptoms=["fever", "headache"])
+    items = [f"Recommendation {i}: rest, fluids and a light diet for a few days." for i in range(5)]
+    guide = HealthGuide(
+        session_id=session.id,
+        language=language,
+        symptom_summary="Mild fever and headache since yesterday evening, with some body ache.",
+        possible_conditions=items,
+        otc_recommendations=items,
+        warning_signs=items,
+        dietary_advice=items,
+        lifestyle_tips=items,
+        when_to_see_doctor=items,
+        severity_level=SeverityEnum.LOW,
+        traditional_remedies=[
+            TraditionalRemedy(
+                name="Ginger tea", ingredients=["ginger", "honey", "water"],
+                preparation="Boil sliced ginger in water for 5 minutes and add honey.",
+                usage="Drink warm twice a day.", benefits="Soothes the throat.", language=language
+            )
+        ] * 3
+    )
+    messages = [
+        Message(session_id=session.id, sender="user" if i % 2 == 0 else "dr_arogya",
+                content=f"Message {i} about the fever and headache.", language=language)
+        for i in range(30)
+    ]
+    return session, guide, messages
+
+
+def count_constructions(service: PDFService, report) -> Counter:
+    counts = Counter()
+    originals = {}
+
+    for cls in (Paragraph, Table, TableStyle, ParagraphStyle):
+        originals[cls] = cls.__init__
+
+        def counting_init(self, *args, _cls=cls, **kwargs):
+            counts[_cls.__name__] += 1
+            originals[_cls](self, *args, **kwargs)
+
+        cls.__init__ = counting_init
+
+    try:
+        service.generate_health_report(*report, include_chat_history=True)
+    finally:
+        for cls, init in originals.items():
+            cls.__init__ = init
+
+    return counts
+
+
+def main():
+    with tempfile.TemporaryDirectory() as reports_dir:
+        service = PDFService(LocalReportStorage(reports_dir))
+
+        for language in (LanguageEnum.ENGLISH, LanguageEnum.HINDI):
+            report = build_report(language)
+            service.generate_health_report(*report, include_chat_history=True)  # warm caches
+
+            counts = count_constructions(service, report)
+
+            tracemalloc.start()
+            service.generate_health_report(*report, include_chat_history=True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            started = time.perf_counter()
+            for _ in range(ROUNDS):
+                service.generate_health_report(*report, include_chat_history=True)
+            serial = ROUNDS / (time.perf_counter() - started)
+
+            with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+                started = time.perf_counter()
+                list(pool.map(lambda _: service.generate_health_report(*report, include_chat_history=True), range(ROUNDS)))
+                pooled = ROUNDS / (time.perf_counter() - started)
+
+            built = ", ".join(f"{name} {count}" for name, count in sorted(counts.items()))
+            print(f"{language.value}:")
+            print(f"  built per render: {built}")
+            print(f"  peak memory {peak / 1024:.0f} KiB")
+            print(f"  throughput {serial:.1f} reports/s serial, {pooled:.1f} reports/s with {WORKERS} threads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent large report downloads
+Drives ReportFileResponse and Starlette's FileResponse in-process with many
+concurrent full and ranged requests and reports throughput. Pass a base URL
+(e.g. http://localhost:8001 plus --filename) to hit a running server instead.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi import Request
+from fastapi.responses import FileResponse
+
+from report_downloads import ReportFileResponse
+
+FILE_SIZE = 32 * 1024 * 1024
+CONCURRENCY = 64
+
+
+def build_scope(headers: dict) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/reports/bench.pdf",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "extensions": {}
+    }
+
+
+async def drain(response, scope) -> int:
+    received = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await response(scope, receive, send)
+    return received
+
+
+async def run_in_process(path: str, concurrency: int, range_header: str = None):
+    report = {"filename": "bench.pdf", "size": os.path.getsize(path), "created_at": datetime.utcnow()}
+    headers = {"range": range_header} if range_header else {}
+
+    async def ours():
+        scope = build_scope(headers)
+        return await drain(ReportFileResponse(path, "bench.pdf", report, Request(scope)), scope)
+
+    async def starlette():
+        scope = build_scope(headers)
+        return await drain(FileResponse(path, filename="bench.pdf", media_type="application/pdf"), scope)
+
+    for name, factory in (("ReportFileResponse", ours), ("starlette FileResponse", starlette)):
+        started = time.perf_counter()
+        sizes = await asyncio.gather(*(factory() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        total = sum(sizes)
+        print(f"  {name:<24} {total / elapsed / 1e6:9.1f} MB/s  ({total / 1e6:.0f} MB in {elapsed:.2f}s)")
+
+
+async def run_against_server(base_url: str, filename: str, concurrency: int, range_header: str = None):
+    import httpx
+
+    headers = {"Range": range_header} if range_header else {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as http:
+        async def fetch():
+            total = 0
+            async with http.stream("GET", f"/api/reports/{filename}", headers=headers) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    total += len(chunk)
+            return total
+
+        started = time.perf_counter()
+        sizes = await asyncio.gather(*(fetch() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(sizes)
+    print(f"  server {total / elapsed / 1e6:9.1f} MB/s  ({total / 1e6:.0f} MB in {elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base_url", nargs="?", help="benchmark a running server instead of in-process")
+    parser.add_argument("--filename", help="report filename known to the server's report index")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+
+    ranged = f"bytes={FILE_SIZE // 2}-"
+
+    if args.base_url:
+        for label, range_header in (("full", None), ("second half (Range)", ranged)):
+            print(f"{args.concurrency} concurrent downloads, {label}:")
+            asyncio.run(run_against_server(args.base_url, args.filename, args.concurrency, range_header))
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(os.urandom(FILE_SIZE))
+        f.flush()
+
+        print(f"{args.concurrency} concurrent downloads of a {FILE_SIZE // (1024 * 1024)} MiB report, full:")
+        asyncio.run(run_in_process(f.name, args.concurrency))
+        print(f"{args.concurrency} concurrent downloads, second half (Range):")
+        asyncio.run(run_in_process(f.name, args.concurrency, ranged))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: symptom co-occurrence and outcome statistics over synthetic sessions
+Times SymptomAnalytics.add_chunk (the vectorised part of the offline job, no Mongo)
+and extrapolates to 10M sessions.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from symptom_analytics import CHUNK_SIZE, SEVERITIES, SymptomAnalytics
+
+SESSIONS = 1_000_000
+VOCABULARY = 2000
+LANGUAGES = ["english", "hindi", "kannada", "marathi", "telugu", "tamil", "bengali", "gujarati", None]
+FEEDBACK_SHARE = 0.2
+
+
+def build_chunk(rng: np.random.Generator, start: int, size: int):
+    # Zipf-like symptom popularity, 1-6 symptoms per session
+    weights = 1 / np.arange(1, VOCABULARY + 1)
+    weights /= weights.sum()
+    lengths = rng.integers(1, 7, size)
+    flat = rng.choice(VOCABULARY, lengths.sum(), p=weights)
+    symptoms = np.split(np.char.add("symptom ", flat.astype(str)).astype(object), np.cumsum(lengths)[:-1])
+
+    ids = [f"session-{start + i}" for i in range(size)]
+    sessions = pd.DataFrame({
+        "id": ids,
+        "language": rng.choice(np.array(LANGUAGES, dtype=object), size),
+        "symptoms": [list(s) for s in symptoms],
+        "severity_level": rng.choice(np.array(SEVERITIES[:-1] + [None], dtype=object), size),
+        "emergency_detected": rng.random(size) < 0.03
+    })
+    rated = rng.random(size) < FEEDBACK_SHARE
+    feedback = pd.DataFrame({
+        "session_id": np.array(ids, dtype=object)[rated],
+        "rating": rng.integers(1, 6, rated.sum())
+    })
+    return sessions, feedback
+
+
+def main():
+    rng = np.random.default_rng(7)
+    chunks = [build_chunk(rng, start, CHUNK_SIZE) for start in range(0, SESSIONS, CHUNK_SIZE)]
+
+    analytics = SymptomAnalytics()
+    started = time.perf_counter()
+    for sessions, feedback in chunks:
+        analytics.add_chunk(sessions, feedback)
+    folded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    symptoms = analytics.symptom_documents(datetime.utcnow())
+    languages = analytics.language_documents(datetime.utcnow())
+    summarised = time.perf_counter() - started
+
+    rate = SESSIONS / folded
+    print(f"{SESSIONS:,} sessions in chunks of {CHUNK_SIZE:,}: {folded:.1f}s ({rate:,.0f} sessions/s)")
+    print(f"{len(analytics.vocabulary)} symptoms, {len(analytics.pair_keys):,} distinct pairs")
+    print(f"results: {len(symptoms)} symptom documents, {len(languages)} language documents in {summarised:.2f}s")
+    print(f"extrapolated to 10M sessions: {10_000_000 / rate / 60:.1f} min of compute (plus Mongo reads)")
+
+
+if __name__ == "__main__":
+    main()
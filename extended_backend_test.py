@@ -11,6 +11,18 @@ from dotenv import load_dotenv
 
 load_dotenv('/app/frontend/.env')
 
+def wait_for_health_guide(api_url, session_id, timeout=90):
+    """Poll GET /health-guide until the background guide is ready (200) or fails"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = requests.get(f"{api_url}/sessions/{session_id}/health-guide")
+        if response.status_code == 200:
+            return True
+        if response.status_code != 202:
+            return False
+        time.sleep(2)
+    return False
+
 def test_complete_health_consultation():
     """Test a complete health consultation flow including health guide and PDF generation"""
     
@@ -79,10 +91,10 @@ def test_complete_health_consultation():
         
         response_data = msg_response.json()
         
-        # Check if health guide was generated
-        if response_data.get("health_guide"):
-            print(f"✅ Health guide generated after message {i+1}")
-            health_guide_generated = True
+        # The guide is generated in the background once the turn marks it pending
+        if response_data["session"].get("health_guide_status") in ("pending", "ready"):
+            print(f"✅ Health guide requested after message {i+1}, waiting for it...")
+            health_guide_generated = wait_for_health_guide(api_url, session_id)
             break
         
         # Small delay between messages
@@ -4,6 +4,9 @@ import MessageBubble from "./MessageBubble";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Without REACT_APP_BACKEND_URL the API is served from the page's own origin
+const WS_API = `${(BACKEND_URL || window.location.origin).replace(/^http/, "ws")}/api`;
+const MAX_RECONNECT_DELAY = 15000;
 
 const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuideGenerated }) => {
   const [messages, setMessages] = useState([]);
@@ -14,16 +17,123 @@ const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuide
   
   const messagesEndRef = useRef(null);
   const inputRef = useRef(null);
+  const guidePollRef = useRef(null);
+  const guidePollingRef = useRef(false);
+  const guideDeliveredRef = useRef(false);
+  const socketRef = useRef(null);
+  const reconnectRef = useRef({ timer: null, attempts: 0, opened: false, stopped: false });
+  const lastMessageIdRef = useRef(null);
 
   useEffect(() => {
-    fetchInitialMessages();
-    fetchSession();
+    reconnectRef.current = { timer: null, attempts: 0, opened: false, stopped: false };
+    lastMessageIdRef.current = null;
+    guideDeliveredRef.current = false;
+    connectSocket();
+
+    return () => {
+      reconnectRef.current.stopped = true;
+      clearTimeout(reconnectRef.current.timer);
+      stopGuidePoll();
+      socketRef.current?.close();
+    };
   }, [sessionId]);
 
   useEffect(() => {
     scrollToBottom();
+
+    // Remember the newest server-side message so a reconnect only fetches what we missed
+    const lastStored = [...messages].reverse().find(msg => !msg.pending);
+    if (lastStored) {
+      lastMessageIdRef.current = lastStored.id;
+    }
   }, [messages]);
 
+  const appendMessages = (incoming) => {
+    setMessages(prev => {
+      const known = new Set(prev.map(msg => msg.id));
+      return [...prev.filter(msg => !msg.pending), ...incoming.filter(msg => !known.has(msg.id))];
+    });
+  };
+
+  const connectSocket = () => {
+    const socket = new WebSocket(`${WS_API}/ws/sessions/${sessionId}`);
+    socketRef.current = socket;
+
+    socket.onopen = () => {
+      reconnectRef.current.attempts = 0;
+      reconnectRef.current.opened = true;
+      socket.send(JSON.stringify({ type: "resume", last_message_id: lastMessageIdRef.current }));
+    };
+
+    socket.onmessage = (e) => handleSocketEvent(socket, JSON.parse(e.data));
+
+    socket.onclose = (e) => {
+      if (reconnectRef.current.stopped || e.code === 4404) return;
+
+      // WebSocket unavailable (e.g. blocked by a proxy) - fall back to plain HTTP
+      if (!reconnectRef.current.opened) {
+        reconnectRef.current.stopped = true;
+        fetchInitialMessages();
+        fetchSession();
+        return;
+      }
+
+      const delay = Math.min(1000 * 2 ** reconnectRef.current.attempts, MAX_RECONNECT_DELAY);
+      reconnectRef.current.attempts += 1;
+      reconnectRef.current.timer = setTimeout(connectSocket, delay);
+    };
+  };
+
+  const handleSocketEvent = (socket, event) => {
+    switch (event.type) {
+      case "ping":
+        socket.send(JSON.stringify({ type: "pong" }));
+        break;
+      case "resumed":
+        appendMessages(event.messages);
+        setSession(event.session);
+        syncHealthGuide(event.session);
+        // The reply to a message sent before the socket dropped may have landed while it was down
+        if (event.messages.length && event.messages[event.messages.length - 1].sender !== "user") {
+          setLoading(false);
+        }
+        break;
+      case "typing":
+        setLoading(true);
+        break;
+      case "message":
+        appendMessages([event.message]);
+        if (event.message.sender !== "user") {
+          setLoading(false);
+          setTimeout(() => inputRef.current?.focus(), 100);
+        }
+        break;
+      case "stage":
+        setSession(event.session);
+        syncHealthGuide(event.session);
+        break;
+      case "emergency":
+        onEmergencyDetected();
+        break;
+      case "guide_ready":
+        guideDeliveredRef.current = true;
+        stopGuidePoll();
+        onHealthGuideGenerated(event.health_guide);
+        break;
+      case "guide_failed":
+        stopGuidePoll();
+        setError("We couldn't prepare your health guide. Please send another message to try again.");
+        break;
+      case "error":
+        setError(event.detail);
+        setLoading(false);
+        setMessages(prev => prev.filter(msg => !msg.pending));
+        break;
+      default:
+        break;
+    }
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
@@ -44,12 +154,51 @@ const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuide
       const response = await axios.get(`${API}/sessions/${sessionId}`);
       if (response.data.success) {
         setSession(response.data.data);
+        syncHealthGuide(response.data.data);
       }
     } catch (err) {
       console.error("Error fetching session:", err);
     }
   };
 
+  const stopGuidePoll = () => {
+    guidePollingRef.current = false;
+    clearTimeout(guidePollRef.current);
+  };
+
+  const pollHealthGuide = async () => {
+    guidePollingRef.current = true;
+    try {
+      const response = await axios.get(`${API}/sessions/${sessionId}/health-guide`);
+      if (!guidePollingRef.current) return;
+      if (response.status === 200 && response.data.success) {
+        guidePollingRef.current = false;
+        guideDeliveredRef.current = true;
+        onHealthGuideGenerated(response.data.data);
+        return;
+      }
+    } catch (err) {
+      if (!guidePollingRef.current) return;
+      if (err.response?.status !== 404) {
+        guidePollingRef.current = false;
+        setError("We couldn't prepare your health guide. Please send another message to try again.");
+        return;
+      }
+    }
+
+    // Still pending (202) - check again shortly
+    guidePollRef.current = setTimeout(pollHealthGuide, 3000);
+  };
+
+  // guide_ready is only pushed by the worker that generated the guide, so after a reconnect, or when
+  // another worker resumed the job, the session status is what tells us to poll for (or fetch) the guide
+  const syncHealthGuide = (updatedSession) => {
+    const status = updatedSession?.health_guide_status;
+    if ((status === "pending" || status === "ready") && !guideDeliveredRef.current && !guidePollingRef.current) {
+      pollHealthGuide();
+    }
+  };
+
   const sendMessage = async () => {
     if (!inputMessage.trim() || loading) return;
 
@@ -59,7 +208,8 @@ const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuide
       sender: "user",
       content: inputMessage,
       language: language.code,
-      timestamp: new Date()
+      timestamp: new Date(),
+      pending: true
     };
 
     setMessages(prev => [...prev, userMessage]);
@@ -68,16 +218,23 @@ const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuide
     setLoading(true);
     setError(null);
 
+    // Prefer the conversation socket; the server echoes the stored message back
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: "message", content: messageToSend, language: language.code }));
+      return;
+    }
+
     try {
       const response = await axios.post(`${API}/sessions/${sessionId}/messages`, {
         content: messageToSend,
         language: language.code
       });
 
-      if (response.data.success) {
+      if (response.data.message) {
         const { message, session: updatedSession, health_guide, emergency_alert } = response.data;
         
-        setMessages(prev => [...prev, message]);
+        setMessages(prev => [...prev.map(msg => msg.id === userMessage.id ? { ...msg, pending: false } : msg), message]);
         setSession(updatedSession);
 
         // Handle emergency alert
@@ -88,10 +245,17 @@ const ChatInterface = ({ sessionId, language, onEmergencyDetected, onHealthGuide
 
         // Handle health guide generation
         if (health_guide) {
+          guideDeliveredRef.current = true;
           onHealthGuideGenerated(health_guide);
           return;
         }
 
+        // Health guide is being prepared in the background
+        if (updatedSession?.health_guide_status === "pending") {
+          syncHealthGuide(updatedSession);
+          return;
+        }
+
         // Auto-focus input for next message
         setTimeout(() => {
           inputRef.current?.focus();
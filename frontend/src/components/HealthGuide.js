@@ -23,7 +23,9 @@ const HealthGuide = ({ healthGuide, sessionId, language }) => {
       if (response.data.pdf_url) {
         // Create download link
         const link = document.createElement('a');
-        link.href = `${BACKEND_URL}${response.data.pdf_url}`;
+        // Presigned object-storage URLs are absolute; local reports are served by the backend
+        const pdfUrl = response.data.pdf_url;
+        link.href = /^https?:\/\//.test(pdfUrl) ? pdfUrl : `${BACKEND_URL}${pdfUrl}`;
         link.download = response.data.filename;
         document.body.appendChild(link);
         link.click();
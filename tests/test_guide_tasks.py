@@ -0,0 +1,122 @@
+"""
+Background health guides: a guide whose lease is held elsewhere is retried
+once that lease lapses, and left alone when its holder finishes it.
+"""
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from guide_tasks import GuideTaskPool
+from models import GuideStatusEnum, Session
+from session_locks import SessionBusyError
+
+
+class FakeLease:
+    """Leases held by other (possibly crashed) workers until a loop time"""
+
+    def __init__(self):
+        self.held_until = {}
+
+    def _remaining(self, key):
+        return max(self.held_until.get(key, 0) - asyncio.get_running_loop().time(), 0.0)
+
+    async def expires_in(self, key):
+        return self._remaining(key)
+
+    @asynccontextmanager
+    async def hold(self, key, wait_seconds=None):
+        if self._remaining(key):
+            raise SessionBusyError(key)
+        yield
+
+
+class FakeGuard:
+    def __init__(self, lease):
+        self.lease = lease
+
+    @asynccontextmanager
+    async def hold(self, session_id):
+        yield
+
+
+class FakeSessions:
+    def __init__(self, sessions):
+        self.sessions = {session["id"]: session for session in sessions}
+        self.writes = []
+
+    def _matches(self, session, query):
+        return all(session.get(field) == value for field, value in query.items())
+
+    async def find_one(self, query, projection=None):
+        return next((session for session in self.sessions.values() if self._matches(session, query)), None)
+
+    async def update_one(self, query, update):
+        session = await self.find_one(query)
+        if session is not None:
+            session.update(update["$set"])
+            self.writes.append(update["$set"]["health_guide_status"])
+
+
+class FakeDb:
+    def __init__(self, sessions):
+        self.sessions = FakeSessions(sessions)
+
+
+def pending_session():
+    session = Session(id="s1", health_guide_status=GuideStatusEnum.PENDING)
+    return session, session.model_dump()
+
+
+def test_guide_is_generated_once_a_crashed_workers_lease_lapses():
+    session, document = pending_session()
+    db = FakeDb([document])
+    lease = FakeLease()
+    generated = []
+
+    async def generate(session):
+        generated.append(session.id)
+
+    async def run():
+        # A crashed worker's lease that is still live when this worker restarts
+        lease.held_until["guide:s1"] = asyncio.get_running_loop().time() + 0.3
+        pool = GuideTaskPool(db, FakeGuard(lease), generate)
+        await pool.submit(session)
+
+    asyncio.run(run())
+
+    assert generated == ["s1"]
+    assert db.sessions.writes == [GuideStatusEnum.READY]
+    assert document["health_guide_status"] == GuideStatusEnum.READY
+
+
+def test_guide_finished_by_the_lease_holder_is_not_generated_again():
+    session, document = pending_session()
+    db = FakeDb([document])
+    lease = FakeLease()
+    generated = []
+
+    async def generate(session):
+        generated.append(session.id)
+
+    async def holder_finishes():
+        await asyncio.sleep(0.1)
+        document["health_guide_status"] = GuideStatusEnum.READY
+
+    async def run():
+        lease.held_until["guide:s1"] = asyncio.get_running_loop().time() + 0.2
+        pool = GuideTaskPool(db, FakeGuard(lease), generate)
+        await asyncio.gather(pool.submit(session), holder_finishes())
+
+    asyncio.run(run())
+
+    assert generated == []
+    assert db.sessions.writes == []
@@ -0,0 +1,183 @@
+"""
+Idempotency-Key handling: a repeated request replays the stored response, a
+reused key with a different payload is refused, a failure releases the key
+and an abandoned in-progress record is taken over.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("orjson")
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from starlette.requests import Request
+
+from idempotency import (
+    DONE, IN_PROGRESS, REPLAYED_HEADER, IdempotencyKeyReusedError, IdempotencyStore, idempotent, request_hash
+)
+from models import PDFReportRequest
+
+
+class FakeCollection:
+    """Enough of a Motor collection for the store: documents keyed by _id"""
+
+    def __init__(self):
+        self.documents = {}
+
+    def _matches(self, document, query):
+        return all(document.get(field) == value for field, value in query.items())
+
+    async def insert_one(self, document):
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate key")
+        self.documents[document["_id"]] = dict(document)
+
+    async def find_one(self, query, projection=None):
+        return next((dict(document) for document in self.documents.values() if self._matches(document, query)), None)
+
+    async def update_one(self, query, update):
+        document = next((document for document in self.documents.values() if self._matches(document, query)), None)
+        if document is not None:
+            document.update(update["$set"])
+
+    async def find_one_and_update(self, query, update):
+        document = await self.find_one(query)
+        await self.update_one(query, update)
+        return document
+
+    async def delete_one(self, query):
+        for key, document in list(self.documents.items()):
+            if self._matches(document, query):
+                del self.documents[key]
+                return
+
+
+def build_store():
+    return IdempotencyStore(FakeCollection(), ttl_seconds=60, lease_seconds=60, wait_seconds=1)
+
+
+def counting(result):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_repeat_replays_the_stored_response():
+    store = build_store()
+    compute, calls = counting({"ok": True})
+
+    async def run():
+        first = await store.run("k", "hash-a", compute)
+        second = await store.run("k", "hash-a", compute)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert calls == [1]
+    assert not first.replayed and second.replayed
+    assert second.body == first.body == b'{"ok":true}'
+    assert store.collection.documents["k"]["state"] == DONE
+
+
+def test_key_reused_with_another_payload_is_refused():
+    store = build_store()
+    compute, calls = counting({"ok": True})
+
+    async def run():
+        await store.run("k", "hash-a", compute)
+        await store.run("k", "hash-b", compute)
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        asyncio.run(run())
+    assert calls == [1]
+
+
+def test_failure_releases_the_key_for_a_retry():
+    store = build_store()
+
+    async def fail():
+        raise RuntimeError("LLM unavailable")
+
+    compute, calls = counting({"ok": True})
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await store.run("k", "hash-a", fail)
+        return await store.run("k", "hash-a", compute)
+
+    assert not asyncio.run(run()).replayed
+    assert calls == [1]
+
+
+def test_abandoned_in_progress_record_is_taken_over():
+    store = build_store()
+    store.collection.documents["k"] = {
+        "_id": "k",
+        "request_hash": "hash-a",
+        "state": IN_PROGRESS,
+        "owner": "crashed-worker",
+        "expires_at": datetime.utcnow() - timedelta(seconds=1)
+    }
+    compute, calls = counting({"ok": True})
+
+    stored = asyncio.run(store.run("k", "hash-a", compute))
+
+    assert calls == [1] and not stored.replayed
+    assert store.collection.documents["k"]["state"] == DONE
+    assert store.collection.documents["k"]["owner"] != "crashed-worker"
+
+
+def post_request(key):
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/sessions/s1/generate-pdf",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", key.encode())],
+        "server": ("testserver", 80),
+        "scheme": "http"
+    })
+
+
+def test_idempotent_endpoint_replays_and_answers_422_on_mismatch():
+    store = build_store()
+    compute, calls = counting({"filename": "report.pdf", "pdf_url": "old"})
+    refresh = lambda body: {**body, "pdf_url": "fresh"}
+
+    async def run():
+        first = await idempotent(store, post_request("k"), PDFReportRequest(session_id="s1"), compute, refresh)
+        replay = await idempotent(store, post_request("k"), PDFReportRequest(session_id="s1"), compute, refresh)
+        with pytest.raises(HTTPException) as reused:
+            await idempotent(
+                store, post_request("k"),
+                PDFReportRequest(session_id="s1", include_chat_history=False), compute, refresh
+            )
+        return first, replay, reused.value
+
+    first, replay, reused = asyncio.run(run())
+
+    assert calls == [1]
+    assert REPLAYED_HEADER.lower() not in first.headers
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert replay.body == b'{"filename":"report.pdf","pdf_url":"fresh"}'
+    assert reused.status_code == 422
+
+
+def test_fingerprint_covers_path_and_payload():
+    payload = PDFReportRequest(session_id="s1")
+
+    assert request_hash("/a", payload) == request_hash("/a", PDFReportRequest(session_id="s1"))
+    assert request_hash("/a", payload) != request_hash("/b", payload)
+    assert request_hash("/a", payload) != request_hash("/a", PDFReportRequest(session_id="s1", include_chat_history=False))
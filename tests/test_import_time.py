@@ -0,0 +1,46 @@
+"""
+Cold-start regression test: importing the API server must stay fast and must
+not pull in the subsystems that are loaded on first use.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("dotenv")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from import_profile import imported_modules, profile_imports, summarize
+
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.5"))
+LAZY_MODULES = ["reportlab", "emergentintegrations", "requests", "numpy", "pdf_service", "grounding"]
+
+# Motor does not connect until the first operation, so any URL will do
+SERVER_ENV = {
+    "MONGO_URL": os.getenv("MONGO_URL", "mongodb://localhost:27017"),
+    "DB_NAME": os.getenv("DB_NAME", "dr_arogya_import_test")
+}
+
+
+@pytest.fixture(scope="module")
+def server_imports():
+    # Best of three, so a busy machine does not fail the budget
+    runs = [profile_imports("server", SERVER_ENV) for _ in range(3)]
+    return min(runs, key=lambda timings: summarize(timings)["total_seconds"])
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_heavy_subsystems_load_lazily(server_imports, module):
+    loaded = {name for name in imported_modules(server_imports) if name == module or name.startswith(f"{module}.")}
+    assert not loaded, f"importing server loaded {sorted(loaded)[:5]}"
+
+
+def test_import_time_within_budget(server_imports):
+    summary = summarize(server_imports)
+    slowest = ", ".join(f"{timing.module} {timing.cumulative_us / 1000:.0f}ms" for timing in summary["slowest"][:5])
+    assert summary["total_seconds"] < IMPORT_TIME_BUDGET_SECONDS, f"slowest imports: {slowest}"
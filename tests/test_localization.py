@@ -0,0 +1,37 @@
+"""
+Only fully translated languages are offered; the rest fall back to English
+text and are reported as incomplete.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from localization import LOCALES_DIR, MessageCatalog
+from models import LanguageEnum
+
+
+def test_english_and_hindi_are_complete():
+    catalog = MessageCatalog.compile()
+
+    assert catalog.is_complete(LanguageEnum.ENGLISH)
+    assert catalog.is_complete(LanguageEnum.HINDI)
+
+
+def test_partial_locale_is_not_complete_and_falls_back(tmp_path):
+    for language in LanguageEnum:
+        if language in (LanguageEnum.ENGLISH, LanguageEnum.HINDI):
+            (tmp_path / f"{language.value}.json").write_text((LOCALES_DIR / f"{language.value}.json").read_text("utf-8"), "utf-8")
+    (tmp_path / "kannada.json").write_text(json.dumps({"language_name": "Kannada (ಕನ್ನಡ)"}), "utf-8")
+
+    catalog = MessageCatalog.compile(tmp_path)
+
+    assert not catalog.is_complete(LanguageEnum.KANNADA)
+    assert catalog.get("welcome_message", LanguageEnum.KANNADA) == catalog.get("welcome_message", LanguageEnum.ENGLISH)
+    assert catalog.get("language_name", LanguageEnum.KANNADA) == "Kannada (ಕನ್ನಡ)"
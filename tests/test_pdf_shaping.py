@@ -0,0 +1,63 @@
+"""
+Indic script runs in PDF reports are shaped through HarfBuzz, whatever the
+report language. Skipped unless the Devanagari Noto font is installed (see
+backend/fonts/README.md) and uharfbuzz is available.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("uharfbuzz")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from reportlab.pdfbase.ttfonts import ShapedStr
+
+import pdf_fonts
+from models import LanguageEnum
+from report_template import build_stylesheet
+
+if pdf_fonts._find_font_file("NotoSansDevanagari-Regular.ttf") is None:
+    pytest.skip("NotoSansDevanagari is not installed", allow_module_level=True)
+
+MIXED_TEXT = "Traditional Remedies (दादी माँ के नुस्खे)"
+
+
+def laid_out_words(para):
+    """(font name, text) of every word run after layout"""
+
+    para.wrap(400, 200)
+    if para.blPara.kind == 0:
+        # Single-font layout: lines are (width, [words]) in the style's font
+        return [(para.style.fontName, word) for _, words in para.blPara.lines for word in words]
+    return [(word.fontName, word.text) for line in para.blPara.lines for word in line.words]
+
+
+@pytest.mark.parametrize("language", [LanguageEnum.ENGLISH, LanguageEnum.HINDI])
+def test_mixed_script_paragraph_is_shaped(language):
+    styles = build_stylesheet(language)
+    para = pdf_fonts.paragraph(pdf_fonts.markup(MIXED_TEXT), styles["SectionHeader"])
+
+    devanagari = [text for font, text in laid_out_words(para) if font.startswith("NotoSansDevanagari") and text.strip()]
+    assert devanagari
+    assert any(isinstance(text, ShapedStr) for text in devanagari)
+
+
+def test_latin_paragraph_keeps_its_style():
+    style = build_stylesheet(LanguageEnum.ENGLISH)["CustomBodyText"]
+    text = pdf_fonts.markup("Drink warm water with honey")
+
+    assert pdf_fonts.shaped_style(style, text) is style
+    assert not any(isinstance(text, ShapedStr) for _, text in laid_out_words(pdf_fonts.paragraph(text, style)))
+
+
+def test_shaped_style_is_derived_once_per_style():
+    style = build_stylesheet(LanguageEnum.ENGLISH)["CustomBodyText"]
+    text = pdf_fonts.markup("अदरक की चाय")
+
+    shaped = pdf_fonts.shaped_style(style, text)
+    assert shaped is pdf_fonts.shaped_style(style, text)
+    assert shaped.shaping == 1 and shaped.fontName == "NotoSansDevanagari"
@@ -0,0 +1,125 @@
+"""
+Rate-limit keying: clients behind a trusted proxy, users tied to sessions, and
+forwarded headers from untrusted peers.
+"""
+
+import asyncio
+import ipaddress
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from rate_limit import LLM, READ, MemoryRateLimitBackend, RateLimiter, RateLimitMiddleware, RateLimitPolicy, SessionUsers
+
+PROXY = "10.0.0.7"
+TRUSTED = [ipaddress.ip_network("10.0.0.0/8")]
+
+
+class FakeSessions:
+    def __init__(self, users):
+        self.users = users
+        self.lookups = 0
+
+    async def find_one(self, query, projection=None):
+        self.lookups += 1
+        if query["id"] not in self.users:
+            return None
+        return {"user_id": self.users[query["id"]]}
+
+
+def proxied(app, peer=PROXY):
+    """Every request arrives from `peer`, as it would behind an ingress"""
+
+    async def asgi(scope, receive, send):
+        await app({**scope, "client": (peer, 40000)}, receive, send)
+    return asgi
+
+
+def build_client(users, peer=PROXY, trusted_proxies=TRUSTED):
+    app = FastAPI()
+
+    @app.post("/api/sessions/{session_id}/messages")
+    async def send_message(session_id: str):
+        return {"ok": True}
+
+    limiter = RateLimiter(
+        MemoryRateLimitBackend(),
+        {LLM: RateLimitPolicy(LLM, burst=2, per_minute=1), READ: RateLimitPolicy(READ, burst=100, per_minute=100)},
+        session_users=SessionUsers(FakeSessions(users)),
+        trusted_proxies=trusted_proxies,
+        enabled=True
+    )
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(proxied(app, peer)), limiter
+
+
+def post(client, session_id, forwarded_for):
+    return client.post(f"/api/sessions/{session_id}/messages", headers={"X-Forwarded-For": forwarded_for})
+
+
+def test_two_users_behind_one_proxy_get_separate_buckets():
+    client, _ = build_client({"s-alice": "alice", "s-bob": "bob"})
+
+    assert [post(client, "s-alice", "203.0.113.1").status_code for _ in range(3)] == [200, 200, 429]
+    assert post(client, "s-bob", "203.0.113.2").status_code == 200
+
+
+def test_user_bucket_spans_that_users_sessions():
+    client, _ = build_client({"s-1": "alice", "s-2": "alice"})
+
+    assert post(client, "s-1", "203.0.113.1").status_code == 200
+    assert post(client, "s-1", "203.0.113.1").status_code == 200
+    # Another session and address, but the same user
+    assert post(client, "s-2", "203.0.113.9").status_code == 429
+
+
+def test_forwarded_header_from_untrusted_peer_is_ignored():
+    client, _ = build_client({"s-1": None, "s-2": None}, peer="198.51.100.4")
+
+    assert post(client, "s-1", "203.0.113.1").status_code == 200
+    assert post(client, "s-1", "203.0.113.2").status_code == 200
+    # A new session and a new forwarded address, but the same real peer
+    assert post(client, "s-2", "203.0.113.3").status_code == 429
+
+
+def test_client_cannot_choose_its_address_through_the_proxy():
+    _, limiter = build_client({})
+    scope = {
+        "type": "http",
+        "path": "/api/",
+        "client": (PROXY, 1),
+        # The client sent the first entry itself; the ingress appended its real address
+        "headers": [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.1, 10.0.0.3")]
+    }
+
+    assert asyncio.run(limiter.keys(scope)) == ["ip:203.0.113.1"]
+
+
+def test_session_users_are_cached_but_unknown_sessions_are_not():
+    sessions = FakeSessions({"s-alice": "alice"})
+    users = SessionUsers(sessions)
+
+    assert asyncio.run(users.get("s-alice")) == "alice"
+    assert asyncio.run(users.get("s-alice")) == "alice"
+    assert asyncio.run(users.get("missing")) is None
+    assert asyncio.run(users.get("missing")) is None
+    assert sessions.lookups == 3
+
+
+def test_limiter_stays_off_by_default_without_trusted_proxies(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_ENABLED", raising=False)
+
+    assert not RateLimiter(MemoryRateLimitBackend(), trusted_proxies=[]).enabled
+    assert RateLimiter(MemoryRateLimitBackend(), trusted_proxies=TRUSTED).enabled
+
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    assert RateLimiter(MemoryRateLimitBackend(), trusted_proxies=[]).enabled
@@ -0,0 +1,88 @@
+"""
+Report downloads: single byte ranges are honoured, malformed or multi-range
+headers send the whole file, and ranges past the end answer 416.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from starlette.requests import Request
+
+from report_downloads import RangeNotSatisfiable, ReportFileResponse, parse_range, report_validators
+
+SIZE = 1000
+REPORT = {"size": SIZE, "created_at": datetime(2025, 3, 1, 12, 0, 0)}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    (None, None),
+    ("items=0-99", None),
+    ("bytes=0-9,20-29", None),
+    ("bytes=abc-", None),
+    ("bytes=-", None),
+    ("bytes=50-10", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000"])
+def test_range_past_the_end_is_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, SIZE)
+
+
+def download_request(headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/reports/report.pdf",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+def respond(headers):
+    return ReportFileResponse("/nonexistent/report.pdf", "report.pdf", REPORT, download_request(headers))
+
+
+def test_range_request_answers_206_with_content_range():
+    response = respond({"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 100-199/1000"
+    assert response.headers["content-length"] == "100"
+
+
+def test_unsatisfiable_range_answers_416():
+    response = respond({"Range": "bytes=1000-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1000"
+    assert "content-type" not in response.headers
+
+
+def test_stale_if_range_sends_the_whole_report():
+    response = respond({"Range": "bytes=100-199", "If-Range": '"stale-etag"'})
+
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(SIZE)
+
+
+def test_matching_if_range_keeps_the_range():
+    etag, _, _ = report_validators(REPORT)
+    response = respond({"Range": "bytes=100-199", "If-Range": etag})
+
+    assert response.status_code == 206
@@ -0,0 +1,136 @@
+"""
+Report export archives: a report that cannot be opened is skipped and listed,
+one that fails part-way through its entry aborts the stream instead of
+shipping a truncated ZIP, and an empty date range is rejected.
+"""
+
+import asyncio
+import io
+import sys
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("starlette")
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from pydantic import ValidationError
+
+from models import ExportReportsRequest, Session
+from report_export import ExportAbortedError, ExportProgress, ReportExporter
+
+PDF = b"%PDF-1.4 " + b"x" * 200_000
+
+
+class BrokenRead(io.BytesIO):
+    """Serves one chunk and then fails, like a connection dropped mid-download"""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise OSError("connection reset")
+        return super().read(size)
+
+
+class FakeStorage:
+    def __init__(self, files):
+        self.files = files
+
+    def open(self, filename):
+        source = self.files[filename]
+        if isinstance(source, Exception):
+            raise source
+        return source()
+
+
+class FakeIndex:
+    def __init__(self, storage):
+        self.storage = storage
+
+    async def latest_for_session(self, session_id):
+        return {"filename": f"{session_id}.pdf"}
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeSessions:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor(self.documents)
+
+
+class FakeDb:
+    def __init__(self, documents):
+        self.sessions = FakeSessions(documents)
+
+
+def build_exporter(files):
+    documents = [Session(id=filename[:-4]).model_dump() for filename in files]
+    return ReportExporter(FakeDb(documents), None, None, FakeIndex(FakeStorage(files)), concurrency=2)
+
+
+def export_request():
+    return ExportReportsRequest(start=datetime(2024, 1, 1), end=datetime(2030, 1, 1))
+
+
+def collect(exporter, progress):
+    async def run():
+        return b"".join([chunk async for chunk in exporter.stream(progress, export_request())])
+    return asyncio.run(run())
+
+
+def test_report_that_cannot_be_opened_is_skipped_and_listed():
+    exporter = build_exporter({
+        "a.pdf": lambda: io.BytesIO(PDF),
+        "b.pdf": FileNotFoundError("b.pdf is gone"),
+        "c.pdf": lambda: io.BytesIO(PDF)
+    })
+    progress = ExportProgress(3)
+
+    archive = zipfile.ZipFile(io.BytesIO(collect(exporter, progress)))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == ["a.pdf", "c.pdf", "export_errors.txt"]
+    assert archive.read("a.pdf") == PDF
+    assert b"b.pdf is gone" in archive.read("export_errors.txt")
+    assert (progress.done, progress.failed, progress.finished) == (2, 1, True)
+
+
+def test_failure_inside_an_entry_aborts_the_stream():
+    exporter = build_exporter({
+        "a.pdf": lambda: io.BytesIO(PDF),
+        "b.pdf": lambda: BrokenRead(PDF)
+    })
+    progress = ExportProgress(2)
+
+    with pytest.raises(ExportAbortedError, match="connection reset"):
+        collect(exporter, progress)
+
+    assert (progress.done, progress.failed, progress.finished) == (1, 1, True)
+
+
+def test_export_range_must_not_be_empty():
+    with pytest.raises(ValidationError, match="start must be before end"):
+        ExportReportsRequest(start=datetime(2025, 1, 1), end=datetime(2025, 1, 1))
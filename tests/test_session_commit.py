@@ -0,0 +1,93 @@
+"""
+Optimistic concurrency on session writes: a turn commits only against the
+version it read, and a stale write answers 409 instead of overwriting.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+pytest.importorskip("dotenv")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Motor does not connect until the first operation, so any URL will do
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "dr_arogya_commit_test")
+
+from fastapi import HTTPException
+
+import server
+from models import ConversationStageEnum, Session
+
+
+class FakeSessions:
+    def __init__(self, document):
+        self.document = document
+
+    def _version_matches(self, expected):
+        version = self.document.get("version")
+        if isinstance(expected, dict):
+            return version in expected["$in"]
+        return version == expected
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        if query["id"] != self.document["id"] or not self._version_matches(query["version"]):
+            return None
+        self.document.update(update["$set"])
+        self.document["version"] = (self.document.get("version") or 0) + update["$inc"]["version"]
+        return dict(self.document)
+
+
+class FakeDb:
+    def __init__(self, document):
+        self.sessions = FakeSessions(document)
+
+
+@pytest.fixture
+def stored_session(monkeypatch):
+    session = Session(id="s1", version=3)
+    db = FakeDb(session.model_dump())
+    monkeypatch.setattr(server, "db", db)
+    return session, db.sessions
+
+
+def test_commit_bumps_the_version(stored_session):
+    session, sessions = stored_session
+
+    committed = asyncio.run(server._commit_session(session, {"current_stage": ConversationStageEnum.SYMPTOM_INQUIRY}))
+
+    assert committed.version == 4
+    assert committed.current_stage == ConversationStageEnum.SYMPTOM_INQUIRY
+    assert sessions.document["version"] == 4
+
+
+def test_stale_commit_answers_409_and_keeps_the_newer_write(stored_session):
+    session, sessions = stored_session
+    stale = session.model_copy()
+
+    asyncio.run(server._commit_session(session, {"current_stage": ConversationStageEnum.SYMPTOM_INQUIRY}))
+    with pytest.raises(HTTPException) as conflict:
+        asyncio.run(server._commit_session(stale, {"current_stage": ConversationStageEnum.GREETING}))
+
+    assert conflict.value.status_code == 409
+    assert sessions.document["current_stage"] == ConversationStageEnum.SYMPTOM_INQUIRY
+    assert sessions.document["version"] == 4
+
+
+def test_session_written_before_versioning_commits_once(monkeypatch):
+    document = Session(id="s1").model_dump()
+    document.pop("version")
+    db = FakeDb(document)
+    monkeypatch.setattr(server, "db", db)
+    session = Session(**dict(document))
+
+    assert asyncio.run(server._commit_session(session, {})).version == 1
+    with pytest.raises(HTTPException) as conflict:
+        asyncio.run(server._commit_session(session, {}))
+    assert conflict.value.status_code == 409
@@ -0,0 +1,138 @@
+"""
+Session leases shared through MongoDB: a live lease keeps other workers out,
+an expired one is taken over, and a holder only ever releases its own lease.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from pymongo.errors import DuplicateKeyError
+
+from session_locks import MongoLease, SessionBusyError
+
+
+class UpdateResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+
+
+class FakeLeases:
+    """Lease documents keyed by _id, with the upsert collision MongoDB raises on a live lease"""
+
+    def __init__(self):
+        self.documents = {}
+
+    def _matches(self, document, query):
+        for field, value in query.items():
+            if isinstance(value, dict):
+                if not document.get(field) < value["$lt"]:
+                    return False
+            elif document.get(field) != value:
+                return False
+        return True
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        document = self.documents.get(query["_id"])
+        if document is not None and self._matches(document, query):
+            document.update(update["$set"])
+        elif document is not None and upsert:
+            raise DuplicateKeyError("duplicate key")
+        elif upsert:
+            document = self.documents[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+        return document
+
+    async def update_one(self, query, update):
+        document = self.documents.get(query["_id"])
+        if document is None or not self._matches(document, query):
+            return UpdateResult(0)
+        document.update(update["$set"])
+        return UpdateResult(1)
+
+    async def find_one(self, query, projection=None):
+        return self.documents.get(query["_id"])
+
+    async def delete_one(self, query):
+        document = self.documents.get(query["_id"])
+        if document is not None and self._matches(document, query):
+            del self.documents[query["_id"]]
+
+
+def held_by(leases, owner, seconds):
+    leases.documents["s1"] = {"_id": "s1", "owner": owner, "expires_at": datetime.utcnow() + timedelta(seconds=seconds)}
+
+
+def test_live_lease_keeps_other_workers_out():
+    leases = FakeLeases()
+    held_by(leases, "other-worker", 60)
+    lease = MongoLease(leases, ttl_seconds=60, wait_seconds=0.2)
+
+    async def run():
+        async with lease.hold("s1"):
+            pass
+
+    with pytest.raises(SessionBusyError):
+        asyncio.run(run())
+    assert leases.documents["s1"]["owner"] == "other-worker"
+
+
+def test_expired_lease_is_taken_over_and_released():
+    leases = FakeLeases()
+    held_by(leases, "crashed-worker", -1)
+    lease = MongoLease(leases, ttl_seconds=60, wait_seconds=0.2)
+    owners = []
+
+    async def run():
+        async with lease.hold("s1"):
+            owners.append(leases.documents["s1"]["owner"])
+            assert await lease.expires_in("s1") > 50
+
+    asyncio.run(run())
+
+    assert owners and owners[0] != "crashed-worker"
+    assert "s1" not in leases.documents
+
+
+def test_holder_does_not_release_a_lease_taken_over_from_it():
+    leases = FakeLeases()
+    lease = MongoLease(leases, ttl_seconds=60, wait_seconds=0.2)
+
+    async def run():
+        async with lease.hold("s1"):
+            # Our lease lapsed and another worker took it over while we worked
+            held_by(leases, "other-worker", 60)
+
+    asyncio.run(run())
+
+    assert leases.documents["s1"]["owner"] == "other-worker"
+
+
+def test_waiter_gets_the_lease_once_the_holder_releases_it():
+    leases = FakeLeases()
+    lease = MongoLease(leases, ttl_seconds=60, wait_seconds=2)
+    order = []
+
+    async def first():
+        async with lease.hold("s1"):
+            order.append("first")
+            await asyncio.sleep(0.2)
+
+    async def second():
+        await asyncio.sleep(0.05)
+        async with lease.hold("s1"):
+            order.append("second")
+
+    async def run():
+        await asyncio.gather(first(), second())
+
+    asyncio.run(run())
+
+    assert order == ["first", "second"]
+    assert not leases.documents